@@ -1,13 +1,67 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from oraclehlb.models import GameState
+from oraclehlb.ai.endgame import EndgameSolver
+from oraclehlb.game.engine import MAX_CLUE_TOKENS
+from oraclehlb.game.moves import move_to_payload
+from oraclehlb.models import GameState, ActionType
 
 
 class BaseStrategy(ABC):
     """Абстрактный базовый класс для всех AI стратегий."""
 
+    # Стратегия долго считает на CPU: при `decision_workers > 0` решения выполняются в пуле процессов
+    cpu_bound: bool = False
+    # Сила хода зависит от времени на часах (бюджет в секундах): симулятор не играет такие партии
+    # одновременно в одном процессе, иначе они делят время и результат зависит от параллельности
+    time_bound: bool = False
+    # С какого размера колоды ход выбирает точный решатель эндшпиля (`endgame_action`); 0 - никогда
+    endgame_deck_size: int = 0
+    # Жёсткий предел времени решателя на один ход, секунды
+    endgame_time_limit: float = 0.5
+    _endgame_solver: Optional[EndgameSolver] = None
+    # Имя в реестре и параметры конструктора (их выставляет `core.strategy_loader`): по ним процесс-воркер
+    # пула решений создаёт такую же стратегию
+    strategy_name: str = ""
+    strategy_params: Dict[str, Any] = {}
+
+    @classmethod
+    def warm_up(cls):
+        """
+        Однократная подготовка класса в процессе, до первого экземпляра (вызывает реестр стратегий).
+        Тяжёлые таблицы (книги дебютов, веса сетей...) строятся здесь и хранятся на классе:
+        экземпляры всех ботов процесса читают их совместно и не меняют.
+        """
+
     @abstractmethod
     async def decide_action(self, state: GameState) -> Dict[str, Any]:
         """Принять решение о следующем ходе."""
         pass
+
+    def endgame_action(self, state: GameState) -> Optional[Dict[str, Any]]:
+        """
+        Ход точного решателя эндшпиля, если в колоде осталось не больше `endgame_deck_size` карт
+        и решатель успел досчитать; иначе None - стратегия решает сама. Решатель (с его таблицей
+        транспозиций) создаётся при первом обращении и живёт вместе со стратегией.
+        """
+        engine = state.engine
+        if not self.endgame_deck_size or engine is None or engine.deck_size > self.endgame_deck_size:
+            return None
+        if self._endgame_solver is None:
+            self._endgame_solver = EndgameSolver(time_limit=self.endgame_time_limit)
+        move = self._endgame_solver.solve(engine, state.our_player_index)
+        return move_to_payload(move) if move is not None else None
+
+    def fallback_action(self, state: GameState) -> Dict[str, Any]:
+        """
+        Мгновенный безопасный ход, если решение не уложилось в таймаут или упало:
+        сбросить самую старую карту, а при полном запасе подсказок - подсказать ранг следующему игроку.
+        """
+        our_hand = state.hands.get(state.our_player_index, [])
+        if state.clue_tokens < MAX_CLUE_TOKENS and our_hand:
+            return {"type": ActionType.DISCARD.value, "target": our_hand[0].order}
+
+        target = (state.our_player_index + 1) % len(state.player_names)
+        target_hand = state.hands.get(target, [])
+        rank = target_hand[-1].rank if target_hand else 1
+        return {"type": ActionType.RANK_CLUE.value, "target": target, "value": rank}
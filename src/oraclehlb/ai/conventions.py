@@ -0,0 +1,83 @@
+from typing import List, Tuple, Callable
+
+from oraclehlb.game.clues import ClueTable, engine_table
+from oraclehlb.game.engine import GameEngine, MAX_CLUE_TOKENS, MAX_STRIKES
+from oraclehlb.game.moves import Move, PLAY, DISCARD, COLOR, RANK, apply_move, next_turn, legal_moves, touched_by
+
+Policy = Callable[[GameEngine, int], Move]
+
+
+def convention_move(engine: GameEngine, player: int) -> Move:
+    """
+    Простая конвенция для роллаутов (полная информация, приближение good touch):
+    1. сыграть затронутую подсказкой карту, если она играбельна;
+    2. подсказать рангом незатронутую играбельную карту следующему по кругу, у кого она есть;
+    3. сбросить «чоп» - самую старую незатронутую карту;
+    4. иначе подсказать что угодно или сбросить самую старую карту.
+    """
+    hand = engine.hand(player)
+    clued = engine.card_clued
+    suits, ranks, stacks = engine.card_suit, engine.card_rank, engine.stacks
+
+    for order in hand:
+        if clued[order] and stacks[suits[order]] + 1 == ranks[order]:
+            return PLAY, order, 0
+
+    if engine.clue_tokens > 0:
+        for offset in range(1, engine.num_players):
+            target = (player + offset) % engine.num_players
+            for order in engine.hand(target):
+                if not clued[order] and stacks[suits[order]] + 1 == ranks[order]:
+                    return RANK, target, ranks[order]
+
+    if engine.clue_tokens < MAX_CLUE_TOKENS:
+        for order in hand:
+            if not clued[order]:
+                return DISCARD, order, 0
+
+    if engine.clue_tokens > 0:
+        target = (player + 1) % engine.num_players
+        target_hand = engine.hand(target)
+        if target_hand:
+            return RANK, target, ranks[target_hand[-1]]
+    return DISCARD, hand[0], 0
+
+
+def play_out(engine: GameEngine, deck: List[Tuple[int, int]], policy: Policy = convention_move) -> int:
+    """
+    Доигрывает партию с полной информацией от `engine.current_player` до конца и возвращает счёт
+    (0 при трёх страйках, как на hanab.live). Движок и колода изменяются на месте.
+    """
+    while not engine.is_finished():
+        player = engine.current_player
+        apply_move(engine, player, policy(engine, player), deck)
+        next_turn(engine)
+    return 0 if engine.strikes >= MAX_STRIKES else engine.score
+
+
+def new_cards_playable(engine: GameEngine, move: Move, table: ClueTable, require_new: bool) -> bool:
+    """Все ли карты, впервые затронутые подсказкой `move`, играбельны (`require_new` - и есть ли такие)."""
+    kind, target, value = move
+    new = [order for order in touched_by(engine, target, kind, value, table) if not engine.card_clued[order]]
+    if require_new and not new:
+        return False
+    return all(engine.is_playable(engine.card_suit[order], engine.card_rank[order]) for order in new)
+
+
+def search_candidates(engine: GameEngine, player: int) -> List[Move]:
+    """
+    Наши ходы для поиска. Роллауты играют `convention_move`, где подсказка означает «сыграй», поэтому
+    поиск рассматривает только такие подсказки: иначе широкие подсказки переоцениваются - в роллаутах
+    партнёры знают свои карты, а в живой игре прочитать такую подсказку нельзя. Полный запас подсказок -
+    исключение.
+    """
+    table = engine_table(engine)
+    moves = legal_moves(engine, player, table)
+    others = [move for move in moves if move[0] not in (COLOR, RANK)]
+    clues = [move for move in moves if move[0] in (COLOR, RANK)]
+    play_clues = [move for move in clues if new_cards_playable(engine, move, table, require_new=True)]
+    if play_clues or engine.clue_tokens < MAX_CLUE_TOKENS:
+        return others + play_clues
+    # Подсказку нужно дать, но сыграть нечего: повторная подсказка по уже затронутым картам безопасна
+    repeats = [move for move in clues if new_cards_playable(engine, move, table, require_new=False)]
+    return others + (repeats or clues)
@@ -0,0 +1,99 @@
+import logging
+import random
+from typing import Dict, List, Tuple
+
+from oraclehlb.game.engine import GameEngine, NUM_RANKS, RANK_COPIES, card_id
+
+log = logging.getLogger(__name__)
+
+
+class SamplingError(ValueError):
+    """Руку не удалось разыграть даже без масок знания: невидимых карт меньше, чем неизвестных в руке."""
+
+
+def unseen_pool(engine: GameEngine, player: int) -> List[int]:
+    """Сколько копий каждой идентичности не видно игроку (не сыграно, не сброшено, не в чужих руках)."""
+    num_ids = engine.num_suits * NUM_RANKS
+    if engine.knowledge is not None:
+        copies = engine.knowledge.copies
+    else:
+        copies = [RANK_COPIES[ident % NUM_RANKS] for ident in range(num_ids)]
+    pool = [0] * num_ids
+    for ident in range(num_ids):
+        suit, rank = divmod(ident, NUM_RANKS)
+        played = 1 if engine.stacks[suit] > rank else 0
+        pool[ident] = copies[ident] - played - engine.discards[ident]
+    for other in range(engine.num_players):
+        for order in engine.hand(other):
+            suit = engine.card_suit[order]
+            if suit >= 0:
+                pool[card_id(suit, engine.card_rank[order])] -= 1
+    return pool
+
+
+def playable_mask(engine: GameEngine) -> int:
+    mask = 0
+    for suit, rank in enumerate(engine.stacks):
+        if rank < NUM_RANKS:
+            mask |= 1 << card_id(suit, rank + 1)
+    return mask
+
+
+def sample_hand(
+        pool: List[int], unknown: List[int], masks: Dict[int, int], rng: random.Random, attempts: int,
+) -> Dict[int, int]:
+    """
+    Взвешенное по оставшимся копиям сэмплирование с повторами; при неудаче маски игнорируются,
+    а если не хватает и этого - `SamplingError` (частичная рука оставила бы карты без масти).
+    """
+    for attempt in range(attempts + 1):
+        ignore_masks = attempt == attempts
+        remaining = pool[:]
+        assignment = {}
+        for order in unknown:
+            mask = -1 if ignore_masks else masks[order]
+            choices = [ident for ident, count in enumerate(remaining) if count > 0 and mask >> ident & 1]
+            if not choices:
+                break
+            ident = rng.choices(choices, weights=[remaining[i] for i in choices])[0]
+            remaining[ident] -= 1
+            assignment[order] = ident
+        else:
+            return assignment
+    raise SamplingError(f"Could not sample a hand for orders {unknown}")
+
+
+def determinize(
+        engine: GameEngine, player: int, rng: random.Random, attempts: int = 20,
+) -> Tuple[GameEngine, List[Tuple[int, int]]]:
+    """
+    Копия движка с сэмплированными картами руки `player` (с учётом масок знания, самые ограниченные
+    карты - первыми) и перемешанная колода из того, что осталось (добор с конца списка).
+    `SamplingError`, если невидимые карты не покрывают руку (знание разошлось с партией).
+    """
+    pool = unseen_pool(engine, player)
+    unknown = [order for order in engine.hand(player) if engine.card_suit[order] < 0]
+    knowledge = engine.knowledge
+    masks = {
+        order: knowledge.possibilities(order, player) if knowledge is not None else -1
+        for order in unknown
+    }
+    # Затронутые подсказкой карты читаем как играбельные, если это не противоречит знанию
+    playable = playable_mask(engine)
+    for order in unknown:
+        if engine.card_clued[order] and masks[order] & playable:
+            masks[order] &= playable
+    # Самые ограниченные карты (например, после подсказок) - первыми
+    unknown.sort(key=lambda order: bin(masks[order] & ((1 << len(pool)) - 1)).count("1"))
+
+    assignment = sample_hand(pool, unknown, masks, rng, attempts)
+    root = engine.copy(track_undo=False, with_knowledge=False)
+    for order, ident in assignment.items():
+        root.card_suit[order], rank = divmod(ident, NUM_RANKS)
+        root.card_rank[order] = rank + 1
+        pool[ident] -= 1
+
+    deck = [divmod(ident, NUM_RANKS) for ident, count in enumerate(pool) for _ in range(max(count, 0))]
+    rng.shuffle(deck)
+    deck = [(suit, rank + 1) for suit, rank in deck[:engine.deck_size]]
+    return root, deck
@@ -0,0 +1,308 @@
+"""
+Точный решатель эндшпиля.
+
+Когда колода почти пуста, партия короткая, и её можно досчитать целиком. Решатель сэмплирует
+детерминизации (наша рука и порядок колоды, как у Монте-Карло), в каждой ищет в глубину лучший
+достижимый счёт и выбирает наш ход с лучшим средним счётом.
+
+Перебор идёт в тех же рамках, что и роллауты `convention_move`: идентичности видны решателю, но игрок
+играет только затронутые подсказкой играбельные карты - так ход, который нельзя прочитать в живой игре,
+не переоценивается. Поэтому в переборе есть:
+- игры затронутых играбельных карт (неиграбельные не играются вовсе: страйк хуже паса или сброса);
+- подсказки «сыграй», впервые касающиеся только играбельных карт (одна на каждый набор таких карт);
+- «пас» - подсказка, которая ничего не меняет, кроме жетона и очереди;
+- сброс чопа (самой старой незатронутой карты), как в `convention_move`: какую карту выгоднее
+  сбросить, игрок в живой игре не знает.
+Наши ходы в корне - кандидаты `search_candidates`, включая игру вслепую; страйк нашего хода штрафуется
+`strike_penalty`, как в Монте-Карло (иначе не третий страйк в конце партии ничего не стоит и игра
+вслепую вытесняет сброс).
+
+Значения узлов кэшируются в таблице транспозиций (LRU с ограничением по числу записей) по ключу
+из стопок, рук (идентичности с затронутостью по порядку в руке), жетонов, очереди, остатка колоды
+и ходов до конца. Ключ не зависит от детерминизации, поэтому таблица общая для всех детерминизаций
+и ходов партии. Отсечение: узел не раскрывается, если верхняя оценка счёта (сколько ещё можно сыграть
+по мастям и по оставшимся ходам) не выше уже найденного; перебор ходов узла прекращается, как только
+достигнута оценка. Поиск ограничен жёстким пределом времени.
+"""
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from oraclehlb.ai.conventions import search_candidates
+from oraclehlb.ai.determinize import SamplingError, determinize
+from oraclehlb.game.clues import ClueTable, engine_table
+from oraclehlb.game.engine import (
+    GameEngine, NUM_RANKS, MAX_CLUE_TOKENS, MAX_STRIKES, COLOR_CLUE, RANK_CLUE, RANK_COPIES, card_id,
+)
+from oraclehlb.game.moves import Move, PLAY, DISCARD, COLOR, touched_by
+
+log = logging.getLogger(__name__)
+
+# Ход перебора: (вид, order карты или игрок-цель, тип подсказки, значение, затронутые orders)
+_Step = Tuple[int, int, int, int, List[int]]
+# Как часто (в узлах) сверяться с часами
+_CLOCK_EVERY = 1024
+
+
+class _Timeout(Exception):
+    pass
+
+
+class EndgameSolver:
+    """
+    Решатель для одного бота: таблица транспозиций живёт между ходами и партиями.
+    `solve` возвращает ход или None, если до предела времени досчиталось меньше `min_determinizations`
+    детерминизаций: по нескольким сэмплам выбор слишком шумный (например, игра вслепую карты,
+    которая оказалась играбельной в единственном сэмпле).
+    """
+
+    def __init__(
+            self,
+            time_limit: float = 0.5,
+            max_entries: int = 200_000,
+            min_determinizations: int = 16,
+            max_determinizations: int = 64,
+            seed: Optional[int] = None,
+            sample_attempts: int = 20,
+            strike_penalty: float = 2.0,
+    ):
+        self.time_limit = time_limit
+        self.max_entries = max_entries
+        self.min_determinizations = min_determinizations
+        self.max_determinizations = max_determinizations
+        self.sample_attempts = sample_attempts
+        self.strike_penalty = strike_penalty
+        self._rng = random.Random(seed)
+        # ключ позиции -> (значение, точное ли оно); неточное значение - верхняя оценка
+        self._table: "OrderedDict[Tuple, Tuple[int, bool]]" = OrderedDict()
+        self._clues: Optional[ClueTable] = None
+        self._copies: List[int] = []
+        self._deck: List[Tuple[int, int]] = []
+        self._deadline = 0.0
+        self.nodes = 0
+        self.lookups = 0
+        self.hits = 0
+        # Статистика последнего решения: determinizations, nodes, elapsed, nodes_per_sec, tt_hit_rate, tt_entries
+        self.last_stats: Dict[str, float] = {}
+
+    def solve(self, engine: GameEngine, player: int, candidates: Optional[List[Move]] = None) -> Optional[Move]:
+        if candidates is None:
+            candidates = search_candidates(engine, player)
+        if not candidates:
+            return None
+        clues = engine_table(engine)
+        if clues is not self._clues:
+            # Ключ позиции не содержит варианта: значения из партии с другими правилами подсказок
+            # (или другим набором мастей) в новой неверны. Таблицы подсказок кэшируются, так что
+            # в партиях одного варианта таблица транспозиций сохраняется
+            self._table.clear()
+            self._clues = clues
+        if engine.knowledge is not None:
+            self._copies = list(engine.knowledge.copies)
+        else:
+            self._copies = [RANK_COPIES[ident % NUM_RANKS] for ident in range(engine.num_suits * NUM_RANKS)]
+
+        totals = [0.0] * len(candidates)
+        determinizations = 0
+        self.nodes = self.lookups = self.hits = 0
+        started = time.perf_counter()
+        self._deadline = started + self.time_limit
+        try:
+            while determinizations < self.max_determinizations:
+                root, deck = determinize(engine, player, self._rng, self.sample_attempts)
+                world = root.copy(track_undo=True, with_knowledge=False)
+                self._deck = deck
+                # Значения считаются для детерминизации целиком, иначе средние смещаются к недосчитанным
+                values = [self._root_value(world, player, move) for move in candidates]
+                for index, value in enumerate(values):
+                    totals[index] += value
+                determinizations += 1
+                # Наша рука и колода известны полностью: одной детерминизации достаточно
+                if self._exact(engine, player):
+                    break
+        except _Timeout:
+            pass
+        except SamplingError:
+            log.warning("Endgame: could not sample our hand, leaving the move to the strategy", exc_info=True)
+            return None
+
+        elapsed = time.perf_counter() - started
+        self.last_stats = {
+            "determinizations": determinizations,
+            "nodes": self.nodes,
+            "elapsed": elapsed,
+            "nodes_per_sec": self.nodes / elapsed if elapsed > 0 else 0.0,
+            "tt_hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "tt_entries": len(self._table),
+        }
+        exact = determinizations > 0 and self._exact(engine, player)
+        if determinizations < self.min_determinizations and not exact:
+            log.info(
+                "Endgame: only %d determinizations solved in %.2fs (%d nodes), leaving the move to the strategy",
+                determinizations, elapsed, self.nodes,
+            )
+            return None
+        best = max(range(len(candidates)), key=lambda i: totals[i])
+        log.info(
+            "Endgame: %d determinizations, %d nodes in %.2fs (%.0f nodes/sec), table hit rate %.1f%% (%d entries), best %s (%.2f)",
+            determinizations, self.nodes, elapsed, self.last_stats["nodes_per_sec"],
+            100 * self.last_stats["tt_hit_rate"], len(self._table), candidates[best], totals[best] / determinizations,
+        )
+        return candidates[best]
+
+    @staticmethod
+    def _exact(engine: GameEngine, player: int) -> bool:
+        return engine.deck_size == 0 and all(engine.card_suit[order] >= 0 for order in engine.hand(player))
+
+    def _root_value(self, engine: GameEngine, player: int, move: Move) -> float:
+        kind, target, value = move
+        mark = len(engine._undo)
+        strikes = engine.strikes
+        if kind == PLAY:
+            engine.attempt_play(player, target)
+            self._draw(engine, player)
+        elif kind == DISCARD:
+            engine.discard(player, target, engine.card_suit[target], engine.card_rank[target])
+            self._draw(engine, player)
+        else:
+            touched = touched_by(engine, target, kind, value, self._clues)
+            engine.clue(player, target, COLOR_CLUE if kind == COLOR else RANK_CLUE, value, touched)
+        penalty = self.strike_penalty * (engine.strikes - strikes)
+        engine.set_turn(engine.turn + 1, (player + 1) % engine.num_players)
+        try:
+            return self._value(engine, -1) - penalty
+        finally:
+            while len(engine._undo) > mark:
+                engine.undo()
+
+    # --- Перебор ---
+
+    def _draw(self, engine: GameEngine, player: int):
+        if engine.deck_size > 0:
+            suit, rank = self._deck[engine.deck_size - 1]
+            engine.draw(player, engine.next_order, suit, rank)
+
+    def _upper_bound(self, engine: GameEngine) -> int:
+        """Счёт, выше которого не подняться: по мастям (до первой карты, все копии которой сброшены) и по ходам."""
+        gain = 0
+        for suit, stack in enumerate(engine.stacks):
+            for rank in range(stack, NUM_RANKS):
+                ident = card_id(suit, rank + 1)
+                if engine.discards[ident] >= self._copies[ident]:
+                    break
+                gain += 1
+        if engine.end_turn >= 0:
+            gain = min(gain, engine.end_turn - engine.turn + 1)
+        return engine.score + gain
+
+    def _key(self, engine: GameEngine) -> Tuple:
+        suits, ranks, clued = engine.card_suit, engine.card_rank, engine.card_clued
+        hands = tuple(
+            tuple(card_id(suits[order], ranks[order]) * 2 + clued[order] for order in engine.hand(player))
+            for player in range(engine.num_players)
+        )
+        return (
+            tuple(engine.stacks), hands, engine.clue_tokens, engine.current_player,
+            tuple(self._deck[:engine.deck_size]), engine.end_turn - engine.turn if engine.end_turn >= 0 else -1,
+        )
+
+    def _steps(self, engine: GameEngine, player: int) -> List[_Step]:
+        """Игры, затем подсказки «сыграй», пас и сброс чопа."""
+        suits, ranks, clued, stacks = engine.card_suit, engine.card_rank, engine.card_clued, engine.stacks
+        hand = engine.hand(player)
+        plays, clues, discards, seen = [], [], [], set()
+        for order in hand:
+            ident = card_id(suits[order], ranks[order])
+            if clued[order] and stacks[suits[order]] + 1 == ranks[order] and ident not in seen:
+                seen.add(ident)
+                plays.append((PLAY, order, 0, 0, []))
+        if engine.clue_tokens < MAX_CLUE_TOKENS and hand:
+            # Что сбросить, игрок не знает: сбрасывается чоп - самая старая незатронутая карта
+            chop = next((order for order in hand if not clued[order]), hand[0])
+            discards.append((DISCARD, chop, 0, 0, []))
+        if engine.clue_tokens > 0:
+            following = (player + 1) % engine.num_players
+            for offset in range(1, engine.num_players):
+                target = (player + offset) % engine.num_players
+                clues += self._play_clues(engine, target)
+            clues.append((COLOR, following, RANK_CLUE, 0, []))
+        return plays + clues + discards
+
+    def _play_clues(self, engine: GameEngine, target: int) -> List[_Step]:
+        hand = engine.hand(target)
+        playable = 0
+        for slot, order in enumerate(hand):
+            if not engine.card_clued[order] and engine.stacks[engine.card_suit[order]] + 1 == engine.card_rank[order]:
+                playable |= 1 << slot
+        if not playable:
+            return []
+        steps, seen = [], set()
+        for option in self._clues.hand_options(engine, target):
+            # Впервые затронуты только играбельные карты; подсказки с одинаковым эффектом равны
+            if not option.new or option.new & ~playable or option.new in seen:
+                continue
+            seen.add(option.new)
+            touched = [order for slot, order in enumerate(hand) if option.touched >> slot & 1]
+            clue_type = COLOR_CLUE if option.kind == COLOR else RANK_CLUE
+            steps.append((COLOR, target, clue_type, option.value, touched))
+        return steps
+
+    def _value(self, engine: GameEngine, alpha: int) -> int:
+        """Лучший счёт позиции, если он больше `alpha`; иначе какая-то верхняя оценка не больше `alpha`."""
+        if engine.is_finished():
+            return 0 if engine.strikes >= MAX_STRIKES else engine.score
+        self.nodes += 1
+        if self.nodes % _CLOCK_EVERY == 0 and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        bound = self._upper_bound(engine)
+        if bound <= alpha:
+            return bound
+        key = self._key(engine)
+        self.lookups += 1
+        entry = self._table.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._table.move_to_end(key)
+            value, exact = entry
+            if exact or value <= alpha:
+                return value
+            bound = min(bound, value)
+
+        player = engine.current_player
+        following = (player + 1) % engine.num_players
+        best = -1
+        for kind, target, clue_type, clue_value, touched in self._steps(engine, player):
+            mark = len(engine._undo)
+            if kind == PLAY:
+                engine.play(player, target, engine.card_suit[target], engine.card_rank[target])
+                self._draw(engine, player)
+            elif kind == DISCARD:
+                engine.discard(player, target, engine.card_suit[target], engine.card_rank[target])
+                self._draw(engine, player)
+            else:
+                engine.clue(player, target, clue_type, clue_value, touched)
+            engine.set_turn(engine.turn + 1, following)
+            value = self._value(engine, max(alpha, best))
+            while len(engine._undo) > mark:
+                engine.undo()
+            if value > best:
+                best = value
+                if best >= bound:
+                    break
+
+        if best < 0:
+            # Ходить нечем (рука пуста, жетонов нет и сбросить нельзя): счёт уже не изменится
+            best = engine.score
+        # Значение выше `alpha` точное: лучший ход считался с порогом ниже него
+        self._store(key, best, best > alpha or best >= bound)
+        return best
+
+    def _store(self, key: Tuple, value: int, exact: bool):
+        table = self._table
+        table[key] = (value, exact)
+        table.move_to_end(key)
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
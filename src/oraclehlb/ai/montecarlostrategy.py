@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.ai.conventions import Policy, convention_move, play_out, search_candidates
+from oraclehlb.ai.determinize import SamplingError, determinize
+from oraclehlb.game.clues import standard_table
+from oraclehlb.game.moves import apply_move, next_turn, move_to_payload
+from oraclehlb.game.variants import catalog
+from oraclehlb.models import GameState
+
+log = logging.getLogger(__name__)
+
+
+class MonteCarloStrategy(BaseStrategy):
+    """
+    Детерминизированный Монте-Карло поиск с бюджетом времени.
+
+    Каждая итерация сэмплирует нашу руку из того, что ещё не видно (с учётом масок знания,
+    самые ограниченные карты - первыми), перемешивает остаток в колоду и доигрывает партию
+    конвенцией `convention_move` после каждого кандидата. Все кандидаты оцениваются на одной
+    и той же детерминизации (общие случайные числа), явно проигрывающие периодически отсекаются.
+    Поиск останавливается по часам (или после `max_determinizations` детерминизаций, если задано),
+    между детерминизациями управление отдаётся event loop.
+    Когда в колоде остаётся не больше `endgame_deck_size` карт, ход сначала ищет точный решатель
+    эндшпиля (`oraclehlb.ai.endgame`), а роллауты нужны, только если он не успел.
+    """
+
+    cpu_bound = True
+
+    def __init__(
+            self,
+            time_budget: float = 1.0,
+            seed: Optional[int] = None,
+            policy: Policy = convention_move,
+            prune_every: int = 16,
+            prune_margin: float = 1.0,
+            strike_penalty: float = 2.0,
+            sample_attempts: int = 20,
+            endgame_deck_size: int = 3,
+            endgame_time_limit: float = 0.5,
+            max_determinizations: int = 0,
+    ):
+        self.time_budget = time_budget
+        # Бюджет в детерминизациях (0 - только по часам): сила хода не зависит от загрузки CPU,
+        # так оценивают стратегию в симуляторе; `time_budget` тогда лишь страхует от зависания
+        self.max_determinizations = max_determinizations
+        self.time_bound = not max_determinizations
+        self.policy = policy
+        self.prune_every = prune_every
+        self.prune_margin = prune_margin
+        # Роллауты с полной информацией не ошибаются, поэтому страйк в них почти бесплатен - штрафуем явно
+        self.strike_penalty = strike_penalty
+        self.sample_attempts = sample_attempts
+        self.endgame_deck_size = endgame_deck_size
+        # Не больше половины бюджета: если решатель не успеет, роллаутам нужно время на свой выбор
+        self.endgame_time_limit = min(endgame_time_limit, time_budget / 2)
+        self._rng = random.Random(seed)
+        # Статистика последнего решения: determinizations, rollouts, elapsed, rollouts_per_sec
+        self.last_stats: Dict[str, float] = {}
+
+    @classmethod
+    def warm_up(cls):
+        # Каталог вариантов и таблицы подсказок раскладов без особых мастей нужны уже первому решению
+        catalog()
+        for num_suits in range(3, 7):
+            standard_table(num_suits)
+
+    async def decide_action(self, state: GameState) -> Dict[str, Any]:
+        engine = state.engine
+        player = state.our_player_index
+        candidates = search_candidates(engine, player)
+        if not candidates:
+            log.warning("MonteCarlo: no candidate moves at table %s, sending fallback action", state.table_id)
+            return self.fallback_action(state)
+        if len(candidates) == 1:
+            return move_to_payload(candidates[0])
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+        # Время решателя эндшпиля входит в общий бюджет хода
+        action = self.endgame_action(state)
+        if action is not None:
+            return action
+
+        totals = [0.0] * len(candidates)
+        counts = [0] * len(candidates)
+        alive = list(range(len(candidates)))
+        determinizations = rollouts = 0
+
+        limit = self.max_determinizations or float("inf")
+        while time.perf_counter() < deadline and len(alive) > 1 and determinizations < limit:
+            try:
+                root, deck = determinize(engine, player, self._rng, self.sample_attempts)
+            except SamplingError:
+                # Без масок сэмплирование зависит только от счёта карт: следующие попытки упадут так же
+                log.warning("MonteCarlo: could not sample our hand at table %s", state.table_id, exc_info=True)
+                if not determinizations:
+                    return self.fallback_action(state)
+                break
+            for index in alive:
+                world, world_deck = root.copy(track_undo=False, with_knowledge=False), deck[:]
+                apply_move(world, player, candidates[index], world_deck)
+                next_turn(world)
+                score = play_out(world, world_deck, self.policy)
+                totals[index] += score - self.strike_penalty * world.strikes
+                counts[index] += 1
+            rollouts += len(alive)
+            determinizations += 1
+            if determinizations % self.prune_every == 0:
+                alive = self._prune(alive, totals, counts)
+            await asyncio.sleep(0)
+
+        elapsed = time.perf_counter() - started
+        self.last_stats = {
+            "determinizations": determinizations,
+            "rollouts": rollouts,
+            "elapsed": elapsed,
+            "rollouts_per_sec": rollouts / elapsed if elapsed > 0 else 0.0,
+        }
+        if not determinizations:
+            # Без единой оценки "лучшим" оказался бы первый кандидат - вслепую сыграть самую старую карту
+            log.warning("MonteCarlo: no rollout finished in %.3fs at table %s, sending fallback action",
+                        elapsed, state.table_id)
+            return self.fallback_action(state)
+        best = max(alive, key=lambda i: totals[i] / counts[i] if counts[i] else 0.0)
+        log.info(
+            "MonteCarlo: %d determinizations, %d rollouts in %.2fs (%.0f rollouts/sec), %d/%d candidates left, best %s (%.2f)",
+            determinizations, rollouts, elapsed, self.last_stats["rollouts_per_sec"],
+            len(alive), len(candidates), candidates[best], totals[best] / counts[best] if counts[best] else 0.0,
+        )
+        return move_to_payload(candidates[best])
+
+    def _prune(self, alive: List[int], totals: List[float], counts: List[int]) -> List[int]:
+        """Оставляет кандидатов, средний счёт которых не хуже лучшего более чем на `prune_margin`."""
+        means = {index: totals[index] / counts[index] for index in alive}
+        threshold = max(means.values()) - self.prune_margin
+        return [index for index in alive if means[index] >= threshold]
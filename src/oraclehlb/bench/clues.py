@@ -0,0 +1,129 @@
+"""
+Бенчмарк перебора подсказок: прямые циклы по подсказкам, картам и возможностям против `game.clues.ClueTable`.
+
+    python -m oraclehlb.bench.clues --games 100 --variant "Rainbow (6 Suits)"
+
+Позиции берутся из партий `FakeTable` (как в `bench.engine`); для каждой позиции перебираются все
+подсказки всем партнёрам игрока 0, результаты обоих способов сверяются.
+"""
+import argparse
+import time
+from typing import List, Tuple
+
+from oraclehlb.bench.engine import generate_game
+from oraclehlb.game.clues import ClueTable, ClueOption
+from oraclehlb.game.engine import GameEngine, NUM_RANKS
+from oraclehlb.game.knowledge import Knowledge, identities
+from oraclehlb.game.moves import COLOR, RANK
+from oraclehlb.game.variants import Variant, get_variant
+
+Position = Tuple[Tuple[int, ...], Tuple[int, ...], int]
+
+
+def collect_positions(variant: Variant, games: int, num_players: int) -> List[Position]:
+    """
+    Отпечатки рук партнёров игрока 0 в начале каждого хода. Партии играются по правилам без особых мастей,
+    поэтому маски знания - лишь реалистичные входные данные, а не прочтение подсказок варианта.
+    """
+    positions = []
+    for seed in range(games):
+        engine = GameEngine(num_players=num_players, num_suits=variant.num_suits, our_player_index=0)
+        engine.knowledge = Knowledge(num_players=num_players, num_suits=variant.num_suits)
+        for action in generate_game(seed, num_players, variant.num_suits):
+            engine.apply(action)
+            if action["type"] != "turn":
+                continue
+            for target in range(1, num_players):
+                hand = engine.hand(target)
+                idents = tuple(engine.card_suit[o] * NUM_RANKS + engine.card_rank[o] - 1 for o in hand)
+                masks = tuple(engine.knowledge.possibilities(o, target) for o in hand)
+                clued = sum(1 << slot for slot, o in enumerate(hand) if engine.card_clued[o])
+                positions.append((idents, masks, clued))
+    return positions
+
+
+def naive_options(variant: Variant, idents: Tuple[int, ...], masks: Tuple[int, ...], clued: int) -> List[ClueOption]:
+    """То же прочтение без таблиц: правила мастей проверяются для каждой карты и каждой возможности."""
+    colors = variant.clue_colors
+
+    def touches(kind: int, value: int, suit_index: int, rank: int) -> bool:
+        suit = variant.suits[suit_index]
+        if kind == RANK:
+            return not suit.no_ranks and (suit.all_ranks or rank == value)
+        if suit.all_colors:
+            return True
+        if suit.prism:
+            return (rank - 1) % len(colors) == value
+        return colors[value] in suit.colors
+
+    result = []
+    clues = [(COLOR, value) for value in range(len(colors))] + [(RANK, rank) for rank in variant.clue_ranks]
+    for kind, value in clues:
+        touched = 0
+        after = []
+        for slot, ident in enumerate(idents):
+            suit, rank = divmod(ident, NUM_RANKS)
+            hit = touches(kind, value, suit, rank + 1)
+            if hit:
+                touched |= 1 << slot
+            narrowed = 0
+            for candidate_suit, candidate_rank in identities(masks[slot]):
+                if touches(kind, value, candidate_suit, candidate_rank) == hit:
+                    narrowed |= 1 << (candidate_suit * NUM_RANKS + candidate_rank - 1)
+            after.append(narrowed)
+        if not touched:
+            continue
+        new = touched & ~clued
+        chop = next((slot for slot in range(len(idents)) if not clued >> slot & 1), -1)
+        if new:
+            focus = chop if chop >= 0 and new >> chop & 1 else new.bit_length() - 1
+        else:
+            focus = touched.bit_length() - 1
+        result.append(ClueOption(kind, value, touched, new, focus, tuple(after)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clue enumeration: plain loops vs precomputed ClueTable.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--variant", default="Rainbow (6 Suits)")
+    parser.add_argument("--repeat", type=int, default=5, help="Evaluations of each position (a search re-reads them).")
+    args = parser.parse_args()
+
+    variant = get_variant(args.variant)
+    positions = collect_positions(variant, args.games, args.players)
+    print(f"{len(positions)} hands from {args.games} games of '{variant.name}'")
+
+    table = ClueTable(variant)
+    mismatches = sum(
+        1 for idents, masks, clued in positions
+        if list(table.options(idents, masks, clued)) != naive_options(variant, idents, masks, clued)
+    )
+    print(f"mismatches against the plain loops: {mismatches}")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for idents, masks, clued in positions:
+            naive_options(variant, idents, masks, clued)
+    naive_rate = args.repeat * len(positions) / (time.perf_counter() - started)
+
+    table = ClueTable(variant)
+    started = time.perf_counter()
+    for idents, masks, clued in positions:
+        table.options(idents, masks, clued)
+    cold_rate = len(positions) / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for idents, masks, clued in positions:
+            table.options(idents, masks, clued)
+    warm_rate = args.repeat * len(positions) / (time.perf_counter() - started)
+
+    print(f"hands/sec: plain loops {naive_rate:,.0f}, table (cold) {cold_rate:,.0f} ({cold_rate / naive_rate:.1f}x), "
+          f"table (memoized) {warm_rate:,.0f} ({warm_rate / naive_rate:.1f}x)")
+    stats = table.stats()
+    print(f"cache: {stats['entries']} entries, hit rate {stats['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
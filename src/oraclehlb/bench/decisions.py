@@ -0,0 +1,93 @@
+"""
+Задержка решений стратегии на реальных позициях из корпуса партий (см. `oraclehlb.sim.corpus`).
+
+    python -m oraclehlb.bench.decisions --corpus corpus --strategy MonteCarloStrategy --positions 200
+
+Позиция - момент партии, когда ходит выбранный игрок; движок строится так же, как у живого бота:
+действия с его точки зрения (свои карты скрыты) через `GameEngine` + `Knowledge`.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import List
+
+from oraclehlb.core.strategy_loader import load_strategy
+from oraclehlb.game.engine import GameEngine, UNKNOWN
+from oraclehlb.game.knowledge import Knowledge
+from oraclehlb.game.records import RecordStore
+
+log = logging.getLogger(__name__)
+
+
+def sample_positions(store: RecordStore, count: int, seed: int = 0, num_suits: int = 5) -> List[GameEngine]:
+    rng = random.Random(seed)
+    records = [record for record in store.games if record.num_suits == num_suits]
+    positions = []
+    while records and len(positions) < count:
+        record = rng.choice(records)
+        actions = list(store.actions(record))
+        seat = rng.randrange(record.num_players)
+        turns = [
+            index for index, action in enumerate(actions)
+            if action["type"] == "turn" and action["currentPlayerIndex"] == seat
+        ]
+        if not turns:
+            continue
+        stop = rng.choice(turns)
+        engine = GameEngine(
+            num_players=record.num_players, num_suits=num_suits, our_player_index=seat,
+            table_id=record.table_id, player_names=record.players,
+        )
+        engine.knowledge = Knowledge(num_players=record.num_players, num_suits=num_suits)
+        for action in actions[:stop + 1]:
+            if action["type"] == "draw" and action["playerIndex"] == seat:
+                action = {**action, "suitIndex": UNKNOWN, "rank": UNKNOWN}
+            engine.apply(action)
+        positions.append(engine)
+    return positions
+
+
+async def measure(strategy_name: str, positions: List[GameEngine]) -> List[float]:
+    strategy = load_strategy(strategy_name)
+    latencies = []
+    for engine in positions:
+        started = time.perf_counter()
+        await strategy.decide_action(engine.to_model())
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strategy decision latency on real positions from a game corpus.")
+    parser.add_argument("--corpus", type=Path, default=Path("corpus"))
+    parser.add_argument("--strategy", action="append", help="Strategy class; repeat to compare (default SimpleStrategy).")
+    parser.add_argument("--positions", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s - %(levelname)s - %(message)s")
+    with RecordStore(args.corpus) as store:
+        positions = sample_positions(store, args.positions, args.seed)
+    if not positions:
+        print(f"No usable games in {args.corpus}")
+        return
+
+    print(f"{len(positions)} positions from {args.corpus}")
+    print(f"{'strategy':<24} {'mean ms':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name in args.strategy or ["SimpleStrategy"]:
+        latencies = sorted(asyncio.run(measure(name, positions)))
+
+        def pct(q: float, latencies=latencies) -> float:
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+        print(f"{name:<24} {statistics.fmean(latencies) * 1000:>9.2f} {pct(0.5):>9.2f} {pct(0.9):>9.2f} "
+              f"{pct(0.99):>9.2f} {latencies[-1] * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Бенчмарк компактного `GameEngine` против pydantic-модели `GameState`, которую раньше мутировали на каждое действие.
+
+    python -m oraclehlb.bench.engine --games 200
+
+Партии генерируются `FakeTable` фейкового сервера со случайной политикой игроков.
+"""
+import argparse
+import logging
+import random
+import time
+import tracemalloc
+from typing import Dict, Any, List
+
+from oraclehlb.bench.fake_server import FakeTable
+from oraclehlb.game.engine import GameEngine, RANK_COPIES, MAX_CLUE_TOKENS
+from oraclehlb.game.knowledge import Knowledge
+from oraclehlb.models import GameState, Card
+
+log = logging.getLogger(__name__)
+
+
+def generate_game(seed: int, num_players: int, num_suits: int = 5) -> List[Dict[str, Any]]:
+    """Играет одну партию случайными ходами и возвращает действия с точки зрения игрока 0."""
+    rng = random.Random(seed)
+    deck = None
+    if num_suits != 5:
+        deck = [(suit, rank) for suit in range(num_suits) for rank, copies in enumerate(RANK_COPIES, 1) for _ in range(copies)]
+        rng.shuffle(deck)
+    table = FakeTable(1, [f"p{i}" for i in range(num_players)], seed, deck=deck)
+    table.deal()
+    table.start()
+    while not table.finished:
+        seat = table.current_player
+        hand = table.hands[seat]
+        choice = rng.random()
+        if choice < 0.4 and table.clue_tokens > 0:
+            target = (seat + rng.randrange(1, num_players)) % num_players
+            rank = table.cards[rng.choice(table.hands[target])][1]
+            table.apply_client_action(seat, {"type": 3, "target": target, "value": rank})
+        elif choice < 0.7 or table.clue_tokens == MAX_CLUE_TOKENS:
+            table.apply_client_action(seat, {"type": 0, "target": rng.choice(hand)})
+        else:
+            table.apply_client_action(seat, {"type": 1, "target": hand[0]})
+    return [table.visible_to(0, action) for action in table.actions]
+
+
+def apply_to_model(state: GameState, action: Dict[str, Any]):
+    """Прежний подход: мутировать pydantic-модель на каждое действие."""
+    kind = action["type"]
+    if kind == "draw":
+        state.hands.setdefault(action["playerIndex"], []).append(
+            Card(order=action["order"], suit_index=action["suitIndex"], rank=action["rank"])
+        )
+    elif kind in ("play", "discard"):
+        hand = state.hands[action["playerIndex"]]
+        state.hands[action["playerIndex"]] = [card for card in hand if card.order != action["order"]]
+    elif kind == "clue":
+        state.clue_tokens -= 1
+    elif kind == "strike":
+        state.mistake_tokens = 3 - action["num"]
+    elif kind == "status":
+        state.clue_tokens = action["clues"]
+    elif kind == "turn":
+        state.current_player_index = action["currentPlayerIndex"]
+
+
+def new_engine(num_players: int) -> GameEngine:
+    return GameEngine(num_players=num_players, our_player_index=0, table_id=1)
+
+
+def new_engine_with_knowledge(num_players: int) -> GameEngine:
+    engine = new_engine(num_players)
+    engine.knowledge = Knowledge(num_players=num_players)
+    return engine
+
+
+def new_model(num_players: int) -> GameState:
+    return GameState(table_id=1, player_names=[f"p{i}" for i in range(num_players)], our_player_index=0)
+
+
+def measure_memory(factory, apply, games: List[List[Dict[str, Any]]], num_players: int) -> float:
+    """Средний размер живого состояния одной партии (байт) после полного проигрывания."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    states = []
+    for actions in games:
+        state = factory(num_players)
+        for action in actions:
+            apply(state, action)
+        states.append(state)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return size / len(games)
+
+
+def measure_applies(factory, apply, games: List[List[Dict[str, Any]]], num_players: int) -> float:
+    total = 0
+    started = time.perf_counter()
+    for actions in games:
+        state = factory(num_players)
+        for action in actions:
+            apply(state, action)
+        total += len(actions)
+    return total / (time.perf_counter() - started)
+
+
+def measure_copies(states: List[Any], copy, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for state in states:
+            copy(state)
+    return repeat * len(states) / (time.perf_counter() - started)
+
+
+def measure_apply_undo(games: List[List[Dict[str, Any]]], num_players: int) -> float:
+    total = 0
+    started = time.perf_counter()
+    for actions in games:
+        engine = GameEngine(num_players=num_players, our_player_index=0, track_undo=True)
+        for action in actions:
+            engine.apply(action)
+        for _ in actions:
+            engine.undo()
+        total += len(actions)
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GameEngine vs pydantic GameState benchmark.")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=3)
+    args = parser.parse_args()
+
+    games = [generate_game(seed, args.players) for seed in range(args.games)]
+    actions = sum(len(game) for game in games)
+    print(f"{args.games} games, {actions} actions ({actions / args.games:.0f} per game), {args.players} players")
+
+    engine_apply = GameEngine.apply
+    engine_mem = measure_memory(new_engine, engine_apply, games, args.players)
+    model_mem = measure_memory(new_model, apply_to_model, games, args.players)
+    print(f"memory per live game: engine {engine_mem / 1024:.1f} KiB, pydantic {model_mem / 1024:.1f} KiB")
+
+    engine_rate = measure_applies(new_engine, engine_apply, games, args.players)
+    model_rate = measure_applies(new_model, apply_to_model, games, args.players)
+    print(f"applies/sec: engine {engine_rate:,.0f}, pydantic {model_rate:,.0f} ({engine_rate / model_rate:.1f}x)")
+    print(f"apply+undo/sec (engine, undo tracked): {measure_apply_undo(games, args.players):,.0f}")
+    knowledge_rate = measure_applies(new_engine_with_knowledge, engine_apply, games, args.players)
+    print(f"applies/sec with card knowledge: {knowledge_rate:,.0f} ({1e6 / knowledge_rate:.2f} us/action)")
+
+    engines, models = [], []
+    for actions in games[:50]:
+        engine, model = new_engine(args.players), new_model(args.players)
+        for action in actions[:len(actions) // 2]:
+            engine.apply(action)
+            apply_to_model(model, action)
+        engines.append(engine)
+        models.append(model)
+    engine_copies = measure_copies(engines, GameEngine.copy)
+    model_copies = measure_copies(models, lambda state: state.model_copy(deep=True))
+    print(f"copies/sec (mid-game): engine {engine_copies:,.0f}, pydantic deep copy {model_copies:,.0f} "
+          f"({engine_copies / model_copies:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
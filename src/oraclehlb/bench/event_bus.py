@@ -0,0 +1,77 @@
+"""
+Микро-бенчмарк накладных расходов `EventBus.publish` на одно событие.
+
+    python -m oraclehlb.bench.event_bus --events 200000
+
+`LegacyEventBus` повторяет прежнюю реализацию (TaskGroup на каждое событие, f-string в debug-логе)
+и нужен только для сравнения «до/после».
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from oraclehlb.core.event_bus import EventBus, RawMessageReceived, Event
+
+log = logging.getLogger(__name__)
+
+
+class LegacyEventBus:
+    def __init__(self):
+        self._listeners = defaultdict(list)
+
+    def subscribe(self, event_type, listener):
+        self._listeners[event_type].append(listener)
+
+    async def publish(self, event: Event):
+        event_type = type(event)
+        log.debug(f"Publishing event {event_type.__name__}")
+        listeners = self._listeners.get(event_type, [])
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for listener in listeners:
+                    tg.create_task(listener(event))
+        except* Exception as eg:
+            for error in eg.exceptions:
+                log.exception("Exception in event handler", exc_info=error)
+
+
+async def _noop(event: Event):
+    pass
+
+
+async def measure(bus, num_listeners: int, events: int) -> float:
+    """Возвращает среднее время одного publish в микросекундах."""
+    for _ in range(num_listeners):
+        bus.subscribe(RawMessageReceived, _noop)
+    event = RawMessageReceived(message='gameAction {"tableID": 1}')
+    for _ in range(1000):
+        await bus.publish(event)
+
+    started = time.perf_counter()
+    for _ in range(events):
+        await bus.publish(event)
+    return (time.perf_counter() - started) / events * 1e6
+
+
+async def run(events: int):
+    print(f"{'listeners':>9} {'legacy us/event':>16} {'current us/event':>17} {'speedup':>8}")
+    for num_listeners in (0, 1, 3):
+        legacy = await measure(LegacyEventBus(), num_listeners, events)
+        current = await measure(EventBus(), num_listeners, events)
+        print(f"{num_listeners:>9} {legacy:>16.3f} {current:>17.3f} {legacy / current:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EventBus.publish overhead micro-benchmark.")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    asyncio.run(run(args.events))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,563 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import secrets
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from aiohttp import web, WSMsgType
+
+log = logging.getLogger(__name__)
+
+NUM_SUITS = 5
+RANK_COPIES = {1: 3, 2: 2, 3: 2, 4: 2, 5: 1}
+MAX_CLUE_TOKENS = 8
+MAX_STRIKES = 3
+
+# Типы команды `action`: как и настоящий hanab.live, сервер принимает только числа.
+PLAY, DISCARD, COLOR_CLUE, RANK_CLUE = 0, 1, 2, 3
+ACTION_TYPES = frozenset((PLAY, DISCARD, COLOR_CLUE, RANK_CLUE))
+
+
+def hand_size_for(num_players: int) -> int:
+    if num_players <= 3:
+        return 5
+    if num_players <= 5:
+        return 4
+    return 3
+
+
+def _is_int(value: Any) -> bool:
+    # В JSON true/false - не числа, хотя в Python bool - подкласс int
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class InvalidAction(ValueError):
+    """Действие, которое hanab.live отклоняет: стол не меняется, игрок получает `warning` с причиной."""
+
+
+@dataclass
+class FakeClient:
+    """Одно websocket-подключение бота к фейковому серверу."""
+    username: str
+    ws: web.WebSocketResponse
+    sent: int = 0
+    received: int = 0
+    # tableID -> момент отправки `turn`, адресованного этому игроку
+    turn_sent_at: Dict[int, float] = field(default_factory=dict)
+
+
+class FakeTable:
+    """Минимальная, но честная партия Hanabi (масти без особых правил, как в No Variant) на стороне сервера."""
+
+    def __init__(
+            self,
+            table_id: int,
+            players: List[str],
+            seed: int,
+            max_turns: int = 0,
+            deck: Optional[List[Tuple[int, int]]] = None,
+    ):
+        """`deck` - готовая колода (suit, rank) по order вместо перемешанной по `seed`; число мастей берётся из неё."""
+        self.table_id = table_id
+        self.players = players
+        self.seed = seed
+        self.max_turns = max_turns
+
+        if deck is None:
+            deck = [
+                (suit, rank)
+                for suit in range(NUM_SUITS)
+                for rank, copies in RANK_COPIES.items()
+                for _ in range(copies)
+            ]
+            random.Random(seed).shuffle(deck)
+        self.deck = deck
+        self.num_suits = max(suit for suit, _ in deck) + 1
+        self.next_order = 0
+        self.cards: Dict[int, tuple] = {}
+        self.hands: List[List[int]] = [[] for _ in players]
+        self.stacks = [0] * self.num_suits
+        self.clue_tokens = MAX_CLUE_TOKENS
+        self.strikes = 0
+        self.turn = 0
+        self.current_player = 0
+        self.turns_left: Optional[int] = None
+        self.finished = False
+
+        self.actions: List[Dict[str, Any]] = []
+        self.loaded: set = set()
+        self.started = False
+        self.invalid_actions = 0
+
+    @property
+    def score(self) -> int:
+        return sum(self.stacks)
+
+    def init_payload(self, seat: int) -> Dict[str, Any]:
+        return {
+            "tableID": self.table_id,
+            "playerNames": self.players,
+            "ourPlayerIndex": seat,
+            "spectating": False,
+            "shadowing": False,
+            "replay": False,
+            "databaseID": -1,
+            "seed": f"p{len(self.players)}v0s{self.seed}",
+            "options": {
+                "numPlayers": len(self.players),
+                "variantName": "No Variant",
+                "timed": False,
+            },
+        }
+
+    def deal(self):
+        # Как на hanab.live: каждый игрок по очереди получает всю руку (у места 0 - orders 0..h-1),
+        # иначе orders из настоящих экспортов не совпадут с картами в руках
+        hand_size = hand_size_for(len(self.players))
+        for seat in range(len(self.players)):
+            for _ in range(hand_size):
+                self._draw(seat)
+        self._status()
+
+    def _draw(self, seat: int):
+        if self.next_order >= len(self.deck):
+            return
+        order = self.next_order
+        self.next_order += 1
+        suit, rank = self.deck[order]
+        self.cards[order] = (suit, rank)
+        self.hands[seat].append(order)
+        self.actions.append({"type": "draw", "playerIndex": seat, "order": order, "suitIndex": suit, "rank": rank})
+        if self.next_order == len(self.deck) and self.turns_left is None:
+            self.turns_left = len(self.players) + 1
+
+    def _status(self):
+        self.actions.append({"type": "status", "clues": self.clue_tokens, "score": self.score, "maxScore": self.num_suits * 5})
+
+    def _turn(self):
+        self.actions.append({"type": "turn", "num": self.turn, "currentPlayerIndex": self.current_player})
+
+    def start(self):
+        self.started = True
+        self._turn()
+
+    def apply_client_action(self, seat: int, payload: Dict[str, Any]):
+        """
+        Применяет действие игрока. Как и hanab.live, недопустимое действие не исправляется:
+        стол остаётся как был, а `InvalidAction` объясняет причину.
+        """
+        try:
+            action_type = self._check(seat, payload)
+        except InvalidAction:
+            self.invalid_actions += 1
+            raise
+
+        if action_type == PLAY:
+            self._play(seat, payload["target"])
+        elif action_type == DISCARD:
+            self._discard(seat, payload["target"], failed=False)
+        else:
+            self._clue(seat, action_type, payload["target"], payload["value"])
+
+        self._status()
+        self._advance()
+
+    def _check(self, seat: int, payload: Dict[str, Any]) -> int:
+        """Тип допустимого действия; иначе `InvalidAction`."""
+        if self.finished or not self.started:
+            raise InvalidAction("The game is not in progress.")
+        if seat != self.current_player:
+            raise InvalidAction("It is not your turn.")
+        action_type = payload.get("type")
+        if not _is_int(action_type) or action_type not in ACTION_TYPES:
+            raise InvalidAction(f"Unknown action type {action_type!r}")
+        target = payload.get("target")
+        if not _is_int(target):
+            raise InvalidAction(f"Invalid target {target!r}")
+        if action_type in (PLAY, DISCARD):
+            if target not in self.hands[seat]:
+                raise InvalidAction(f"Card {target} is not in the hand of player {seat}")
+            if action_type == DISCARD and self.clue_tokens == MAX_CLUE_TOKENS:
+                raise InvalidAction("Discard with 8 clue tokens")
+            return action_type
+        if self.clue_tokens == 0:
+            raise InvalidAction("Clue without clue tokens")
+        if not 0 <= target < len(self.players) or target == seat:
+            raise InvalidAction(f"Invalid clue target {target!r}")
+        value = payload.get("value")
+        if not _is_int(value):
+            raise InvalidAction(f"Invalid clue value {value!r}")
+        index = 1 if action_type == RANK_CLUE else 0
+        if not any(self.cards[order][index] == value for order in self.hands[target]):
+            raise InvalidAction(f"Clue {value!r} touches no cards")
+        return action_type
+
+    def terminate(self, seat: int, end_condition: int):
+        """Досрочное окончание партии (голосование, время) - действие типа 4 в экспорте hanab.live."""
+        if self.finished:
+            raise InvalidAction("Game is already over")
+        self.finished = True
+        self.actions.append({"type": "gameOver", "endCondition": end_condition, "playerIndex": seat, "votes": None})
+
+    def _play(self, seat: int, order: int):
+        suit, rank = self.cards[order]
+        if self.stacks[suit] + 1 == rank:
+            self.hands[seat].remove(order)
+            self.stacks[suit] = rank
+            if rank == 5 and self.clue_tokens < MAX_CLUE_TOKENS:
+                self.clue_tokens += 1
+            self.actions.append({"type": "play", "playerIndex": seat, "order": order, "suitIndex": suit, "rank": rank})
+            self._draw(seat)
+        else:
+            self.strikes += 1
+            self.actions.append({"type": "strike", "num": self.strikes, "turn": self.turn, "order": order})
+            self._discard(seat, order, failed=True)
+
+    def _discard(self, seat: int, order: int, failed: bool):
+        suit, rank = self.cards[order]
+        self.hands[seat].remove(order)
+        if not failed and self.clue_tokens < MAX_CLUE_TOKENS:
+            self.clue_tokens += 1
+        self.actions.append({
+            "type": "discard", "playerIndex": seat, "order": order,
+            "suitIndex": suit, "rank": rank, "failed": failed,
+        })
+        self._draw(seat)
+
+    def _clue(self, seat: int, clue_type: int, target: int, value: int):
+        index = 1 if clue_type == RANK_CLUE else 0
+        touched = [order for order in self.hands[target] if self.cards[order][index] == value]
+        self.clue_tokens -= 1
+        self.actions.append({
+            "type": "clue",
+            "clue": {"type": 0 if clue_type == COLOR_CLUE else 1, "value": value},
+            "giver": seat,
+            "list": touched,
+            "target": target,
+            "turn": self.turn,
+        })
+
+    def _advance(self):
+        self.turn += 1
+        if self.turns_left is not None:
+            self.turns_left -= 1
+        if (
+                self.strikes >= MAX_STRIKES
+                or self.score == self.num_suits * 5
+                or self.turns_left == 0
+                or (self.max_turns and self.turn >= self.max_turns)
+        ):
+            self.finished = True
+            self.actions.append({"type": "gameOver", "endCondition": 1, "playerIndex": self.current_player, "votes": None})
+            return
+        self.current_player = (self.current_player + 1) % len(self.players)
+        self._turn()
+
+    def visible_to(self, seat: int, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Скрывает от игрока его собственные карты, как это делает hanab.live."""
+        if action["type"] == "draw" and action["playerIndex"] == seat:
+            return {**action, "suitIndex": -1, "rank": -1}
+        return action
+
+
+class FakeHanabLive:
+    """
+    Самодостаточная подмена hanab.live: `/login` выдаёт `hanabi.sid`, `/ws` говорит на протоколе `command {json}`.
+    Как только подключатся все ожидаемые боты, сервер рассаживает их по столам и гоняет партии по кругу.
+    """
+
+    def __init__(
+            self,
+            expected_bots: int = 0,
+            tables: int = 1,
+            players_per_table: int = 2,
+            lobby_rate: float = 0.0,
+            max_turns: int = 0,
+            seed: int = 0,
+    ):
+        self.expected_bots = expected_bots
+        self.num_tables = tables
+        self.players_per_table = players_per_table
+        self.lobby_rate = lobby_rate
+        self.max_turns = max_turns
+        self._random = random.Random(seed)
+
+        self._sessions: Dict[str, str] = {}
+        self._clients: Dict[str, FakeClient] = {}
+        self._tables: Dict[int, FakeTable] = {}
+        self._next_table_id = 1
+        self._tables_started = False
+        self._lobby_task: Optional[asyncio.Task] = None
+
+        self.started_at: Optional[float] = None
+        self.turn_latencies: List[float] = []
+        self.games_finished = 0
+        self.scores: List[int] = []
+        self.invalid_actions = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/login", self._handle_login)
+        app.router.add_get("/ws", self._handle_ws)
+        app.on_shutdown.append(self._on_shutdown)
+        return app
+
+    async def _on_shutdown(self, app: web.Application):
+        if self._lobby_task:
+            self._lobby_task.cancel()
+        for client in list(self._clients.values()):
+            await client.ws.close()
+
+    async def _handle_login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        username = form.get("username")
+        if not username or not form.get("password"):
+            return web.Response(status=401, text="Invalid credentials")
+        token = secrets.token_hex(16)
+        self._sessions[token] = str(username)
+        response = web.Response(text="OK")
+        response.set_cookie("hanabi.sid", token)
+        return response
+
+    async def _handle_ws(self, request: web.Request) -> web.StreamResponse:
+        username = self._sessions.get(request.cookies.get("hanabi.sid", ""))
+        if username is None:
+            return web.Response(status=401, text="Unauthorized")
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        client = FakeClient(username=username, ws=ws)
+        self._clients[username] = client
+        log.info(f"Fake server: '{username}' connected.")
+
+        await self._send(client, "welcome", {"userID": len(self._sessions), "username": username, "totalGames": 0})
+        await self._send(client, "tableList", [self._fake_lobby_table() for _ in range(10)])
+        await self._resume_tables(client)
+        if not self._tables_started and len(self._clients) >= self.expected_bots > 0:
+            self._tables_started = True
+            await self._start_tables()
+
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    client.received += 1
+                    await self._handle_client_message(client, msg.data)
+        finally:
+            if self._clients.get(username) is client:
+                del self._clients[username]
+            log.info(f"Fake server: '{username}' disconnected.")
+        return ws
+
+    async def _send(self, client: FakeClient, command: str, payload: Any):
+        if client.ws.closed:
+            return
+        try:
+            await client.ws.send_str(f"{command} {json.dumps(payload)}")
+        except ConnectionResetError:
+            return
+        client.sent += 1
+
+    async def _handle_client_message(self, client: FakeClient, message: str):
+        command, _, payload_str = message.partition(" ")
+        try:
+            payload = json.loads(payload_str) if payload_str else {}
+        except json.JSONDecodeError:
+            await self._send(client, "warning", {"warning": "Invalid JSON."})
+            return
+
+        table = self._tables.get(payload.get("tableID")) if isinstance(payload, dict) else None
+        if command == "getGameInfo1" and table and client.username in table.players:
+            await self._send(client, "init", table.init_payload(table.players.index(client.username)))
+        elif command == "getGameInfo2" and table and client.username in table.players:
+            seat = table.players.index(client.username)
+            await self._send(client, "gameActionList", {
+                "tableID": table.table_id,
+                "list": [table.visible_to(seat, action) for action in table.actions],
+            })
+            table.loaded.add(client.username)
+            if not table.started and len(table.loaded) == len(table.players):
+                await self._broadcast_new_actions(table, table.start)
+        elif command == "action":
+            if table is None or client.username not in table.players:
+                await self._send(client, "warning", {"warning": "You are not playing at that table."})
+                return
+            seat = table.players.index(client.username)
+            try:
+                await self._broadcast_new_actions(table, lambda: table.apply_client_action(seat, payload))
+            except InvalidAction as e:
+                # Ход не засчитан и остаётся за игроком, как на hanab.live
+                self.invalid_actions += 1
+                await self._send(client, "warning", {"warning": str(e)})
+                return
+            sent_at = client.turn_sent_at.pop(table.table_id, None)
+            if sent_at is not None:
+                self.turn_latencies.append(time.perf_counter() - sent_at)
+            if table.finished:
+                await self._finish_table(table)
+
+    async def _broadcast_new_actions(self, table: FakeTable, mutate):
+        """Выполняет `mutate` и рассылает всем игрокам стола появившиеся действия."""
+        first_new = len(table.actions)
+        mutate()
+        for action in table.actions[first_new:]:
+            for seat, username in enumerate(table.players):
+                client = self._clients.get(username)
+                if client is None:
+                    continue
+                await self._send(client, "gameAction", {
+                    "tableID": table.table_id,
+                    "action": table.visible_to(seat, action),
+                })
+                if action["type"] == "turn" and action["currentPlayerIndex"] == seat:
+                    client.turn_sent_at[table.table_id] = time.perf_counter()
+
+    async def _start_tables(self):
+        self.started_at = time.perf_counter()
+        usernames = sorted(self._clients)
+        if self.players_per_table > len(usernames):
+            log.error("Fake server: not enough bots to seat a single table.")
+            return
+        for index in range(self.num_tables):
+            players = [
+                usernames[(index * self.players_per_table + seat) % len(usernames)]
+                for seat in range(self.players_per_table)
+            ]
+            await self._open_table(players)
+        if self.lobby_rate > 0:
+            self._lobby_task = asyncio.create_task(self._flood_lobby())
+
+    async def _open_table(self, players: List[str]):
+        table = FakeTable(self._next_table_id, players, self._random.randrange(1 << 30), self.max_turns)
+        self._next_table_id += 1
+        table.deal()
+        self._tables[table.table_id] = table
+        for username in players:
+            client = self._clients.get(username)
+            if client:
+                # Как hanab.live: init сервер пришлёт только в ответ на getGameInfo1 клиента
+                await self._send(client, "tableStart", {"tableID": table.table_id, "replay": False})
+
+    async def _resume_tables(self, client: FakeClient):
+        """После переподключения бот снова получает `tableStart` всех своих незавершённых столов."""
+        for table in list(self._tables.values()):
+            if client.username in table.players and not table.finished:
+                await self._send(client, "tableStart", {"tableID": table.table_id, "replay": False})
+
+    async def _finish_table(self, table: FakeTable):
+        self.games_finished += 1
+        self.scores.append(table.score)
+        del self._tables[table.table_id]
+        for username in table.players:
+            client = self._clients.get(username)
+            if client:
+                await self._send(client, "tableGone", {"tableID": table.table_id})
+        await self._open_table(table.players)
+
+    def _fake_lobby_table(self) -> Dict[str, Any]:
+        table_id = self._random.randrange(10_000, 99_999)
+        return {
+            "id": table_id, "name": f"table {table_id}", "passwordProtected": False,
+            "joined": False, "numPlayers": 3, "owned": False, "running": True,
+            "variant": "No Variant", "options": {}, "timed": False, "timeBase": 0,
+            "timePerTurn": 0, "sharedReplay": False, "progress": self._random.randrange(100),
+            "players": ["alice", "bob", "carol"], "spectators": [],
+        }
+
+    async def _flood_lobby(self):
+        """Имитирует поток лобби (`table`/`chat`), который получают все подключения."""
+        interval = 1.0 / self.lobby_rate
+        tick = 0
+        while True:
+            await asyncio.sleep(interval)
+            tick += 1
+            if tick % 2:
+                command, payload = "table", self._fake_lobby_table()
+            else:
+                command, payload = "chat", {
+                    "msg": f"lobby chatter #{tick}", "who": "alice", "discord": False, "server": False,
+                    "datetime": "2025-01-01T00:00:00Z", "room": "lobby", "recipient": "",
+                }
+            for client in list(self._clients.values()):
+                await self._send(client, command, payload)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        return {
+            "elapsed": elapsed,
+            "turn_latencies": list(self.turn_latencies),
+            "sent_per_bot": {name: client.sent for name, client in self._clients.items()},
+            "received_per_bot": {name: client.received for name, client in self._clients.items()},
+            "games_finished": self.games_finished,
+            "scores": list(self.scores),
+            "invalid_actions": self.invalid_actions,
+        }
+
+
+def bind_socket(host: str = "127.0.0.1", port: int = 0) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    return sock
+
+
+async def serve(server: FakeHanabLive, sock: socket.socket) -> web.AppRunner:
+    runner = web.AppRunner(server.build_app(), access_log=None)
+    await runner.setup()
+    await web.SockSite(runner, sock).start()
+    return runner
+
+
+def run_in_process(conn, sock: socket.socket, options: Dict[str, Any]):
+    """
+    Точка входа дочернего процесса бенчмарка: сервер живёт отдельно, чтобы не делить цикл событий с ботами.
+    По команде "stats" из `conn` отдаёт накопленную статистику, по "stop" завершается.
+    """
+
+    async def _main():
+        server = FakeHanabLive(**options)
+        runner = await serve(server, sock)
+        loop = asyncio.get_running_loop()
+        conn.send("ready")
+        try:
+            while True:
+                request = await loop.run_in_executor(None, conn.recv)
+                if request == "stats":
+                    conn.send(server.stats())
+                elif request == "stop":
+                    break
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(_main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local hanab.live stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--bots", type=int, default=2, help="Start tables once this many bots are connected.")
+    parser.add_argument("--tables", type=int, default=1)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--lobby-rate", type=float, default=0.0, help="Lobby frames per second sent to every bot.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = FakeHanabLive(
+        expected_bots=args.bots,
+        tables=args.tables,
+        players_per_table=args.players,
+        lobby_rate=args.lobby_rate,
+        seed=args.seed,
+    )
+    log.info(f"Point config.toml at ws://{args.host}:{args.port}/ws and http://{args.host}:{args.port}/login")
+    web.run_app(server.build_app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Сквозной нагрузочный бенчмарк: N ботов через настоящий `BotManager.run()` против локального фейкового hanab.live.
+
+    python -m oraclehlb.bench.load --bots 8 --tables 4 --players 2 --duration 30
+
+Сервер работает в отдельном процессе, поэтому RSS и задержки относятся только к процессу с ботами.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from oraclehlb.bench import fake_server
+
+log = logging.getLogger(__name__)
+
+
+def rss_bytes() -> int:
+    """Текущий RSS процесса (на Linux через /proc, иначе пиковый RSS из getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def write_config(
+        directory: Path,
+        ws_url: str,
+        auth_url: str,
+        usernames: List[str],
+        strategy: str,
+        decision_workers: int = 0,
+        shared_lobby: bool = True,
+):
+    """Пишет временный config.toml, который подхватит `oraclehlb.config.Settings`."""
+    lines = [
+        f'ws_url = "{ws_url}"', f'auth_url = "{auth_url}"', "reconnect_delay_base = 0.5",
+        f"decision_workers = {decision_workers}", f"shared_lobby = {str(shared_lobby).lower()}",
+        # Бенчмарк меряет игру, а не вход: логины без лимита и без разнесённого старта
+        "login_rate = 0", "startup_stagger = 0", "",
+    ]
+    for username in usernames:
+        lines += ["[[bots]]", f'username = "{username}"', 'password = "bench"', f'strategy = "{strategy}"', ""]
+    (directory / "config.toml").write_text("\n".join(lines), encoding="utf-8")
+
+
+async def run_bots(duration: float, conn) -> Dict[str, Any]:
+    # Импорт откладывается до появления config.toml: реестр ботов и синглтоны сервисов читают настройки при импорте.
+    from oraclehlb.core.bot_manager import BotManager
+
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    manager_task = asyncio.create_task(BotManager().run())
+    await asyncio.sleep(duration)
+
+    loop = asyncio.get_running_loop()
+    conn.send("stats")
+    stats = await loop.run_in_executor(None, conn.recv)
+    rss_after = rss_bytes()
+
+    manager_task.cancel()
+    try:
+        await manager_task
+    except asyncio.CancelledError:
+        pass
+
+    stats["rss_before"] = rss_before
+    stats["rss_after"] = rss_after
+    stats["cpu"] = time.process_time() - cpu_before
+    stats["wall"] = time.perf_counter() - started
+    return stats
+
+
+def build_report(stats: Dict[str, Any], num_bots: int) -> Dict[str, Any]:
+    latencies = sorted(stats["turn_latencies"])
+    elapsed = stats["elapsed"] or stats["wall"]
+    sent = list(stats["sent_per_bot"].values()) or [0]
+    received = list(stats["received_per_bot"].values()) or [0]
+    return {
+        "bots": num_bots,
+        "elapsed_s": round(elapsed, 3),
+        "turns": len(latencies),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p90": round(percentile(latencies, 0.90) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round((latencies[-1] if latencies else 0.0) * 1000, 3),
+            "mean": round((statistics.fmean(latencies) if latencies else 0.0) * 1000, 3),
+        },
+        "msgs_per_sec_per_bot": {
+            "in_mean": round(statistics.fmean(sent) / elapsed, 2) if elapsed else 0.0,
+            "in_min": round(min(sent) / elapsed, 2) if elapsed else 0.0,
+            "out_mean": round(statistics.fmean(received) / elapsed, 2) if elapsed else 0.0,
+        },
+        "rss_per_bot_kib": round((stats["rss_after"] - stats["rss_before"]) / max(num_bots, 1) / 1024, 1),
+        "rss_total_mib": round(stats["rss_after"] / 2 ** 20, 1),
+        "cpu_percent": round(100 * stats["cpu"] / stats["wall"], 1) if stats["wall"] else 0.0,
+        "games_finished": stats["games_finished"],
+        "mean_score": round(statistics.fmean(stats["scores"]), 2) if stats["scores"] else 0.0,
+        "invalid_actions": stats["invalid_actions"],
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    latency = report["latency_ms"]
+    rates = report["msgs_per_sec_per_bot"]
+    print(f"bots={report['bots']} elapsed={report['elapsed_s']}s turns={report['turns']} "
+          f"games={report['games_finished']} mean_score={report['mean_score']} "
+          f"invalid_actions={report['invalid_actions']}")
+    print(f"turn latency ms: p50={latency['p50']} p90={latency['p90']} p99={latency['p99']} "
+          f"max={latency['max']} mean={latency['mean']}")
+    print(f"msgs/sec per bot: in={rates['in_mean']} (min {rates['in_min']}) out={rates['out_mean']}")
+    print(f"rss per bot: {report['rss_per_bot_kib']} KiB (process total {report['rss_total_mib']} MiB)")
+    print(f"bot process cpu: {report['cpu_percent']}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end BotManager load benchmark against a fake hanab.live.")
+    parser.add_argument("--bots", type=int, default=4)
+    parser.add_argument("--tables", type=int, default=2)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--strategy", default="SimpleStrategy")
+    parser.add_argument("--decision-workers", type=int, default=0, help="Worker processes for CPU-bound strategies.")
+    parser.add_argument("--lobby-rate", type=float, default=0.0, help="Lobby frames per second sent to every bot.")
+    parser.add_argument("--per-bot-lobby", action="store_true", help="Every bot parses its own lobby stream.")
+    parser.add_argument("--max-turns", type=int, default=0, help="Cut games short after this many turns (0 = play out).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--json", type=Path, help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    sock = fake_server.bind_socket()
+    port = sock.getsockname()[1]
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server_process = multiprocessing.get_context("spawn").Process(
+        target=fake_server.run_in_process,
+        args=(child_conn, sock, {
+            "expected_bots": args.bots,
+            "tables": args.tables,
+            "players_per_table": args.players,
+            "lobby_rate": args.lobby_rate,
+            "max_turns": args.max_turns,
+            "seed": args.seed,
+        }),
+        daemon=True,
+    )
+    server_process.start()
+    sock.close()
+    parent_conn.recv()
+
+    if args.json:
+        args.json = args.json.resolve()
+    usernames = [f"benchbot{i}" for i in range(args.bots)]
+    workdir = Path(tempfile.mkdtemp(prefix="oraclehlb-bench-"))
+    write_config(workdir, f"ws://127.0.0.1:{port}/ws", f"http://127.0.0.1:{port}/login", usernames, args.strategy,
+                 args.decision_workers, not args.per_bot_lobby)
+    os.chdir(workdir)
+
+    try:
+        stats = asyncio.run(run_bots(args.duration, parent_conn))
+    finally:
+        parent_conn.send("stop")
+        server_process.join(timeout=5)
+
+    report = build_report(stats, args.bots)
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
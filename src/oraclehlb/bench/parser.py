@@ -0,0 +1,111 @@
+"""
+Микро-бенчмарк разбора входящих кадров: прежний путь (split + json.loads + CommandReceived + dict lookup)
+против `ProtocolParser` с ленивым декодированием.
+
+    python -m oraclehlb.bench.parser --frames 100000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import List
+
+from oraclehlb.core.event_bus import EventBus, RawMessageReceived, CommandReceived
+from oraclehlb.services import codec
+from oraclehlb.services.parser import ProtocolParser
+from oraclehlb.services.protocol import GameActionPayload
+
+log = logging.getLogger(__name__)
+
+USERNAME = "oraclebot1"
+
+
+def lobby_frames() -> List[str]:
+    table = {
+        "id": 4242, "name": "come play", "passwordProtected": False, "joined": False, "numPlayers": 4,
+        "owned": False, "running": True, "variant": "No Variant", "options": {}, "timed": False,
+        "timeBase": 0, "timePerTurn": 0, "sharedReplay": False, "progress": 37,
+        "players": ["alice", "bob", "carol", "dave"], "spectators": ["eve"],
+    }
+    chat = {
+        "msg": "anyone up for a 3p game?", "who": "alice", "discord": False, "server": False,
+        "datetime": "2025-08-25T11:26:13.102623235Z", "room": "lobby", "recipient": "",
+    }
+    return [
+        f"table {json.dumps(table)}",
+        f"tableList {json.dumps([table] * 20)}",
+        f"chat {json.dumps(chat)}",
+        f"userList {json.dumps([{'userID': i, 'name': f'user{i}', 'status': 0} for i in range(50)])}",
+    ]
+
+
+def game_frames() -> List[str]:
+    return [
+        'gameAction {"tableID": 7, "action": {"type": "draw", "playerIndex": 1, "order": 12, '
+        '"suitIndex": 3, "rank": 2}}',
+        'gameAction {"tableID": 7, "action": {"type": "turn", "num": 5, "currentPlayerIndex": 0}}',
+    ]
+
+
+async def _noop(payload):
+    pass
+
+
+def legacy_pipeline() -> EventBus:
+    bus = EventBus()
+    handlers = {"chat": _noop, "gameAction": _noop, "table": _noop, "tableList": _noop}
+
+    async def parse(event: RawMessageReceived):
+        try:
+            command, payload_str = event.message.split(" ", 1)
+            payload = json.loads(payload_str)
+            await bus.publish(CommandReceived(command=command, payload=payload))
+        except (ValueError, json.JSONDecodeError):
+            log.error(f"Failed to parse message: '{event.message}'")
+
+    async def dispatch(event: CommandReceived):
+        await handlers.get(event.command, _noop)(event.payload)
+
+    bus.subscribe(RawMessageReceived, parse)
+    bus.subscribe(CommandReceived, dispatch)
+    return bus
+
+
+def current_pipeline() -> EventBus:
+    bus = EventBus()
+    parser = ProtocolParser(bus)
+    parser.register("chat", _noop, prefilter=lambda raw: USERNAME in raw or '"/' in raw)
+    parser.register("gameAction", _noop, schema=GameActionPayload)
+    return bus
+
+
+async def measure(bus: EventBus, frames: List[str], total: int) -> float:
+    """Возвращает среднее время обработки одного кадра в микросекундах."""
+    events = [RawMessageReceived(message=frame) for frame in frames]
+    started = time.perf_counter()
+    for i in range(total):
+        await bus.publish(events[i % len(events)])
+    return (time.perf_counter() - started) / total * 1e6
+
+
+async def run(total: int):
+    print(f"json backend: {codec.BACKEND}")
+    print(f"{'traffic':>8} {'legacy us/frame':>16} {'current us/frame':>17} {'speedup':>8}")
+    for name, frames in (("lobby", lobby_frames()), ("game", game_frames())):
+        legacy = await measure(legacy_pipeline(), frames, total)
+        current = await measure(current_pipeline(), frames, total)
+        print(f"{name:>8} {legacy:>16.3f} {current:>17.3f} {legacy / current:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Protocol parser micro-benchmark.")
+    parser.add_argument("--frames", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Офлайн-переигровка снимка медленного решения (см. `oraclehlb.core.profiler`).
+
+    python -m oraclehlb.bench.replay profiles/20261018-172843-b1-t3-turn12
+    python -m oraclehlb.bench.replay profiles/... --param seed=1 --repeat 5 --collapsed replay.txt
+    flamegraph.pl replay.txt > replay.svg
+
+Состояние из снимка прогоняется через ту же стратегию (с теми же параметрами конструктора, их можно
+переопределить) под сэмплером стека и cProfile: печатаются ход и время каждого прогона, самые дорогие
+функции, а свёрнутые стеки пишутся в файл для flamegraph.pl / speedscope. С `--captured` вместо
+переигровки печатается то, что было снято в момент медленного решения.
+"""
+import argparse
+import asyncio
+import io
+import json
+import pstats
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from oraclehlb.core.profiler import DecisionProfile, PSTATS_FILE, STACKS_FILE, load_capture, load_pstats
+from oraclehlb.core.strategy_loader import load_strategy
+
+
+def print_top(stats: pstats.Stats, top: int):
+    buffer = io.StringIO()
+    stats.stream = buffer
+    stats.sort_stats("cumulative").print_stats(top)
+    print(buffer.getvalue())
+
+
+async def replay(
+        capture: Dict[str, Any], strategy_name: str, params: Dict[str, Any], repeat: int, interval: float,
+) -> Tuple[Counter, Optional[pstats.Stats]]:
+    """Прогоняет решение `repeat` раз; стеки и статистика cProfile суммируются по прогонам."""
+    strategy = load_strategy(strategy_name, params)
+    stacks: Counter = Counter()
+    stats: Optional[pstats.Stats] = None
+    for attempt in range(repeat):
+        profile = DecisionProfile(interval, cprofile=True)
+        started = time.perf_counter()
+        with profile:
+            action = await strategy.decide_action(capture["state"])
+        print(f"run {attempt + 1}: {(time.perf_counter() - started) * 1000:.1f} ms -> {action}")
+        stacks.update(profile.stacks)
+        if stats is None:
+            stats = load_pstats(profile.pstats)
+        else:
+            stats.add(load_pstats(profile.pstats))
+    return stacks, stats
+
+
+def write_collapsed(stacks: Counter, path: str):
+    text = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+    if path == "-":
+        sys.stdout.write(text)
+    else:
+        Path(path).write_text(text, encoding="utf-8")
+        print(f"{sum(stacks.values())} samples, {len(stacks)} stacks written to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a saved slow decision offline under the profilers.")
+    parser.add_argument("capture", type=Path, help="Capture directory written by the decision profiler.")
+    parser.add_argument("--strategy", help="Strategy name (default: the one from the capture).")
+    parser.add_argument("--param", action="append", default=[], help="Override a constructor parameter: name=json_value.")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=0.001, help="Stack sampling interval, seconds.")
+    parser.add_argument("--top", type=int, default=25, help="Rows of the cProfile table.")
+    parser.add_argument("--collapsed", default="", help="Where to write collapsed stacks ('-' = stdout).")
+    parser.add_argument("--captured", action="store_true", help="Show what was captured instead of replaying.")
+    args = parser.parse_args()
+
+    capture = load_capture(args.capture)
+    meta = capture["meta"]
+    state = capture["state"]
+    print(
+        f"{meta['username']} at table {state.table_id}, turn {state.turn}: {meta['strategy']} "
+        f"took {meta['elapsed'] * 1000:.1f} ms ({meta['reason']}), sent {meta['action']}"
+    )
+
+    if args.captured:
+        pstats_path = args.capture / PSTATS_FILE
+        if pstats_path.exists():
+            print_top(pstats.Stats(str(pstats_path)), args.top)
+        stacks_text = (args.capture / STACKS_FILE).read_text(encoding="utf-8")
+        stacks = Counter()
+        for line in stacks_text.splitlines():
+            stack, _, count = line.rpartition(" ")
+            stacks[stack] = int(count)
+        write_collapsed(stacks, args.collapsed or "-")
+        return
+
+    params = dict(meta["strategy_params"])
+    for item in args.param:
+        name, value = item.split("=", 1)
+        params[name] = json.loads(value)
+    stacks, stats = asyncio.run(replay(capture, args.strategy or meta["strategy"], params, args.repeat, args.interval))
+    print_top(stats, args.top)
+    write_collapsed(stacks, args.collapsed or str(args.capture / "stacks.replay.txt"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Время запуска и перезапуска стратегий через реестр (`oraclehlb.core.strategy_loader`).
+
+    python -m oraclehlb.bench.strategies --strategy MonteCarloStrategy --param time_budget=0.05
+
+Каждое измерение - в свежем процессе (spawn), как у процесса-шарда или воркера пула решений:
+поиск стратегий, прогрев класса, первый и повторный экземпляр (повторный - то, что раньше стоил
+каждый перезапуск надзирателя бота), и первое решение в новом воркере пула решений
+без прогрева и с прогревом при запуске воркера.
+"""
+import argparse
+import json
+import multiprocessing
+import pickle
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from oraclehlb.bench.fake_server import FakeTable
+from oraclehlb.core import decision_pool
+from oraclehlb.game.engine import GameEngine
+from oraclehlb.game.knowledge import Knowledge
+
+
+def start_position(num_players: int = 3, seed: int = 0) -> GameEngine:
+    """Первый ход партии с точки зрения игрока 0 (свои карты скрыты)."""
+    table = FakeTable(0, [f"bench{i}" for i in range(num_players)], seed)
+    table.deal()
+    table.start()
+    engine = GameEngine(num_players=num_players, our_player_index=0, player_names=table.players)
+    engine.knowledge = Knowledge(num_players=num_players)
+    engine.apply_all([table.visible_to(0, action) for action in table.actions])
+    return engine
+
+
+def measure_registry(strategy_name: str, params: Dict[str, Any]) -> Dict[str, float]:
+    """В свежем процессе: поиск, прогрев, первый и повторный экземпляр, мс."""
+    started = time.perf_counter()
+    from oraclehlb.core.strategy_loader import strategy_registry
+    strategy_class = strategy_registry.get(strategy_name)
+    discovered = time.perf_counter()
+    strategy_registry.warm_up(strategy_class)
+    warmed = time.perf_counter()
+    strategy_registry.create(strategy_name, params)
+    created = time.perf_counter()
+    strategy_registry.create(strategy_name, params)
+    recreated = time.perf_counter()
+    return {
+        "discover_ms": (discovered - started) * 1000,
+        "warm_up_ms": (warmed - discovered) * 1000,
+        "first_create_ms": (created - warmed) * 1000,
+        "restart_create_ms": (recreated - created) * 1000,
+    }
+
+
+def measure_worker(strategy_name: str, params: Dict[str, Any], warm: bool) -> float:
+    """Первое решение в новом воркере пула решений (после того как воркер запущен), мс."""
+    engine_blob = pickle.dumps(start_position(), protocol=pickle.HIGHEST_PROTOCOL)
+    with ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=decision_pool._init_worker,
+            initargs=((strategy_name,) if warm else (),),
+    ) as executor:
+        executor.submit(decision_pool._ping).result()
+        started = time.perf_counter()
+        executor.submit(decision_pool._decide_in_worker, strategy_name, params, engine_blob).result()
+        return (time.perf_counter() - started) * 1000
+
+
+def _median(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strategy startup/restart time through the strategy registry.")
+    parser.add_argument("--strategy", action="append", help="Strategy name; repeat to compare (default all cpu-bound).")
+    parser.add_argument("--param", action="append", default=[], help="Constructor parameter name=json_value.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    params = {}
+    for item in args.param:
+        name, value = item.split("=", 1)
+        params[name] = json.loads(value)
+    from oraclehlb.core.strategy_loader import strategy_registry
+    names = args.strategy or [name for name, cls in sorted(strategy_registry.classes.items()) if cls.cpu_bound]
+    context = multiprocessing.get_context("spawn")
+
+    print(f"{'strategy':<24} {'discover':>9} {'warm-up':>9} {'create':>9} {'restart':>9} "
+          f"{'1st cold':>9} {'1st warm':>9}   (ms, median of {args.repeat})")
+    for name in names:
+        runs = []
+        for _ in range(args.repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(measure_registry, name, params).result())
+        registry = _median(runs)
+        cold = statistics.median(measure_worker(name, params, warm=False) for _ in range(args.repeat))
+        warm = statistics.median(measure_worker(name, params, warm=True) for _ in range(args.repeat))
+        print(f"{name:<24} {registry['discover_ms']:>9.1f} {registry['warm_up_ms']:>9.1f} "
+              f"{registry['first_create_ms']:>9.2f} {registry['restart_create_ms']:>9.2f} {cold:>9.1f} {warm:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
+import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import toml
 from pydantic import Field, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Пользовательский каталог кэша (кэш вариантов `game.variants`, cookie), а не рабочий каталог
+USER_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "oraclehlb"
+# Пользовательский каталог данных (XDG) - для того, что стоит хранить, а не пересоздавать
+USER_DATA_DIR = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share") / "oraclehlb"
+
 
 class BotConfig(BaseSettings):
     """Конфигурация для одного бота."""
@@ -13,6 +19,8 @@ class BotConfig(BaseSettings):
     username: str
     password: Optional[SecretStr] = None
     strategy: str
+    # Параметры конструктора стратегии (таблица `[bots.strategy_params]` в config.toml)
+    strategy_params: Dict[str, Any] = {}
 
 
 class Settings(BaseSettings):
@@ -27,6 +35,71 @@ class Settings(BaseSettings):
     auth_url: str = "https://hanab.live/login"
     reconnect_delay_base: float = 2.0
     reconnect_delay_max: float = 60.0
+    # Предохранитель: после стольких неудачных подключений подряд (по всем ботам) пробует только одно соединение
+    circuit_failure_threshold: int = 5
+    # Сколько секунд ждать до первой пробы после размыкания (дальше растёт до reconnect_delay_max)
+    circuit_open_seconds: float = 10.0
+    # После успешной пробы остальные боты подключаются вразброс в пределах этого окна
+    circuit_release_window: float = 5.0
+    # Соединение, закрытое сервером раньше, считается неудачным подключением (пауза растёт, предохранитель считает)
+    connection_stable_seconds: float = 5.0
+    # Процессы для CPU-тяжёлых стратегий (0 - решения считаются в event loop и останавливают все websocket'ы)
+    decision_workers: int = 1
+    # Таймаут одного решения, после которого отправляется запасной ход стратегии
+    decision_timeout: float = 10.0
+    # Обдумывание наперёд: пока ходит игрок перед нами, считать решения для ponder_states самых вероятных
+    # состояний к нашему ходу (нагружает CPU и пул решений между нашими ходами)
+    ponder: bool = False
+    ponder_states: int = 8
+    # Лобби (tableList/table/user...) разбирается один раз на все боты процесса, а не каждым ботом
+    shared_lobby: bool = True
+    # Предел очереди исходящих команд одного подключения (ходы в партиях не отбрасываются никогда)
+    send_queue_size: int = 256
+    # Предел принятых, но ещё не обработанных кадров одного подключения (дальше чтение ждёт)
+    receive_queue_size: int = 1024
+    # Кэш сессионных cookie между перезапусками (пустая строка - без кэша) и срок жизни записи, сек
+    cookie_cache_path: str = str(USER_CACHE_DIR / "cookies.json")
+    cookie_ttl: float = 86400.0
+    # Общий лимит логинов всех ботов: в среднем login_rate в секунду, всплеск до login_burst (0 - без лимита)
+    login_rate: float = 0.5
+    login_burst: int = 3
+    # Разнесённый старт: бот i стартует через i * startup_stagger сек плюс случайная добавка до startup_stagger
+    startup_stagger: float = 0.2
+    # Шардирование: боты делятся между shard_count процессами (0 - по числу ядер), у каждого свой event loop;
+    # родитель перезапускает упавшие шарды и пересылает между ними глобальные события. Лимит логинов
+    # и decision_workers делятся между шардами, метрики шарда i - на metrics_port + 1 + i
+    sharded: bool = False
+    shard_count: int = 0
+    # Профилирование медленных решений (`core.profiler`): каталог снимков ("" - выключено); решения дольше
+    # profile_threshold сек (0 - без порога) и доля profile_sample_rate ходов (ещё и под cProfile)
+    # сохраняются со свёрнутыми стеками сэмплера (раз в profile_interval сек), хранятся последние profile_keep
+    profile_path: str = ""
+    profile_threshold: float = 1.0
+    profile_sample_rate: float = 0.0
+    profile_keep: int = 50
+    profile_interval: float = 0.005
+    # Метрики (счётчики и гистограммы задержек); выключенные почти ничего не стоят
+    metrics_enabled: bool = False
+    # HTTP-эндпоинт /metrics (формат Prometheus) и /health; порт 0 - без HTTP
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 9108
+    # Раз в столько секунд сводка метрик пишется в лог (0 - не писать)
+    metrics_dump_interval: float = 60.0
+    # Каталог хранилища сыгранных партий ("" - не записывать)
+    record_path: str = str(USER_DATA_DIR / "records")
+    # Логирование: уровень консоли и файла, файл ("" - без файла)
+    log_level: str = "INFO"
+    log_file: str = str(USER_DATA_DIR / "logs" / "oraclehlb.log")
+    log_file_level: str = "DEBUG"
+    # Ротация файла: "size" (log_max_bytes), "time" (log_rotate_when, например "midnight") или "none"
+    log_rotation: str = "size"
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_rotate_when: str = "midnight"
+    log_backup_count: int = 5
+    # Писать файл JSON-строками с именем бота и номером стола
+    log_json: bool = False
+    # Уровни отдельных модулей, например {"oraclehlb.core.event_bus" = "WARNING"}
+    log_levels: Dict[str, str] = Field(default_factory=dict)
     bots: List[BotConfig] = Field(default_factory=list)
 
     @model_validator(mode='before')
@@ -60,5 +133,27 @@ class Settings(BaseSettings):
         return self
 
 
+class _LazySettings:
+    """
+    Синглтон настроек: config.toml читается при первом обращении к настройке, а не при импорте,
+    так что модули, которым настройки не нужны (шина событий, движок, симулятор), импортируются без него.
+    """
+    __slots__ = ("_settings",)
+
+    def __init__(self):
+        object.__setattr__(self, "_settings", None)
+
+    def _load(self) -> Settings:
+        if self._settings is None:
+            object.__setattr__(self, "_settings", Settings())
+        return self._settings
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._load(), name, value)
+
+
 # Синглтон
-settings = Settings()
+settings: Settings = _LazySettings()  # type: ignore[assignment]
@@ -1,9 +1,17 @@
 import logging
+from typing import Optional
 
 from oraclehlb.ai.base import BaseStrategy
-from oraclehlb.core.event_bus import EventBus, OurTurn
+from oraclehlb.core.decision_pool import DecisionPool
+from oraclehlb.config import settings
+from oraclehlb.core.event_bus import EventBus, OurTurn, TheirTurn, GameFinished
+from oraclehlb.core.metrics import metrics
+from oraclehlb.core.ponder import Ponderer
+from oraclehlb.core.profiler import decision_profiler
+from oraclehlb.services.lobby import SharedLobby, LobbyClient
 from oraclehlb.services.network import NetworkService
 from oraclehlb.services.parser import ProtocolParser
+from oraclehlb.services.recorder import game_recorder
 from oraclehlb.services.state import GameStateManager
 
 log = logging.getLogger(__name__)
@@ -12,32 +20,79 @@ log = logging.getLogger(__name__)
 class HanabiBot:
     """Оркестратор для одного экземпляра бота. Собирает сервисы вместе."""
 
-    def __init__(self, username: str, cookie: str, strategy: BaseStrategy):
+    def __init__(
+            self,
+            username: str,
+            cookie: str,
+            strategy: BaseStrategy,
+            decision_pool: Optional[DecisionPool] = None,
+            lobby: Optional[SharedLobby] = None,
+    ):
         self.username = username
         self.strategy = strategy
+        self._decisions = decision_pool or DecisionPool()
 
         # Каждый бот имеет свою собственную, изолированную шину событий.
         event_bus = EventBus()
 
         # Собираем сервисы, передавая им только то, что им нужно.
         # Глобальные настройки (URL, задержки) они могут взять из импортированного `settings`.
-        network_service = NetworkService(cookie=cookie, event_bus=event_bus)
-        ProtocolParser(event_bus=event_bus)  # Не требует хранения, работает через подписку
+        network_service = NetworkService(cookie=cookie, event_bus=event_bus, username=username)
+        parser = ProtocolParser(event_bus=event_bus)  # Сам подписывается на сырые сообщения
         GameStateManager(
             username=username,
             event_bus=event_bus,
-            network_service=network_service
+            network_service=network_service,
+            parser=parser,
         )
+        # Без общего лобби у бота собственный индекс, который он разбирает сам
+        self.lobby = lobby or SharedLobby()
+        LobbyClient(username=username, lobby=self.lobby, event_bus=event_bus, parser=parser)
+
+        if hasattr(strategy, "last_stats"):
+            # Статистика последнего поиска (MonteCarloStrategy) идёт в метрики как gauge
+            metrics.add_collector("oraclehlb_strategy", lambda: strategy.last_stats, bot=username)
 
         event_bus.subscribe(OurTurn, self._handle_our_turn)
+        # Обдумывание наперёд (опционально): решения для вероятных состояний считаются, пока ходит другой игрок
+        self._ponderer: Optional[Ponderer] = None
+        if settings.ponder:
+            self._ponderer = Ponderer(strategy, self._decisions, username, settings.ponder_states)
+            event_bus.subscribe(TheirTurn, self._handle_their_turn)
+            event_bus.subscribe(GameFinished, self._handle_game_over)
+        if game_recorder.enabled:
+            event_bus.subscribe(GameFinished, self._handle_game_finished)
         self._network = network_service
 
     async def _handle_our_turn(self, event: OurTurn):
-        log.info(f"[{self.username}] It's our turn at table {event.state.table_id}!")
-        action_payload = await self.strategy.decide_action(event.state)
+        log.info("[%s] It's our turn at table %s!", self.username, event.state.table_id)
+        action_payload = None
+        if self._ponderer is not None:
+            action_payload = await self._ponderer.take(event.state)
+        if action_payload is None:
+            if decision_profiler.enabled:
+                # Медленное (или выбранное случайно) решение сохраняется с профилем и снимком состояния
+                pending = decision_profiler.begin(event.state)
+                action_payload = await self._decisions.decide(self.strategy, event.state, pending.profile)
+                decision_profiler.finish(pending, self.strategy, self.username, action_payload)
+            else:
+                action_payload = await self._decisions.decide(self.strategy, event.state)
         action_payload["tableID"] = event.state.table_id
-        await self._network.send_command("action", action_payload)
+        await self._network.send_command("action", action_payload, turn=event.state.turn)
+
+    async def _handle_their_turn(self, event: TheirTurn):
+        self._ponderer.start(event.engine)
+
+    async def _handle_game_over(self, event: GameFinished):
+        self._ponderer.cancel(event.engine.table_id)
+
+    async def _handle_game_finished(self, event: GameFinished):
+        game_recorder.record(event, type(self.strategy).__name__)
 
     async def run(self):
-        log.info(f"[{self.username}] Starting bot instance...")
-        await self._network.run()
+        log.info("[%s] Starting bot instance...", self.username)
+        try:
+            await self._network.run()
+        finally:
+            if self._ponderer is not None:
+                self._ponderer.cancel_all()
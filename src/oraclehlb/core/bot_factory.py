@@ -1,24 +1,40 @@
-from oraclehlb.config import BotConfig
+from typing import Dict
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.config import BotConfig, settings
 from oraclehlb.core.bot import HanabiBot
-from oraclehlb.core.strategy_loader import load_strategy  # <--- Импорт изменен
+from oraclehlb.core.decision_pool import DecisionPool
+from oraclehlb.core.strategy_loader import load_strategy
 from oraclehlb.services.auth import AuthService
+from oraclehlb.services.lobby import shared_lobby
 
 
 class BotFactory:
     """Отвечает за создание и конфигурацию одного экземпляра HanabiBot."""
-    def __init__(self, auth_service: AuthService):
+    def __init__(self, auth_service: AuthService, decision_pool: DecisionPool):
         self._auth_service = auth_service
+        self._decision_pool = decision_pool
+        # Стратегия бота переживает перезапуски надзирателя: не создаётся заново и сохраняет свои кэши
+        self._strategies: Dict[str, BaseStrategy] = {}
+
+    def invalidate_session(self, username: str):
+        self._auth_service.invalidate(username)
 
     async def create_bot(self, bot_config: BotConfig) -> HanabiBot:
         """Создает, аутентифицирует и собирает экземпляр бота."""
+        strategy = self._strategies.get(bot_config.username)
+        if strategy is None:
+            strategy = load_strategy(bot_config.strategy, bot_config.strategy_params)
+            self._strategies[bot_config.username] = strategy
+
         auth_cookie = await self._auth_service.authenticate(bot_config)
         if not auth_cookie:
             raise ConnectionRefusedError(f"Authentication failed for {bot_config.username}")
 
-        strategy_instance = load_strategy(bot_config.strategy)
-
         return HanabiBot(
             username=bot_config.username,
             cookie=auth_cookie,
-            strategy=strategy_instance
+            strategy=strategy,
+            decision_pool=self._decision_pool,
+            lobby=shared_lobby if settings.shared_lobby else None,
         )
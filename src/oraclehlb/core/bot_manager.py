@@ -1,43 +1,146 @@
 import asyncio
 import logging
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import aiohttp
 
-from oraclehlb.config import settings
+from oraclehlb.config import settings, BotConfig
 from oraclehlb.core.bot_factory import BotFactory
+from oraclehlb.core.decision_pool import DecisionPool
+from oraclehlb.core.metrics import metrics
+from oraclehlb.core.profiler import decision_profiler
+from oraclehlb.core.strategy_loader import strategy_registry
+from oraclehlb.core.rate_limit import TokenBucket
+from oraclehlb.core.reconnect import BotHealth, reconnect_coordinator
+from oraclehlb.logging_setup import current_bot
 from oraclehlb.services.auth import AuthService
+from oraclehlb.services.cookie_cache import CookieCache
+from oraclehlb.services.monitoring import MonitoringServer, dump_periodically
+from oraclehlb.services.network import SessionRejected
+from oraclehlb.services.recorder import game_recorder
 
 log = logging.getLogger(__name__)
 
 
+def configure_services():
+    """
+    Настраивает синглтоны процесса, которые сами config.toml не читают: метрики, профилировщик решений
+    и запись партий. Вызывается при старте процесса (и процесса-шарда), до первого бота.
+    """
+    metrics.configure(settings.metrics_enabled)
+    decision_profiler.configure(
+        Path(settings.profile_path) if settings.profile_path else None,
+        threshold=settings.profile_threshold,
+        sample_rate=settings.profile_sample_rate,
+        keep=settings.profile_keep,
+        interval=settings.profile_interval,
+    )
+    game_recorder.configure(Path(settings.record_path).expanduser() if settings.record_path else None)
+
+
+async def start_monitoring(
+        health: Callable[[], Dict[str, Any]],
+) -> Tuple[Optional[MonitoringServer], Optional[asyncio.Task]]:
+    """HTTP-эндпоинт и периодическая сводка метрик, если метрики включены."""
+    server = dump_task = None
+    if not metrics.enabled:
+        return server, dump_task
+    if settings.metrics_port:
+        server = MonitoringServer(metrics, health, settings.metrics_host, settings.metrics_port)
+        try:
+            await server.start()
+        except OSError:
+            log.exception("Could not start the monitoring endpoint")
+            server = None
+    if settings.metrics_dump_interval > 0:
+        dump_task = asyncio.create_task(dump_periodically(metrics, settings.metrics_dump_interval))
+    return server, dump_task
+
+
 class BotManager:
-    def __init__(self):
-        self._configs = settings.bots
-        self._reconnect_delay = settings.reconnect_delay_base
+    def __init__(self, configs: Optional[List[BotConfig]] = None):
+        # Все боты из конфигурации или часть из них (процесс-шард, см. `core.shards`)
+        self._configs = settings.bots if configs is None else configs
+        self._reconnect = reconnect_coordinator
+        self._reconnect.configure(
+            settings.reconnect_delay_base,
+            settings.reconnect_delay_max,
+            settings.circuit_failure_threshold,
+            settings.circuit_open_seconds,
+            settings.circuit_release_window,
+            settings.connection_stable_seconds,
+        )
+        metrics.add_collector("oraclehlb_circuit", self._reconnect.circuit_stats)
+        # Один пул процессов на всех ботов
+        self._decision_pool = DecisionPool(settings.decision_workers, settings.decision_timeout)
 
-    async def _launch_bot_supervisor(self, factory: BotFactory, bot_config):
+    async def _launch_bot_supervisor(self, factory: BotFactory, bot_config, start_delay: float = 0.0):
         """Надзиратель, который перезапускает одного бота в случае сбоя."""
-        log.info(f"Starting supervisor for bot '{bot_config.username}'.")
+        current_bot.set(bot_config.username)
+        log.info("Starting supervisor for bot '%s'.", bot_config.username)
+        try:
+            await asyncio.sleep(start_delay)
+        except asyncio.CancelledError:
+            return
+        username = bot_config.username
         while True:
             try:
+                await self._reconnect.set_health(username, BotHealth.AUTHENTICATING)
                 bot = await factory.create_bot(bot_config)
                 await bot.run()
             except asyncio.CancelledError:
-                log.info(f"Supervisor for '{bot_config.username}' cancelled.")
+                log.info("Supervisor for '%s' cancelled.", username)
                 break
-            except Exception:
-                log.exception(f"Bot '{bot_config.username}' crashed. Restarting after {self._reconnect_delay}s...")
-                await asyncio.sleep(self._reconnect_delay)
+            except SessionRejected:
+                log.warning("Session of '%s' was rejected, logging in again.", username)
+                factory.invalidate_session(username)
+            except Exception as e:
+                log.exception("Bot '%s' crashed.", username)
+                try:
+                    await self._reconnect.failed(username, f"Bot crashed: {e!r}", crashed=True)
+                except asyncio.CancelledError:
+                    break
+        await self._reconnect.set_health(username, BotHealth.STOPPED)
+
+    def health(self):
+        """Состояние предохранителя и каждого бота (для мониторинга)."""
+        return self._reconnect.health()
 
     async def run(self):
         """Запускает и управляет всеми ботами."""
-        # Создаем одну сессию для всех сервисов аутентификации
-        async with aiohttp.ClientSession() as session:
-            auth_service = AuthService(settings.auth_url, session)
-            factory = BotFactory(auth_service)
-
-            tasks = [
-                asyncio.create_task(self._launch_bot_supervisor(factory, bot_cfg))
-                for bot_cfg in self._configs
-            ]
-            await asyncio.gather(*tasks)
+        # Ошибки в именах и параметрах стратегий - до первого логина, а не после аутентификации
+        strategy_registry.prepare(self._configs)
+        self._decision_pool.start(sorted({
+            config.strategy for config in self._configs if strategy_registry.get(config.strategy).cpu_bound
+        }))
+        server, dump_task = await start_monitoring(self.health)
+        try:
+            # Создаем одну сессию для всех сервисов аутентификации
+            async with aiohttp.ClientSession() as session:
+                auth_service = AuthService(
+                    settings.auth_url,
+                    session,
+                    cookie_cache=CookieCache(
+                        Path(settings.cookie_cache_path).expanduser() if settings.cookie_cache_path else None,
+                        settings.cookie_ttl,
+                    ),
+                    limiter=TokenBucket(settings.login_rate, settings.login_burst),
+                )
+                factory = BotFactory(auth_service, self._decision_pool)
+
+                stagger = settings.startup_stagger
+                tasks = [
+                    asyncio.create_task(self._launch_bot_supervisor(
+                        factory, bot_cfg, index * stagger + random.uniform(0, stagger),
+                    ))
+                    for index, bot_cfg in enumerate(self._configs)
+                ]
+                await asyncio.gather(*tasks)
+        finally:
+            if dump_task is not None:
+                dump_task.cancel()
+            if server is not None:
+                await server.stop()
+            self._decision_pool.shutdown()
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import multiprocessing
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, Awaitable, Sequence, Tuple
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.core.metrics import metrics
+from oraclehlb.core.profiler import DecisionProfile
+from oraclehlb.core.strategy_loader import load_strategy, strategy_registry
+from oraclehlb.models import GameState
+
+log = logging.getLogger(__name__)
+
+# --- Сторона воркера ---
+
+# Экземпляры стратегий живут в процессе-воркере между решениями (кэш по имени в реестре и параметрам)
+_worker_strategies: Dict[Tuple[str, str], BaseStrategy] = {}
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker(warm_up: Sequence[str] = ()):
+    global _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+    # Импорт и таблицы стратегий - при запуске воркера, а не в первом решении
+    for strategy_name in warm_up:
+        try:
+            strategy_registry.warm_up(strategy_registry.get(strategy_name))
+        except Exception:
+            log.exception("Could not warm up strategy '%s' in a decision worker.", strategy_name)
+
+
+def _ping() -> bool:
+    return True
+
+
+def _worker_strategy(strategy_name: str, params: Dict[str, Any]) -> BaseStrategy:
+    key = (strategy_name, repr(sorted(params.items())))
+    strategy = _worker_strategies.get(key)
+    if strategy is None:
+        strategy = _worker_strategies[key] = load_strategy(strategy_name, params)
+    return strategy
+
+
+def _decide_in_worker(strategy_name: str, params: Dict[str, Any], engine_blob: bytes) -> Dict[str, Any]:
+    """Выполняется в процессе-воркере: движок приходит в компактном виде (`GameEngine.__getstate__`)."""
+    engine = pickle.loads(engine_blob)
+    strategy = _worker_strategy(strategy_name, params)
+    return _worker_loop.run_until_complete(strategy.decide_action(engine.to_model()))
+
+
+def _profile_in_worker(
+        strategy_name: str, params: Dict[str, Any], engine_blob: bytes, profile: DecisionProfile,
+) -> Tuple[Dict[str, Any], DecisionProfile]:
+    """То же под профилировщиком (`core.profiler`): снятый профиль возвращается вместе с решением."""
+    engine = pickle.loads(engine_blob)
+    strategy = _worker_strategy(strategy_name, params)
+    with profile:
+        action = _worker_loop.run_until_complete(strategy.decide_action(engine.to_model()))
+    return action, profile
+
+
+# --- Сторона event loop ---
+
+class DecisionPool:
+    """
+    Общий для всех ботов исполнитель решений стратегий.
+
+    Стратегии с `cpu_bound = True` при `workers > 0` считаются в `ProcessPoolExecutor`,
+    чтобы глубокий поиск одного бота не останавливал websocket'ы остальных; в воркер уходит
+    только компактное состояние движка. Остальные стратегии выполняются прямо в event loop.
+    На каждое решение действует таймаут: по его истечении (или при ошибке) отправляется
+    `strategy.fallback_action(state)`. Если воркер умер (OOM, сигнал) и пул сломан (`BrokenProcessPool`),
+    пул пересоздаётся с тем же прогревом, а упавшее решение заменяется запасным ходом.
+    """
+
+    def __init__(self, workers: int = 0, timeout: float = 10.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warm_up: Tuple[str, ...] = ()
+
+    def start(self, warm_up: Sequence[str] = ()):
+        """`warm_up` - стратегии (имена в реестре), которые воркеры прогревают сразу при запуске."""
+        self._warm_up = tuple(warm_up)
+        if self.workers > 0 and self._executor is None:
+            # spawn: воркеры не наследуют состояние event loop и открытые сокеты родителя
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._warm_up,),
+            )
+            # Поднимаем процессы заранее, чтобы первое решение не ждало запуска интерпретатора
+            for _ in range(self.workers):
+                self._executor.submit(_ping)
+            log.info("Decision pool started with %d worker processes.", self.workers)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _recover(self, broken: Optional[ProcessPoolExecutor]):
+        """Пересоздаёт сломанный пул; решения, упавшие вместе с ним, пересоздают его только один раз."""
+        if broken is None or broken is not self._executor:
+            return
+        log.error("A decision worker died, restarting the decision pool.")
+        metrics.counter("oraclehlb_decision_pool_restarts_total", "Decision pool restarts after a worker died").inc()
+        self.shutdown()
+        self.start(self._warm_up)
+
+    def _submit(
+            self, strategy: BaseStrategy, state: GameState, profile: Optional[DecisionProfile] = None,
+    ) -> Awaitable[Dict[str, Any]]:
+        if strategy.cpu_bound and self._executor is not None and state.engine is not None:
+            # Сериализуем сразу: пока решение в очереди, живой движок может измениться
+            engine_blob = pickle.dumps(state.engine, protocol=pickle.HIGHEST_PROTOCOL)
+            loop = asyncio.get_running_loop()
+            args = (strategy.strategy_name or type(strategy).__name__, strategy.strategy_params, engine_blob)
+            if profile is None:
+                return loop.run_in_executor(self._executor, _decide_in_worker, *args)
+            future = loop.run_in_executor(self._executor, _profile_in_worker, *args, profile)
+            future.add_done_callback(lambda done: self._collect_profile(done, profile))
+            profile.completion = future
+            return self._profiled_in_worker(future)
+        if profile is None:
+            return strategy.decide_action(state)
+        return self._profiled_in_loop(strategy.decide_action(state), profile)
+
+    @staticmethod
+    def _collect_profile(future: asyncio.Future, profile: DecisionProfile):
+        # Срабатывает и после таймаута хода: профиль досчитанного решения всё равно попадёт в снимок
+        if not future.cancelled() and future.exception() is None:
+            profile.update(future.result()[1])
+
+    @staticmethod
+    async def _profiled_in_worker(future: asyncio.Future) -> Dict[str, Any]:
+        # shield: таймаут хода не должен отменять future воркера, иначе его профиль теряется
+        action, _ = await asyncio.shield(future)
+        return action
+
+    @staticmethod
+    async def _profiled_in_loop(decision: Awaitable[Dict[str, Any]], profile: DecisionProfile) -> Dict[str, Any]:
+        with profile:
+            return await decision
+
+    async def decide(
+            self, strategy: BaseStrategy, state: GameState, profile: Optional[DecisionProfile] = None,
+    ) -> Dict[str, Any]:
+        """`profile` - профиль решения (`core.profiler`), который заполняется, где бы решение ни считалось."""
+        started = time.perf_counter()
+        executor = self._executor
+        try:
+            action = await asyncio.wait_for(self._submit(strategy, state, profile), self.timeout)
+            if metrics.enabled:
+                metrics.histogram(
+                    "oraclehlb_decision_seconds", "Strategy decision latency", strategy=type(strategy).__name__,
+                ).observe(time.perf_counter() - started)
+            return action
+        except asyncio.TimeoutError:
+            log.warning(
+                "Decision at table %s timed out after %.1fs, sending fallback action.",
+                state.table_id, time.perf_counter() - started,
+            )
+        except BrokenProcessPool:
+            log.warning("Decision at table %s lost with its worker, sending fallback action.", state.table_id)
+            self._recover(executor)
+        except Exception:
+            log.exception("Decision at table %s failed, sending fallback action.", state.table_id)
+        metrics.counter(
+            "oraclehlb_decision_fallbacks_total", "Decisions replaced by the fallback action",
+            strategy=type(strategy).__name__,
+        ).inc()
+        return strategy.fallback_action(state)
+
+    async def ponder(self, strategy: BaseStrategy, state: GameState) -> Optional[Dict[str, Any]]:
+        """
+        Решение для предсказанного состояния (см. `core.ponder`): тем же путём, что и `decide`,
+        но без запасного хода - при ошибке или таймауте None. Отмена снимает решение в event loop,
+        а решение, уже начатое в процессе-воркере, досчитывается там и отбрасывается.
+        """
+        executor = self._executor
+        try:
+            return await asyncio.wait_for(self._submit(strategy, state), self.timeout)
+        except asyncio.TimeoutError:
+            log.debug("Pondering at table %s timed out.", state.table_id)
+        except BrokenProcessPool:
+            self._recover(executor)
+        except Exception:
+            log.debug("Pondering at table %s failed.", state.table_id, exc_info=True)
+        return None
@@ -1,9 +1,11 @@
 import asyncio
 import logging
+import time
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, Any, Type, List, Callable, Awaitable
+from typing import Dict, Any, Type, List, Callable, Awaitable, Tuple
 
+from oraclehlb.core.metrics import metrics
 from oraclehlb.models import GameState
 
 log = logging.getLogger(__name__)
@@ -30,20 +32,85 @@ class OurTurn(Event):
     state: GameState
 
 
+@dataclass
+class TheirTurn(Event):
+    """
+    Ход перешёл к другому игроку (для обдумывания наперёд). `engine` - живой движок стола:
+    он изменится со следующим действием, поэтому слушатель копирует его сразу, до первого await.
+    """
+    engine: Any
+
+
+@dataclass
+class ConnectionStateChanged(Event):
+    """WebSocket бота подключился (`connected=True`) или соединение потеряно."""
+    connected: bool
+
+
+@dataclass
+class GameFinished(Event):
+    """Партия, которую бот видел вживую, закончилась (`gameOver`): полная история и параметры стола."""
+    engine: Any
+    actions: List[Dict[str, Any]]
+    seed: str
+    variant: str
+
+
+Listener = Callable[[Event], Awaitable[None]]
+
+
 class EventBus:
-    """Асинхронная шина событий."""
+    """
+    Асинхронная шина событий.
+    Подписка на базовый класс получает и все его подклассы (по MRO).
+    """
 
     def __init__(self):
-        self._listeners: Dict[Type[Event], List[Callable[[Event], Awaitable[None]]]] = defaultdict(list)
+        self._listeners: Dict[Type[Event], List[Listener]] = defaultdict(list)
+        # Предвычисленная таблица: точный тип события -> кортеж слушателей по всему MRO.
+        # Сбрасывается при каждой подписке, поэтому на горячем пути только один dict lookup.
+        self._dispatch_table: Dict[Type[Event], Tuple[Listener, ...]] = {}
+        if metrics.enabled:
+            # Замер подменяет метод только у этого экземпляра: без метрик publish не меняется
+            self._publish_histograms = {}
+            self.publish = self._publish_measured
 
     def subscribe[T](self, event_type: Type[T], listener: Callable[[T], Awaitable[None]]):
         self._listeners[event_type].append(listener)
-        log.debug(f"Listener {listener.__name__} subscribed to {event_type.__name__}")
+        self._dispatch_table.clear()
+        log.debug("Listener %s subscribed to %s", listener.__name__, event_type.__name__)
+
+    def listeners_for(self, event_type: Type[Event]) -> Tuple[Listener, ...]:
+        listeners = self._dispatch_table.get(event_type)
+        if listeners is None:
+            listeners = tuple(
+                listener
+                for cls in event_type.__mro__
+                for listener in self._listeners.get(cls, ())
+            )
+            self._dispatch_table[event_type] = listeners
+        return listeners
+
+    def has_listeners(self, event_type: Type[Event]) -> bool:
+        return bool(self.listeners_for(event_type))
 
     async def publish(self, event: Event):
         event_type = type(event)
-        log.debug(f"Publishing event {event_type.__name__}")
-        listeners = self._listeners.get(event_type, [])
+        listeners = self._dispatch_table.get(event_type)
+        if listeners is None:
+            listeners = self.listeners_for(event_type)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Publishing event %s to %d listener(s)", event_type.__name__, len(listeners))
+
+        # Быстрый путь: без слушателей и с одним слушателем обходимся без TaskGroup и задач.
+        if not listeners:
+            return
+        if len(listeners) == 1:
+            try:
+                await listeners[0](event)
+            except Exception:
+                log.exception("Exception in event handler")
+            return
 
         # Python 3.11+ TaskGroup - для структурированного параллелизма
         try:
@@ -54,3 +121,18 @@ class EventBus:
             # Логируем все исключения из группы
             for error in eg.exceptions:
                 log.exception("Exception in event handler", exc_info=error)
+
+    async def _publish_measured(self, event: Event):
+        """publish с замером времени по типу события (включая время вложенных публикаций)."""
+        started = time.perf_counter()
+        try:
+            await EventBus.publish(self, event)
+        finally:
+            event_type = type(event)
+            histogram = self._publish_histograms.get(event_type)
+            if histogram is None:
+                histogram = self._publish_histograms[event_type] = metrics.histogram(
+                    "oraclehlb_event_publish_seconds", "EventBus.publish time by event type",
+                    event=event_type.__name__,
+                )
+            histogram.observe(time.perf_counter() - started)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Dict, Any
 
 from oraclehlb.core.event_bus import EventBus, Event
 
@@ -10,3 +11,25 @@ global_event_bus = EventBus()
 class GlobalPingEvent(Event):
     """Событие для пинга, отправленное от одного бота всем остальным."""
     recipient: str
+
+
+@dataclass
+class LobbyTableChanged(Event):
+    """Стол в лобби создан или изменился (payload команды `table` hanab.live)."""
+    table: Dict[str, Any]
+
+
+@dataclass
+class LobbyTableRemoved(Event):
+    table_id: int
+
+
+@dataclass
+class BotHealthChanged(Event):
+    """Бот перешёл в другое состояние (`BotHealth`): подключён, переподключается, ждёт предохранителя..."""
+    username: str
+    state: str
+
+
+# События, которые в шардированном режиме (`core.shards`) доходят и до ботов других процессов
+SHARED_EVENTS = (GlobalPingEvent,)
@@ -0,0 +1,197 @@
+import logging
+import time
+from bisect import bisect_left
+from typing import Dict, Any, Callable, Tuple, List
+
+log = logging.getLogger(__name__)
+
+# Границы корзин гистограмм задержек, в секундах
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами: наблюдение - один bisect и пара сложений."""
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля по верхней границе корзины."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+
+class _NullInstrument:
+    """Заглушка выключенного реестра: и счётчик, и гистограмма, ничего не делает."""
+    __slots__ = ()
+    value = count = 0
+
+    def inc(self, amount: int = 1):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+_NULL = _NullInstrument()
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса: счётчики, гистограммы и «сборщики» - функции, возвращающие словарь текущих
+    значений (снимки `Outbox`, `FrameDispatcher`, статистика стратегий), которые опрашиваются при выгрузке.
+
+    Выключенный реестр отдаёт общие пустые инструменты, а места с замером времени проверяют
+    `enabled` один раз при создании объекта, так что без метрик горячие пути не меняются.
+    Поэтому включается реестр при старте приложения (`configure`), до создания ботов.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._counters: Dict[Tuple[str, Labels], Counter] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._collectors: Dict[Tuple[str, Labels], Callable[[], Dict[str, Any]]] = {}
+        self._help: Dict[str, str] = {}
+        self.started = time.time()
+
+    def configure(self, enabled: bool):
+        """Настройка из config.toml; сам модуль настроек не читает и импортируется без config.toml."""
+        self.enabled = enabled
+
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Counter:
+        if not self.enabled:
+            return _NULL
+        key = (name, tuple(sorted(labels.items())))
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = Counter()
+            self._help.setdefault(name, help_text)
+        return counter
+
+    def histogram(
+            self, name: str, help_text: str = "", buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels: str,
+    ) -> Histogram:
+        if not self.enabled:
+            return _NULL
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(buckets)
+            self._help.setdefault(name, help_text)
+        return histogram
+
+    def add_collector(self, prefix: str, collect: Callable[[], Dict[str, Any]], **labels: str):
+        """
+        Регистрирует источник значений-gauge: числовые поля словаря выгружаются как `<prefix>_<поле>`.
+        Повторная регистрация с теми же метками заменяет прежний источник (бот пересоздан).
+        """
+        if self.enabled:
+            self._collectors[(prefix, tuple(sorted(labels.items())))] = collect
+
+    def remove_collector(self, prefix: str, **labels: str):
+        self._collectors.pop((prefix, tuple(sorted(labels.items()))), None)
+
+    def _collect(self) -> List[Tuple[str, Labels, float]]:
+        gauges = []
+        for (prefix, labels), collect in list(self._collectors.items()):
+            try:
+                values = collect()
+            except Exception:
+                log.exception("Metrics collector %s failed", prefix)
+                continue
+            for field, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges.append((f"{prefix}_{field}", labels, value))
+        return gauges
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus."""
+        lines = []
+        described = set()
+
+        def describe(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                if self._help.get(name):
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), counter in sorted(self._counters.items()):
+            describe(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {counter.value}")
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            describe(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                bucket_labels = _format_labels(labels, f'le="{bound}"')
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _format_labels(labels, 'le="+Inf"')
+            lines.append(f"{name}_bucket{bucket_labels} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        for name, labels, value in sorted(self._collect()):
+            describe(name, "gauge")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Короткая сводка для периодической записи в лог: счётчики и p50/p99/max гистограмм."""
+        lines = [f"Metrics after {time.time() - self.started:.0f}s:"]
+        for (name, labels), counter in sorted(self._counters.items()):
+            lines.append(f"  {name}{_format_labels(labels)} = {counter.value}")
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            if histogram.count:
+                lines.append(
+                    f"  {name}{_format_labels(labels)} n={histogram.count} "
+                    f"mean={histogram.sum / histogram.count * 1000:.3f}ms "
+                    f"p50<={histogram.quantile(0.5) * 1000:.3f}ms p99<={histogram.quantile(0.99) * 1000:.3f}ms "
+                    f"max={histogram.max * 1000:.3f}ms"
+                )
+        for name, labels, value in sorted(self._collect()):
+            lines.append(f"  {name}{_format_labels(labels)} = {value}")
+        return "\n".join(lines)
+
+
+# Общий реестр процесса; выключен, пока приложение не вызовет `configure`
+metrics = MetricsRegistry()
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.ai.conventions import Policy, convention_move
+from oraclehlb.ai.determinize import unseen_pool
+from oraclehlb.core.decision_pool import DecisionPool
+from oraclehlb.core.metrics import metrics
+from oraclehlb.core.strategy_loader import strategy_registry
+from oraclehlb.game.clues import engine_table
+from oraclehlb.game.engine import GameEngine, NUM_RANKS, COLOR_CLUE, RANK_CLUE
+from oraclehlb.game.moves import Move, PLAY, DISCARD, COLOR, legal_moves, touched_by
+from oraclehlb.models import GameState
+
+log = logging.getLogger(__name__)
+
+# Доля веса, которую получает ход, выбранный конвенцией `convention_move`; остаток - поровну прочим ходам
+PREDICTED_MOVE_WEIGHT = 0.5
+
+
+def state_fingerprint(engine: GameEngine) -> Tuple:
+    """
+    Всё, от чего зависит решение стратегии: руки (orders, видимые идентичности, затронутость),
+    знание о картах в руках, стопки, сброс, жетоны, колода и очередь хода. Счётчик действий
+    не входит: предсказанное и настоящее состояния приходят разными последовательностями действий.
+    """
+    suits, ranks, clued = engine.card_suit, engine.card_rank, engine.card_clued
+    hands = tuple(
+        tuple((order, suits[order], ranks[order], clued[order]) for order in engine.hand(player))
+        for player in range(engine.num_players)
+    )
+    knowledge = engine.knowledge
+    possible = () if knowledge is None else tuple(
+        knowledge.possibilities(order, player)
+        for player in range(engine.num_players) for order in engine.hand(player)
+    )
+    return (
+        engine.table_id, engine.turn, engine.current_player, engine.end_turn,
+        engine.clue_tokens, engine.strikes, engine.deck_size,
+        tuple(engine.stacks), tuple(engine.discards), hands, possible,
+    )
+
+
+def _move_actions(engine: GameEngine, mover: int, move: Move, table) -> List[Dict[str, Any]]:
+    """Действия сервера для хода `mover` (без добора и `turn`)."""
+    kind, target, value = move
+    if kind == PLAY or kind == DISCARD:
+        suit, rank = engine.card_suit[target], engine.card_rank[target]
+        card = {"playerIndex": mover, "order": target, "suitIndex": suit, "rank": rank}
+        if kind == DISCARD:
+            return [{"type": "discard", "failed": False, **card}]
+        if engine.is_playable(suit, rank):
+            return [{"type": "play", **card}]
+        return [{"type": "discard", "failed": True, **card}, {"type": "strike", "num": engine.strikes + 1}]
+    return [{
+        "type": "clue", "giver": mover, "target": target,
+        "clue": {"type": COLOR_CLUE if kind == COLOR else RANK_CLUE, "value": value},
+        "list": touched_by(engine, target, kind, value, table),
+    }]
+
+
+def predict_states(engine: GameEngine, limit: int, policy: Policy = convention_move) -> List[Tuple[float, GameEngine]]:
+    """
+    Наиболее вероятные состояния к нашему ходу, если сейчас ходит игрок прямо перед нами.
+    Предсказываются только ходы, результат которых нам виден целиком: подсказки третьим игрокам
+    и игра/сброс (с добором каждой из ещё невидимых нам идентичностей с её вероятностью).
+    Подсказки нам не предсказываются: какие наши карты они затронут, мы не знаем.
+    Самый вероятный ход - тот, что выбрала бы `policy` (по видимым нам картам ходящего).
+    """
+    mover, us = engine.current_player, engine.our_player_index
+    if (mover + 1) % engine.num_players != us or engine.is_finished():
+        return []
+    table = engine_table(engine)
+    moves = [move for move in legal_moves(engine, mover, table) if move[0] in (PLAY, DISCARD) or move[1] != us]
+    if not moves:
+        return []
+    predicted = policy(engine, mover)
+    if predicted not in moves:
+        predicted = None
+    others = len(moves) - (1 if predicted is not None else 0)
+
+    pool = unseen_pool(engine, us)
+    unseen = sum(count for count in pool if count > 0)
+    weighted: List[Tuple[float, Move, Optional[int]]] = []
+    for move in moves:
+        if move == predicted:
+            weight = PREDICTED_MOVE_WEIGHT if others else 1.0
+        else:
+            weight = (1.0 - PREDICTED_MOVE_WEIGHT if predicted is not None else 1.0) / others
+        if move[0] in (PLAY, DISCARD) and engine.deck_size > 0 and unseen > 0:
+            weighted += [
+                (weight * count / unseen, move, ident) for ident, count in enumerate(pool) if count > 0
+            ]
+        else:
+            weighted.append((weight, move, None))
+    weighted.sort(key=lambda item: -item[0])
+
+    states = []
+    for weight, move, ident in weighted[:limit]:
+        state = engine.copy(track_undo=False)
+        actions = _move_actions(state, mover, move, table)
+        if ident is not None:
+            suit, rank = divmod(ident, NUM_RANKS)
+            actions.append({
+                "type": "draw", "playerIndex": mover, "order": state.next_order, "suitIndex": suit, "rank": rank + 1,
+            })
+        actions.append({"type": "turn", "num": state.turn + 1, "currentPlayerIndex": us})
+        state.apply_all(actions)
+        states.append((weight, state))
+    return states
+
+
+def own_instance(strategy: BaseStrategy) -> BaseStrategy:
+    """Новый экземпляр той же стратегии с теми же параметрами конструктора."""
+    if strategy.strategy_name:
+        return strategy_registry.create(strategy.strategy_name, strategy.strategy_params)
+    clone = type(strategy)(**strategy.strategy_params)
+    clone.strategy_params = strategy.strategy_params
+    return clone
+
+
+class Ponderer:
+    """
+    Обдумывание наперёд для одного бота. Пока ходит игрок перед нами, решения для самых вероятных
+    состояний к нашему ходу считаются по очереди в фоне (через `DecisionPool.ponder`) и кэшируются
+    по `state_fingerprint`. На нашем ходу совпавшее решение отдаётся сразу, решение для совпавшего
+    состояния, которое ещё считается, дожидается, остальные отменяются.
+    """
+
+    def __init__(self, strategy: BaseStrategy, decisions: DecisionPool, username: str, max_states: int = 8):
+        # Свой экземпляр стратегии: фоновые решения не трогают её генератор случайных чисел, last_stats
+        # и решатель эндшпиля, которыми пользуются решения на нашем ходу
+        self._strategy = own_instance(strategy)
+        self._decisions = decisions
+        self.username = username
+        self.max_states = max_states
+        # Ход партнёра предсказываем той же политикой, которой стратегия доигрывает партии, если она есть
+        self._policy: Policy = getattr(strategy, "policy", convention_move)
+        # tableID -> фоновая задача, готовые решения и решение, которое считается сейчас
+        self._runners: Dict[int, asyncio.Task] = {}
+        self._results: Dict[int, Dict[Tuple, Dict[str, Any]]] = {}
+        self._current: Dict[int, Tuple[Tuple, asyncio.Future]] = {}
+
+    def start(self, engine: GameEngine):
+        """Новое состояние стола: прежние предсказания отменяются, новые считаются в фоне."""
+        table_id = engine.table_id
+        self.cancel(table_id)
+        predictions = predict_states(engine, self.max_states, self._policy)
+        if not predictions:
+            return
+        self._results[table_id] = {}
+        self._runners[table_id] = asyncio.create_task(self._run(table_id, predictions))
+
+    async def _run(self, table_id: int, predictions: List[Tuple[float, GameEngine]]):
+        results = self._results[table_id]
+        for _, engine in predictions:
+            fingerprint = state_fingerprint(engine)
+            if fingerprint in results:
+                continue
+            future = asyncio.ensure_future(self._decisions.ponder(self._strategy, engine.to_model()))
+            self._current[table_id] = (fingerprint, future)
+            # shield: отмена фоновой задачи не должна снимать решение, которое уже ждёт наш ход
+            action = await asyncio.shield(future)
+            self._current.pop(table_id, None)
+            if action is not None:
+                results[fingerprint] = action
+        log.debug("[%s] Pondered %d states at table %s", self.username, len(results), table_id)
+
+    async def take(self, state: GameState) -> Optional[Dict[str, Any]]:
+        """Решение для настоящего состояния нашего хода, если оно было обдумано (или обдумывается); иначе None."""
+        table_id = state.table_id
+        if state.engine is None or (table_id not in self._runners and table_id not in self._results):
+            return None
+        fingerprint = state_fingerprint(state.engine)
+        action = self._results.get(table_id, {}).get(fingerprint)
+        result = "hit"
+        if action is None:
+            current = self._current.get(table_id)
+            if current is not None and current[0] == fingerprint:
+                # Это состояние как раз считается: ждём его вместо нового поиска с нуля
+                self._current.pop(table_id)
+                self.cancel(table_id)
+                action = await current[1]
+                result = "partial" if action is not None else "miss"
+            else:
+                result = "miss"
+        self.cancel(table_id)
+        metrics.counter("oraclehlb_ponder_total", "Our turns by pondering outcome", result=result).inc()
+        log.debug("[%s] Pondering %s at table %s", self.username, result, table_id)
+        return dict(action) if action is not None else None
+
+    def cancel(self, table_id: int):
+        runner = self._runners.pop(table_id, None)
+        if runner is not None:
+            runner.cancel()
+        current = self._current.pop(table_id, None)
+        if current is not None:
+            current[1].cancel()
+        self._results.pop(table_id, None)
+
+    def cancel_all(self):
+        for table_id in list(self._runners):
+            self.cancel(table_id)
@@ -0,0 +1,306 @@
+import asyncio
+import cProfile
+import json
+import logging
+import marshal
+import os
+import pickle
+import pstats
+import random
+import shutil
+import signal
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.core.metrics import metrics
+from oraclehlb.models import GameState
+
+log = logging.getLogger(__name__)
+
+# Файлы снимка медленного решения (см. `DecisionProfiler`)
+META_FILE = "meta.json"
+STATE_FILE = "state.json"
+ENGINE_FILE = "engine.pkl"
+STACKS_FILE = "stacks.txt"
+PSTATS_FILE = "profile.prof"
+
+# cProfile - один на поток: пока профилируется одно решение в event loop, остальные обходятся сэмплером
+_cprofile_active = False
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class _StackSampler:
+    """
+    Сэмплер стека процесса: таймер `ITIMER_REAL` раз в `interval` секунд настенного времени шлёт SIGALRM,
+    и обработчик в главном потоке (там идут event loop и решения воркеров) добавляет прерванный стек
+    всем активным профилям. Поток-сэмплер так не умеет: GIL он получает только там, где главный поток
+    сам его отпускает (в `select`), и все сэмплы приходились бы на ожидание.
+    """
+
+    def __init__(self):
+        self._profiles: List["DecisionProfile"] = []
+        self._previous_handler = None
+
+    @staticmethod
+    def available() -> bool:
+        return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+    def add(self, profile: "DecisionProfile"):
+        if not self.available():
+            return
+        if not self._profiles:
+            self._previous_handler = signal.signal(signal.SIGALRM, self._sample)
+            signal.setitimer(signal.ITIMER_REAL, profile.interval, profile.interval)
+        self._profiles.append(profile)
+
+    def remove(self, profile: "DecisionProfile"):
+        if profile not in self._profiles:
+            return
+        self._profiles.remove(profile)
+        if not self._profiles:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous_handler or signal.SIG_DFL)
+
+    def _sample(self, signum, frame):
+        stack = _collapse(frame)
+        for profile in self._profiles:
+            profile.stacks[stack] += 1
+
+
+# Один на процесс: таймер и обработчик сигнала - общие
+_sampler = _StackSampler()
+
+
+class DecisionProfile:
+    """
+    Профиль одного решения. Сэмплер (`_StackSampler`) раз в `interval` секунд снимает стек главного потока
+    и копит свёрнутые стеки (`a;b;c` -> число сэмплов, формат flamegraph.pl). С `cprofile` решение ещё
+    и идёт под cProfile (точнее, но заметно медленнее), его статистика - в `pstats` (формат `pstats.Stats`).
+    В event loop в профиль попадает и работа других задач, пока решение ждёт. После `stop()` объект
+    сериализуется: так профиль возвращается из процесса-воркера. Пока решение ещё считается в воркере,
+    `completion` - его future (профиль придёт с результатом, даже если ход ушёл по таймауту).
+    """
+
+    def __init__(self, interval: float = 0.005, cprofile: bool = False):
+        self.interval = interval
+        self.cprofile = cprofile
+        self.stacks: Counter = Counter()
+        self.pstats: Optional[bytes] = None
+        self.completion: Optional[asyncio.Future] = None
+        self._profile: Optional[cProfile.Profile] = None
+
+    def start(self):
+        global _cprofile_active
+        _sampler.add(self)
+        if self.cprofile and not _cprofile_active:
+            _cprofile_active = True
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self):
+        global _cprofile_active
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.create_stats()
+            self.pstats = marshal.dumps(self._profile.stats)
+            self._profile = None
+            _cprofile_active = False
+        _sampler.remove(self)
+
+    def __enter__(self) -> "DecisionProfile":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def update(self, other: "DecisionProfile"):
+        """Забирает результат профиля, снятого в другом процессе."""
+        self.stacks.update(other.stacks)
+        if other.pstats is not None:
+            self.pstats = other.pstats
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"interval": self.interval, "cprofile": self.cprofile, "stacks": self.stacks, "pstats": self.pstats}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__init__(state["interval"], state["cprofile"])
+        self.stacks = state["stacks"]
+        self.pstats = state["pstats"]
+
+
+class PendingDecision:
+    """
+    Решение, которое профилируется прямо сейчас: профиль и снимок состояния, снятый до решения.
+    Поля `GameState` - уже снимок, он превращается в JSON только при записи (`DecisionProfiler._write`);
+    сразу сериализуется лишь живой движок, который меняется следующими действиями.
+    """
+
+    def __init__(self, profile: DecisionProfile, state: GameState, sampled: bool):
+        self.profile = profile
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.state = state
+        self.engine_blob = pickle.dumps(state.engine, protocol=pickle.HIGHEST_PROTOCOL) if state.engine else None
+
+
+class DecisionProfiler:
+    """
+    Профилирование медленных решений. Когда оно включено, каждое решение нашего хода идёт под
+    сэмплером стека (`DecisionProfile`, дёшево), а доля `sample_rate` ходов - ещё и под cProfile. Решение
+    дольше `threshold` секунд или попавшее в выборку сохраняется в `path` отдельным каталогом:
+    метаданные, снимок `GameState` (и движка), свёрнутые стеки и статистика cProfile. Хранятся
+    последние `keep` снимков. Снимок переигрывается офлайн: `python -m oraclehlb.bench.replay <каталог>`.
+    Если ход ушёл по таймауту, а решение ещё досчитывается в воркере, снимок пишется, когда воркер вернёт
+    профиль, но не позже чем через `late_timeout` секунд (с тем, что успело накопиться).
+    """
+
+    def __init__(
+            self,
+            path: Optional[Path],
+            threshold: float = 1.0,
+            sample_rate: float = 0.0,
+            keep: int = 50,
+            interval: float = 0.005,
+            late_timeout: float = 60.0,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.interval = interval
+        self.late_timeout = late_timeout
+        self._random = random.Random()
+        # Снимки, ждущие профиль из воркера (ссылки держим, чтобы задачи не собрал GC)
+        self._late: set = set()
+
+    def configure(self, path: Optional[Path], threshold: float, sample_rate: float, keep: int, interval: float):
+        """Настройки из config.toml; сам модуль настроек не читает и импортируется без config.toml."""
+        self.path = path
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.interval = interval
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None and (self.threshold > 0 or self.sample_rate > 0)
+
+    def begin(self, state: GameState) -> PendingDecision:
+        sampled = self._random.random() < self.sample_rate
+        return PendingDecision(DecisionProfile(self.interval, cprofile=sampled), state, sampled)
+
+    def finish(self, pending: PendingDecision, strategy: BaseStrategy, username: str, action: Dict[str, Any]):
+        """Сохраняет снимок, если решение было медленным или попало в выборку."""
+        elapsed = time.perf_counter() - pending.started
+        slow = self.threshold > 0 and elapsed >= self.threshold
+        if not (slow or pending.sampled):
+            return
+        reason = "slow" if slow else "sampled"
+        metrics.counter("oraclehlb_profile_captures_total", "Saved decision profiles", reason=reason).inc()
+        meta = {
+            "username": username,
+            "strategy": strategy.strategy_name or type(strategy).__name__,
+            "strategy_params": strategy.strategy_params,
+            "reason": reason,
+            "elapsed": elapsed,
+            "threshold": self.threshold,
+            "action": action,
+            "interval": pending.profile.interval,
+            "time": datetime.now().isoformat(timespec="seconds"),
+        }
+        completion = pending.profile.completion
+        if completion is not None and not completion.done():
+            task = asyncio.ensure_future(self._finish_late(pending, meta, completion))
+            self._late.add(task)
+            task.add_done_callback(self._late.discard)
+            return
+        self._save(pending, meta)
+
+    async def _finish_late(self, pending: PendingDecision, meta: Dict[str, Any], completion: asyncio.Future):
+        await asyncio.wait({completion}, timeout=self.late_timeout)
+        if not completion.done():
+            log.warning("[%s] Decision worker still busy after %.0fs, saving a partial profile", meta["username"],
+                        self.late_timeout)
+        meta["worker_elapsed"] = time.perf_counter() - pending.started
+        self._save(pending, meta)
+
+    def _save(self, pending: PendingDecision, meta: Dict[str, Any]):
+        meta["samples"] = sum(pending.profile.stacks.values())
+        try:
+            directory = self._write(pending, meta)
+        except (OSError, TypeError, ValueError):
+            log.exception("[%s] Could not save the decision profile", meta["username"])
+            return
+        log.warning(
+            "[%s] Decision took %.3fs (%s), profile saved to %s", meta["username"], meta["elapsed"], meta["reason"],
+            directory,
+        )
+
+    def _write(self, pending: PendingDecision, meta: Dict[str, Any]) -> Path:
+        state = pending.state
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{meta['username']}-t{state.table_id}-turn{state.turn}"
+        directory = self.path / name
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / META_FILE).write_text(json.dumps(meta, indent=2, default=str), encoding="utf-8")
+        (directory / STATE_FILE).write_text(state.model_dump_json(), encoding="utf-8")
+        if pending.engine_blob is not None:
+            (directory / ENGINE_FILE).write_bytes(pending.engine_blob)
+        (directory / STACKS_FILE).write_text(pending.profile.collapsed(), encoding="utf-8")
+        if pending.profile.pstats is not None:
+            (directory / PSTATS_FILE).write_bytes(pending.profile.pstats)
+        self._rotate()
+        return directory
+
+    def _rotate(self):
+        # По времени записи: у снимков одной секунды имена различаются только ботом и столом
+        captures = sorted(
+            (entry for entry in self.path.iterdir() if entry.is_dir()), key=lambda entry: entry.stat().st_mtime,
+        )
+        for old in captures[:max(len(captures) - self.keep, 0)]:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+class _LoadedStats:
+    """Статистика cProfile из `DecisionProfile.pstats` в том виде, который принимает `pstats.Stats`."""
+
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+def load_pstats(data: bytes) -> pstats.Stats:
+    return pstats.Stats(_LoadedStats(data))
+
+
+def load_capture(directory: Path) -> Dict[str, Any]:
+    """Метаданные и `GameState` снимка (с движком, если он сохранён)."""
+    meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+    engine_path = directory / ENGINE_FILE
+    if engine_path.exists():
+        state = pickle.loads(engine_path.read_bytes()).to_model()
+    else:
+        state = GameState.model_validate_json((directory / STATE_FILE).read_text(encoding="utf-8"))
+    return {"meta": meta, "state": state}
+
+
+# Общий профилировщик процесса; выключен, пока `configure` не задаст `profile_path`
+decision_profiler = DecisionProfiler(None)
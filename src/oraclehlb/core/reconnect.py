@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Any, Optional
+
+from oraclehlb.core.global_bus import global_event_bus, BotHealthChanged
+from oraclehlb.core.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+
+class BotHealth(str, Enum):
+    STARTING = "starting"
+    AUTHENTICATING = "authenticating"
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    # Соединение не пробуем: сервер, похоже, лежит, ждём результата пробного подключения
+    CIRCUIT_OPEN = "circuit_open"
+    CRASHED = "crashed"
+    STOPPED = "stopped"
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float, rng: random.Random = random) -> float:
+    """Decorrelated jitter: следующая пауза случайна в [base, 3 * previous] и не больше cap."""
+    return min(cap, rng.uniform(base, max(base, previous * 3)))
+
+
+class CircuitBreaker:
+    """
+    Общий для всех ботов предохранитель подключений.
+
+    Closed: подключаются все. После `failure_threshold` неудачных попыток подряд (по всем ботам)
+    размыкается (open) на время остывания. После него ровно одна попытка идёт пробой (half-open):
+    успех замыкает цепь и отпускает остальных, неудача снова размыкает её на более долгий срок.
+    Если проба не отчиталась за `probe_timeout` (бот остановлен), пробой становится следующий ожидающий.
+    """
+
+    def __init__(self, failure_threshold: int = 5, open_seconds: float = 10.0, max_open_seconds: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max(max_open_seconds, open_seconds)
+        self.probe_timeout = open_seconds
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._cooldown = open_seconds
+        self._open_until = 0.0
+        self._probe_started = 0.0
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def acquire(self) -> bool:
+        """Ждёт разрешения на попытку подключения; True, если пришлось ждать размыкания."""
+        waited = False
+        while True:
+            now = time.monotonic()
+            if self.state == CircuitState.CLOSED:
+                return waited
+            if self.state == CircuitState.OPEN and now >= self._open_until:
+                self.state = CircuitState.HALF_OPEN
+                self._probe_started = now
+                log.info("Circuit half-open: probing the server with one connection.")
+                return waited
+            if self.state == CircuitState.HALF_OPEN and now - self._probe_started >= self.probe_timeout:
+                self._probe_started = now
+                return waited
+
+            if self.state == CircuitState.OPEN:
+                timeout = self._open_until - now
+            else:
+                timeout = self.probe_timeout - (now - self._probe_started)
+            waited = True
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=max(timeout, 0.01))
+            except asyncio.TimeoutError:
+                pass
+
+    def record_success(self):
+        self._failures = 0
+        if self.state != CircuitState.CLOSED:
+            log.info("Circuit closed: the server is reachable again.")
+            self.state = CircuitState.CLOSED
+            self._cooldown = self.open_seconds
+            self._notify()
+
+    def record_failure(self):
+        if self.state == CircuitState.HALF_OPEN:
+            self._cooldown = decorrelated_jitter(self._cooldown, self.open_seconds, self.max_open_seconds)
+            self._open(f"probe failed, next probe in {self._cooldown:.1f}s")
+        elif self.state == CircuitState.CLOSED:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._open(f"{self._failures} connection attempts failed in a row")
+
+    def _open(self, reason: str):
+        log.warning("Circuit open: %s.", reason)
+        self.state = CircuitState.OPEN
+        self._open_until = time.monotonic() + self._cooldown
+        self._notify()
+
+
+@dataclass(slots=True)
+class BotStatus:
+    state: BotHealth = BotHealth.STARTING
+    since: float = 0.0
+    failures: int = 0
+    delay: float = 0.0
+    last_error: Optional[str] = None
+    # Когда установлено текущее соединение (monotonic) и таймер, засчитывающий его успешным
+    connected_at: float = 0.0
+    stable_timer: Optional[asyncio.TimerHandle] = None
+
+
+class ReconnectCoordinator:
+    """
+    Паузы переподключения и состояние здоровья всех ботов процесса.
+    У каждого бота своя пауза с decorrelated jitter (боты не ретраят синхронно), а все попытки
+    подключения проходят через общий `CircuitBreaker`. После размыкания отпущенные боты
+    разбегаются случайно в пределах `release_window`, а не подключаются одной пачкой.
+    Подключение засчитывается успешным, только когда соединение продержалось `stable_seconds`:
+    сервер, который принимает сокет и сразу его закрывает (перезапуск, бан, перегрузка), для паузы
+    и предохранителя ничем не отличается от недоступного.
+    """
+
+    def __init__(
+            self,
+            base_delay: float = 2.0,
+            max_delay: float = 60.0,
+            breaker: Optional[CircuitBreaker] = None,
+            release_window: float = 5.0,
+            stable_seconds: float = 5.0,
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.release_window = release_window
+        self.stable_seconds = stable_seconds
+        self._bots: Dict[str, BotStatus] = {}
+
+    def configure(
+            self,
+            base_delay: float,
+            max_delay: float,
+            failure_threshold: int,
+            open_seconds: float,
+            release_window: float,
+            stable_seconds: float,
+    ):
+        """Настройки из config.toml; `BotManager` вызывает это при старте, до первого подключения."""
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(failure_threshold, open_seconds, max_open_seconds=max_delay)
+        self.release_window = release_window
+        self.stable_seconds = stable_seconds
+
+    def _status(self, username: str) -> BotStatus:
+        status = self._bots.get(username)
+        if status is None:
+            status = self._bots[username] = BotStatus(since=time.time(), delay=self.base_delay)
+        return status
+
+    async def set_health(self, username: str, state: BotHealth, error: Optional[str] = None):
+        status = self._status(username)
+        if error is not None:
+            status.last_error = error
+        if status.state != state:
+            status.state = state
+            status.since = time.time()
+            await global_event_bus.publish(BotHealthChanged(username=username, state=state.value))
+
+    async def before_connect(self, username: str):
+        if self.breaker.state != CircuitState.CLOSED:
+            await self.set_health(username, BotHealth.CIRCUIT_OPEN)
+        if await self.breaker.acquire():
+            await asyncio.sleep(random.uniform(0, self.release_window))
+        await self.set_health(username, BotHealth.CONNECTING)
+
+    async def connected(self, username: str):
+        """Соединение установлено; успешным для паузы и предохранителя оно станет через `stable_seconds`."""
+        metrics.counter("oraclehlb_connections_total", "Established websocket connections", bot=username).inc()
+        status = self._status(username)
+        status.connected_at = time.monotonic()
+        if status.stable_timer is not None:
+            status.stable_timer.cancel()
+        status.stable_timer = asyncio.get_running_loop().call_later(self.stable_seconds, self._stable, status)
+        await self.set_health(username, BotHealth.CONNECTED)
+
+    def _stable(self, status: BotStatus):
+        status.stable_timer = None
+        self.breaker.record_success()
+        status.failures = 0
+        status.delay = self.base_delay
+
+    async def disconnected(self, username: str, error: Optional[str] = None):
+        """
+        Установленное соединение оборвалось. Продержавшееся `stable_seconds` - короткая случайная пауза,
+        чтобы боты не ломились разом; закрытое сразу после подключения - неудачная попытка (`failed`).
+        """
+        metrics.counter("oraclehlb_disconnects_total", "Established connections that were lost", bot=username).inc()
+        status = self._status(username)
+        if status.stable_timer is not None:
+            status.stable_timer.cancel()
+            status.stable_timer = None
+            lived = time.monotonic() - status.connected_at
+            await self.failed(username, f"{error or 'Connection closed'} {lived:.1f}s after connecting")
+            return
+        await self.set_health(username, BotHealth.RECONNECTING, error)
+        await asyncio.sleep(random.uniform(0, self.base_delay))
+
+    async def failed(self, username: str, error: str, crashed: bool = False):
+        """
+        Неудачная попытка подключения (или падение бота при `crashed=True` - оно не считается
+        недоступностью сервера): пауза бота растёт с decorrelated jitter.
+        """
+        if not crashed:
+            self.breaker.record_failure()
+        metrics.counter(
+            "oraclehlb_reconnect_failures_total", "Failed connection attempts and bot crashes",
+            bot=username, kind="crash" if crashed else "connect",
+        ).inc()
+        status = self._status(username)
+        if status.stable_timer is not None:
+            status.stable_timer.cancel()
+            status.stable_timer = None
+        status.failures += 1
+        status.delay = decorrelated_jitter(status.delay, self.base_delay, self.max_delay)
+        await self.set_health(username, BotHealth.CRASHED if crashed else BotHealth.RECONNECTING, error)
+        log.warning("[%s] %s. Retrying in %.2fs...", username, error, status.delay)
+        await asyncio.sleep(status.delay)
+
+    def circuit_stats(self) -> Dict[str, Any]:
+        """Gauge для метрик: 0 - замкнут, 1 - разомкнут, 2 - проба."""
+        return {"state": list(CircuitState).index(self.breaker.state)}
+
+    def health(self) -> Dict[str, Any]:
+        """Снимок для мониторинга: состояние предохранителя и каждого бота."""
+        return {
+            "circuit": self.breaker.state.value,
+            "bots": {
+                username: {
+                    "state": status.state.value,
+                    "since": status.since,
+                    "failures": status.failures,
+                    "retry_delay": round(status.delay, 3),
+                    "last_error": status.last_error,
+                }
+                for username, status in self._bots.items()
+            },
+        }
+
+
+# Общий для всех ботов процесса; параметры из config.toml задаёт `BotManager` (`configure`)
+reconnect_coordinator = ReconnectCoordinator()
@@ -0,0 +1,332 @@
+"""
+Шардированный режим (`sharded = true`): боты из `settings.bots` делятся между процессами-шардами.
+У каждого шарда свой event loop, свои надзиратели ботов (`BotManager`), предохранитель и пул решений,
+так что парк ботов не упирается в одно ядро, а падение шарда (например, импорт сломанной стратегии)
+не роняет остальных.
+
+Родитель не подключается к серверу сам. Он перезапускает упавшие и зависшие шарды (с паузой
+decorrelated jitter), пересылает между шардами события `global_event_bus` из `SHARED_EVENTS`,
+пишет записи партий (одно хранилище на всех) и логи шардов, а на `/health` отдаёт сводку по шардам и ботам.
+
+Связь - пара сокетов на шард, кадры «длина + pickle»: шард присылает снимки здоровья (они же признак
+жизни), события и партии, родитель - события других шардов и команду остановки.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import socket
+import struct
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from oraclehlb.config import settings, BotConfig
+from oraclehlb.core.bot_manager import BotManager, configure_services, start_monitoring
+from oraclehlb.core.event_bus import Event, GameFinished
+from oraclehlb.core.global_bus import global_event_bus, SHARED_EVENTS
+from oraclehlb.core.metrics import metrics
+from oraclehlb.core.reconnect import BotHealth, decorrelated_jitter
+from oraclehlb.core.strategy_loader import strategy_registry
+from oraclehlb.game.variants import catalog
+from oraclehlb.logging_setup import setup_shard_logging, forward_shard_logs
+from oraclehlb.services.recorder import game_recorder
+
+log = logging.getLogger(__name__)
+
+# Как часто шард присылает снимок здоровья и через сколько секунд без снимков он считается зависшим
+HEALTH_INTERVAL = 2.0
+STALE_AFTER = 30.0
+# Сколько ждать штатной остановки шардов, прежде чем завершить их принудительно
+STOP_TIMEOUT = 10.0
+
+_HEADER = struct.Struct("!I")
+# Событие пришло от другого шарда: обратно родителю оно не пересылается
+_from_peer: ContextVar[bool] = ContextVar("_from_peer", default=False)
+
+
+def _frame(message: Tuple) -> bytes:
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(data)) + data
+
+
+async def _receive(reader: asyncio.StreamReader) -> Tuple:
+    size, = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return pickle.loads(await reader.readexactly(size))
+
+
+def shard_count(configured: int, num_bots: int) -> int:
+    """Число шардов: `configured` (0 - по числу ядер), но не больше числа ботов."""
+    count = configured or os.cpu_count() or 1
+    return max(1, min(count, num_bots))
+
+
+def partition(configs: Sequence[BotConfig], count: int) -> List[List[BotConfig]]:
+    """Боты по шардам через одного: состав шарда не меняется между перезапусками."""
+    return [list(configs[index::count]) for index in range(count)]
+
+
+# --- Процесс-шард ---
+
+def _configure_shard(index: int, count: int):
+    """Общие на хост ресурсы делятся между шардами; свои файлы и порты - у каждого шарда."""
+    if settings.cookie_cache_path:
+        path = Path(settings.cookie_cache_path).expanduser()
+        settings.cookie_cache_path = str(path.with_name(f"{path.stem}.shard{index}{path.suffix}"))
+    settings.login_rate = settings.login_rate / count
+    settings.login_burst = max(1, settings.login_burst // count)
+    if settings.decision_workers > 0:
+        settings.decision_workers = -(-settings.decision_workers // count)
+    if settings.metrics_port:
+        settings.metrics_port += 1 + index
+
+
+def run_shard(index: int, count: int, usernames: List[str], sock: socket.socket, log_queue):
+    """Точка входа процесса-шарда."""
+    # Ctrl+C получает вся группа процессов; шарды останавливает родитель
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_shard_logging(settings, log_queue)
+    _configure_shard(index, count)
+    configure_services()
+    catalog()
+    asyncio.run(_shard_main(index, usernames, sock))
+
+
+async def _shard_main(index: int, usernames: List[str], sock: socket.socket):
+    reader, writer = await asyncio.open_connection(sock=sock)
+    manager = BotManager([config for config in settings.bots if config.username in usernames])
+    log.info("Shard %d started with %d bots (pid %d).", index, len(usernames), os.getpid())
+
+    async def forward_event(event: Event):
+        if not _from_peer.get():
+            writer.write(_frame(("event", event)))
+
+    for event_type in SHARED_EVENTS:
+        global_event_bus.subscribe(event_type, forward_event)
+    game_recorder.forward = lambda event, strategy: writer.write(_frame((
+        "record", strategy, event.engine, event.actions, event.seed, event.variant,
+    )))
+
+    async def report():
+        while True:
+            writer.write(_frame(("health", os.getpid(), manager.health())))
+            await writer.drain()
+            await asyncio.sleep(HEALTH_INTERVAL)
+
+    async def listen():
+        try:
+            while True:
+                message = await _receive(reader)
+                if message[0] == "stop":
+                    log.info("Shard %d stopping.", index)
+                    return
+                if message[0] == "event":
+                    token = _from_peer.set(True)
+                    try:
+                        await global_event_bus.publish(message[1])
+                    finally:
+                        _from_peer.reset(token)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            log.warning("Shard %d lost its parent, stopping.", index)
+
+    manager_task = asyncio.create_task(manager.run())
+    report_task = asyncio.create_task(report())
+    listen_task = asyncio.create_task(listen())
+    try:
+        await asyncio.wait({manager_task, listen_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        report_task.cancel()
+        listen_task.cancel()
+        await asyncio.gather(report_task, listen_task, return_exceptions=True)
+        if manager_task.done():
+            writer.close()
+    if manager_task.done():
+        # Исключение BotManager завершает процесс с ошибкой: родитель перезапустит шард
+        manager_task.result()
+        return
+    manager_task.cancel()
+    await asyncio.gather(manager_task, return_exceptions=True)
+    writer.close()
+
+
+# --- Родитель ---
+
+class _Shard:
+    def __init__(self, index: int, configs: List[BotConfig]):
+        self.index = index
+        self.configs = configs
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.started = 0.0
+        self.last_report = 0.0
+        # Когда перезапустить упавший шард (0 - шард работает)
+        self.restart_at = 0.0
+        self.delay = settings.reconnect_delay_base
+        self.restarts = 0
+        self.health: Dict[str, Any] = {}
+
+    @property
+    def usernames(self) -> List[str]:
+        return [config.username for config in self.configs]
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+
+class ShardManager:
+    """
+    Родительский процесс шардированного режима. `log_handlers` - обработчики логов родителя
+    (`QueueListener.handlers` из `setup_logging`): ими же пишутся записи шардов.
+    """
+
+    def __init__(self, log_handlers: Sequence[logging.Handler] = (), count: Optional[int] = None):
+        configs = settings.bots
+        count = shard_count(settings.shard_count if count is None else count, len(configs))
+        self._shards = [_Shard(index, group) for index, group in enumerate(partition(configs, count))]
+        self._context = multiprocessing.get_context("spawn")
+        self._log_handlers = log_handlers
+        self._log_queue = self._context.Queue()
+        metrics.add_collector("oraclehlb_shards", self._shard_stats)
+
+    async def _start(self, shard: _Shard):
+        parent_sock, child_sock = socket.socketpair()
+        shard.process = self._context.Process(
+            target=run_shard,
+            args=(shard.index, len(self._shards), shard.usernames, child_sock, self._log_queue),
+            name=f"oraclehlb-shard-{shard.index}",
+        )
+        shard.process.start()
+        child_sock.close()
+        shard.started = shard.last_report = time.monotonic()
+        shard.restart_at = 0.0
+        shard.health = {}
+        reader, shard.writer = await asyncio.open_connection(sock=parent_sock)
+        shard.reader_task = asyncio.create_task(self._read(shard, reader))
+        log.info("Started shard %d (pid %d): %s", shard.index, shard.process.pid, ", ".join(shard.usernames))
+
+    async def _read(self, shard: _Shard, reader: asyncio.StreamReader):
+        try:
+            while True:
+                message = await _receive(reader)
+                kind = message[0]
+                if kind == "health":
+                    shard.last_report = time.monotonic()
+                    shard.health = message[2]
+                elif kind == "event":
+                    self._broadcast(shard, message)
+                elif kind == "record":
+                    _, strategy, engine, actions, seed, variant = message
+                    game_recorder.record(GameFinished(engine=engine, actions=actions, seed=seed, variant=variant), strategy)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def _broadcast(self, source: _Shard, message: Tuple):
+        frame = _frame(message)
+        for shard in self._shards:
+            if shard is not source and shard.alive and shard.writer is not None:
+                shard.writer.write(frame)
+
+    async def _check(self, shard: _Shard, now: float):
+        if shard.restart_at:
+            if now >= shard.restart_at:
+                await self._start(shard)
+            return
+        if shard.alive:
+            if now - shard.last_report > STALE_AFTER:
+                log.error("Shard %d sent no health report for %.0fs, killing it.", shard.index, now - shard.last_report)
+                shard.process.kill()
+            return
+
+        self._disconnect(shard)
+        # Шард долго проработал - это не цикл падений, пауза начинается заново
+        if now - shard.started > settings.reconnect_delay_max:
+            shard.delay = settings.reconnect_delay_base
+        shard.delay = decorrelated_jitter(shard.delay, settings.reconnect_delay_base, settings.reconnect_delay_max)
+        shard.restarts += 1
+        shard.restart_at = now + shard.delay
+        metrics.counter("oraclehlb_shard_restarts_total", "Restarts of dead shard processes", shard=str(shard.index)).inc()
+        log.warning(
+            "Shard %d exited with code %s, restarting in %.1fs.", shard.index, shard.process.exitcode, shard.delay,
+        )
+
+    @staticmethod
+    def _disconnect(shard: _Shard):
+        if shard.reader_task is not None:
+            shard.reader_task.cancel()
+            shard.reader_task = None
+        if shard.writer is not None:
+            shard.writer.close()
+            shard.writer = None
+
+    async def _stop(self):
+        for shard in self._shards:
+            if shard.alive and shard.writer is not None:
+                try:
+                    shard.writer.write(_frame(("stop",)))
+                    await shard.writer.drain()
+                except ConnectionError:
+                    pass
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for shard in self._shards:
+            if shard.process is None:
+                continue
+            await asyncio.to_thread(shard.process.join, max(deadline - time.monotonic(), 0))
+            if shard.process.is_alive():
+                log.warning("Shard %d did not stop in time, terminating it.", shard.index)
+                shard.process.terminate()
+                await asyncio.to_thread(shard.process.join)
+            self._disconnect(shard)
+
+    def health(self) -> Dict[str, Any]:
+        """Сводка для `/health`: шарды (процесс, перезапуски, предохранитель) и все боты."""
+        now = time.monotonic()
+        shards, bots = {}, {}
+        for shard in self._shards:
+            alive = shard.alive
+            shards[str(shard.index)] = {
+                "alive": alive,
+                "pid": shard.process.pid if shard.process is not None else None,
+                "restarts": shard.restarts,
+                "circuit": shard.health.get("circuit"),
+                "last_report": round(now - shard.last_report, 1) if alive else None,
+                "metrics_port": settings.metrics_port + 1 + shard.index if settings.metrics_port else None,
+                "bots": shard.usernames,
+            }
+            reported = shard.health.get("bots", {})
+            for username in shard.usernames:
+                status = dict(reported.get(username, {"state": BotHealth.STARTING.value}))
+                if not alive:
+                    status["state"] = BotHealth.CRASHED.value
+                status["shard"] = shard.index
+                bots[username] = status
+        return {"shards": shards, "bots": bots}
+
+    def _shard_stats(self) -> Dict[str, Any]:
+        return {"alive": sum(shard.alive for shard in self._shards), "total": len(self._shards)}
+
+    async def run(self):
+        """Запускает шарды и следит за ними до отмены."""
+        # Ошибка в конфигурации стратегий роняет не каждый шард по кругу, а сразу родителя
+        strategy_registry.validate(settings.bots)
+        log_listener = forward_shard_logs(self._log_queue, self._log_handlers)
+        server, dump_task = await start_monitoring(self.health)
+        try:
+            for shard in self._shards:
+                await self._start(shard)
+            while True:
+                await asyncio.sleep(1.0)
+                now = time.monotonic()
+                for shard in self._shards:
+                    await self._check(shard, now)
+        finally:
+            await self._stop()
+            if dump_task is not None:
+                dump_task.cancel()
+            if server is not None:
+                await server.stop()
+            log_listener.stop()
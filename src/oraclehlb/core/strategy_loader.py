@@ -1,37 +1,147 @@
 import importlib
+import inspect
 import logging
-from typing import Type
+import pkgutil
+import time
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterable, Optional, Set, Type
 
 from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.config import BotConfig
 
 log = logging.getLogger(__name__)
 
+# Группа entry points, через которую сторонние пакеты добавляют стратегии: `Name = "package.module:Class"`
+ENTRY_POINT_GROUP = "oraclehlb.strategies"
 
-def _load_strategy_class(strategy_class_name: str) -> Type[BaseStrategy]:
-    """(Приватная) Динамически загружает КЛАСС стратегии по его имени."""
-    # Конвенция о нейминге файлов (simplestrategy.py для SimpleStrategy)
-    module_path = f"oraclehlb.ai.{strategy_class_name.lower()}"
-    try:
-        module = importlib.import_module(module_path)
-        log.debug(module_path)
-        strategy_class = getattr(module, strategy_class_name)
 
-        if not issubclass(strategy_class, BaseStrategy):
-            raise TypeError(f"Class {strategy_class_name} is not a subclass of BaseStrategy.")
+class StrategyRegistry:
+    """
+    Реестр стратегий процесса. При первом обращении один раз находит все стратегии - неабстрактные
+    подклассы `BaseStrategy` из модулей пакета `oraclehlb.ai` (по имени класса) и entry points
+    группы `oraclehlb.strategies` (по имени entry point) - и дальше отдаёт классы из кэша.
+    Перед первым экземпляром класса вызывается его `warm_up()`: тяжёлые таблицы стратегии
+    строятся один раз на процесс и читаются всеми ботами.
+    """
+
+    def __init__(self, package: str = "oraclehlb.ai", group: str = ENTRY_POINT_GROUP):
+        self.package = package
+        self.group = group
+        self._classes: Optional[Dict[str, Type[BaseStrategy]]] = None
+        self._warm: Set[Type[BaseStrategy]] = set()
+        # Модули и entry points, которые не удалось загрузить при поиске: имя -> ошибка
+        self.errors: Dict[str, str] = {}
+
+    def _discover(self) -> Dict[str, Type[BaseStrategy]]:
+        started = time.perf_counter()
+        classes: Dict[str, Type[BaseStrategy]] = {}
+        package = importlib.import_module(self.package)
+        for module_info in pkgutil.iter_modules(package.__path__, f"{self.package}."):
+            try:
+                module = importlib.import_module(module_info.name)
+            except Exception as e:
+                log.exception("Could not import strategy module '%s'.", module_info.name)
+                self.errors[module_info.name] = repr(e)
+                continue
+            for name, obj in vars(module).items():
+                if (
+                        inspect.isclass(obj) and issubclass(obj, BaseStrategy)
+                        and obj.__module__ == module.__name__ and not inspect.isabstract(obj)
+                ):
+                    classes[name] = obj
 
+        for entry_point in entry_points(group=self.group):
+            try:
+                obj = entry_point.load()
+            except Exception as e:
+                log.exception("Could not load strategy entry point '%s'.", entry_point.name)
+                self.errors[entry_point.name] = repr(e)
+                continue
+            if not (inspect.isclass(obj) and issubclass(obj, BaseStrategy)):
+                log.error("Entry point '%s' is not a BaseStrategy subclass, skipping it.", entry_point.name)
+                self.errors[entry_point.name] = "not a BaseStrategy subclass"
+                continue
+            if entry_point.name in classes:
+                log.warning("Entry point '%s' overrides the bundled strategy of the same name.", entry_point.name)
+            classes[entry_point.name] = obj
+
+        log.info(
+            "Discovered %d strategies in %.1f ms: %s",
+            len(classes), (time.perf_counter() - started) * 1000, ", ".join(sorted(classes)),
+        )
+        return classes
+
+    @property
+    def classes(self) -> Dict[str, Type[BaseStrategy]]:
+        if self._classes is None:
+            self._classes = self._discover()
+        return self._classes
+
+    def get(self, name: str) -> Type[BaseStrategy]:
+        strategy_class = self.classes.get(name)
+        if strategy_class is None:
+            message = f"Unknown strategy '{name}' (available: {', '.join(sorted(self.classes)) or 'none'})."
+            if self.errors:
+                message += f" Failed to load: {', '.join(sorted(self.errors))}."
+            raise ValueError(message)
         return strategy_class
-    except (ImportError, AttributeError):
-        log.exception(f"Could not load strategy class '{strategy_class_name}'.")
-        raise ValueError(f"Could not load strategy class '{strategy_class_name}'.")
 
+    def check(self, name: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Что не так со стратегией `name` и параметрами её конструктора; None - всё в порядке."""
+        try:
+            strategy_class = self.get(name)
+        except ValueError as e:
+            return str(e)
+        try:
+            inspect.signature(strategy_class).bind(**(params or {}))
+        except TypeError as e:
+            return f"Invalid parameters for strategy '{name}': {e}."
+        return None
+
+    def validate(self, configs: Iterable[BotConfig]):
+        """Проверяет стратегии всех ботов до первого логина; все ошибки сразу - одним ValueError."""
+        problems = []
+        for config in configs:
+            error = self.check(config.strategy, config.strategy_params)
+            if error is not None:
+                problems.append(f"bot '{config.username}': {error}")
+        if problems:
+            raise ValueError("Invalid strategy configuration:\n  " + "\n  ".join(problems))
+
+    def warm_up(self, strategy_class: Type[BaseStrategy]):
+        """Однократная подготовка класса в этом процессе (`BaseStrategy.warm_up`)."""
+        if strategy_class in self._warm:
+            return
+        started = time.perf_counter()
+        strategy_class.warm_up()
+        self._warm.add(strategy_class)
+        log.debug("Warmed up %s in %.1f ms", strategy_class.__name__, (time.perf_counter() - started) * 1000)
+
+    def prepare(self, configs: Iterable[BotConfig]):
+        """Проверка и прогрев всех стратегий из конфигурации - до старта ботов."""
+        configs = list(configs)
+        started = time.perf_counter()
+        self.validate(configs)
+        for name in sorted({config.strategy for config in configs}):
+            self.warm_up(self.get(name))
+        log.info("Strategies ready in %.1f ms.", (time.perf_counter() - started) * 1000)
+
+    def create(self, name: str, params: Optional[Dict[str, Any]] = None) -> BaseStrategy:
+        """Новый экземпляр стратегии с параметрами конструктора `params`."""
+        strategy_class = self.get(name)
+        self.warm_up(strategy_class)
+        params = dict(params or {})
+        strategy = strategy_class(**params)
+        strategy.strategy_name = name
+        strategy.strategy_params = params
+        return strategy
+
+
+# Реестр процесса: стратегии ищутся один раз, классы и прогретые таблицы живут до выхода
+strategy_registry = StrategyRegistry()
 
-def load_strategy(strategy_name: str) -> BaseStrategy:
-    """
-    Загружает класс стратегии и возвращает его ЭКЗЕМПЛЯР.
-    В будущем сюда можно будет передавать параметры для инициализации стратегии?
-    """
-    log.debug(f"Loading strategy '{strategy_name}'...")
-    strategy_class = _load_strategy_class(strategy_name)
 
-    # Создаем экземпляр класса
-    return strategy_class()
+def load_strategy(strategy_name: str, params: Optional[Dict[str, Any]] = None) -> BaseStrategy:
+    """Загружает класс стратегии из реестра и возвращает его ЭКЗЕМПЛЯР с параметрами `params`."""
+    log.debug("Loading strategy '%s'...", strategy_name)
+    return strategy_registry.create(strategy_name, params)
@@ -0,0 +1,215 @@
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Tuple
+
+from oraclehlb.game.engine import GameEngine, NUM_RANKS, card_id
+from oraclehlb.game.knowledge import Knowledge
+from oraclehlb.game.moves import COLOR, RANK
+from oraclehlb.game.variants import Variant, get_variant, standard_variant
+
+
+class ClueOption(NamedTuple):
+    """
+    Подсказка руке и её прочтение. Слоты - позиции в руке от самой старой карты (0) к самой новой.
+    `touched`/`new` - маски слотов (все затронутые и затронутые впервые), `focus` - слот фокуса
+    (чоп, если он затронут впервые, иначе самая новая из впервые затронутых; для повторной подсказки -
+    самая новая затронутая), `masks` - возможные идентичности карт руки после подсказки.
+    """
+    kind: int
+    value: int
+    touched: int
+    new: int
+    focus: int
+    masks: Tuple[int, ...]
+
+
+class ClueTable:
+    """
+    Предрасчитанные правила подсказок варианта: для каждого цвета и ранга - маска затрагиваемых
+    идентичностей, для каждой идентичности - маски цветов и рангов, которые её затрагивают
+    (учитывая Rainbow/Null/Muddy Rainbow/Prism и т.п.; ранги, запрещённые вариантом, не предлагаются).
+    Прочтение всех подсказок руке мемоизируется по отпечатку (идентичности, маски возможного,
+    затронутые слоты) с вытеснением по LRU, так что перебор подсказок за ход - поиск в словаре вместо циклов по картам и возможностям.
+    """
+
+    __slots__ = (
+        "variant", "num_ids", "full_mask", "color_masks", "rank_masks", "color_touch", "rank_touch",
+        "cache_size", "hits", "misses", "_cache",
+    )
+
+    def __init__(self, variant: Variant, cache_size: int = 16384):
+        self.variant = variant
+        self.num_ids = variant.num_suits * NUM_RANKS
+        self.full_mask = (1 << self.num_ids) - 1
+        num_colors = len(variant.clue_colors)
+        color_masks = [0] * num_colors
+        # Индекс = ранг подсказки (1..5), нулевой элемент не используется
+        rank_masks = [0] * (NUM_RANKS + 1)
+        color_touch = [0] * self.num_ids
+        rank_touch = [0] * self.num_ids
+        color_index = {color: index for index, color in enumerate(variant.clue_colors)}
+        allowed_ranks = set(variant.clue_ranks)
+
+        for suit_index, suit in enumerate(variant.suits):
+            for rank in range(1, NUM_RANKS + 1):
+                ident = card_id(suit_index, rank)
+                if suit.all_colors:
+                    colors = range(num_colors)
+                elif suit.prism:
+                    colors = [(rank - 1) % num_colors] if num_colors else []
+                else:
+                    colors = [color_index[color] for color in suit.colors if color in color_index]
+                for color in colors:
+                    color_masks[color] |= 1 << ident
+                    color_touch[ident] |= 1 << color
+                if suit.no_ranks:
+                    ranks = []
+                elif suit.all_ranks:
+                    ranks = range(1, NUM_RANKS + 1)
+                else:
+                    ranks = [rank]
+                for clue_rank in ranks:
+                    rank_masks[clue_rank] |= 1 << ident
+                    if clue_rank in allowed_ranks:
+                        rank_touch[ident] |= 1 << clue_rank
+
+        self.color_masks = tuple(color_masks)
+        self.rank_masks = tuple(rank_masks)
+        self.color_touch = tuple(color_touch)
+        self.rank_touch = tuple(rank_touch)
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self._cache: OrderedDict[Tuple, Tuple[ClueOption, ...]] = OrderedDict()
+
+    # --- Касание ---
+
+    def clue_mask(self, kind: int, value: int) -> int:
+        """Маска идентичностей, которых касается подсказка (`kind` - COLOR или RANK из `game.moves`)."""
+        return self.color_masks[value] if kind == COLOR else self.rank_masks[value]
+
+    def touches(self, kind: int, value: int, suit: int, rank: int) -> bool:
+        return suit >= 0 and self.clue_mask(kind, value) >> card_id(suit, rank) & 1 == 1
+
+    def touched(self, engine: GameEngine, target: int, kind: int, value: int) -> List[int]:
+        """Orders карт `target`, которых касается подсказка (идентичности должны быть известны движку)."""
+        mask = self.clue_mask(kind, value)
+        suits, ranks = engine.card_suit, engine.card_rank
+        return [
+            order for order in engine.hand(target)
+            if suits[order] >= 0 and mask >> (suits[order] * NUM_RANKS + ranks[order] - 1) & 1
+        ]
+
+    def knowledge(self, num_players: int) -> Knowledge:
+        """Пустое знание с масками подсказок и числом копий этого варианта."""
+        return Knowledge(
+            num_players=num_players,
+            num_suits=self.variant.num_suits,
+            copies=list(self.variant.copies),
+            color_masks=list(self.color_masks),
+            rank_masks=list(self.rank_masks),
+        )
+
+    # --- Прочтение подсказок ---
+
+    def options(self, idents: Tuple[int, ...], masks: Tuple[int, ...], clued: int) -> Tuple[ClueOption, ...]:
+        """
+        Все подсказки, касающиеся хотя бы одной карты руки: `idents` - идентичности по слотам
+        (-1 - неизвестна, такую карту подсказка не затронет), `masks` - что карта может быть с точки зрения
+        владельца, `clued` - маска уже затронутых слотов. Результат мемоизирован и не должен изменяться.
+        """
+        key = (idents, masks, clued)
+        cache = self._cache
+        result = cache.get(key)
+        if result is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return result
+        self.misses += 1
+        result = self._evaluate(idents, masks, clued)
+        cache[key] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def hand_options(self, engine: GameEngine, target: int) -> Tuple[ClueOption, ...]:
+        """`options` для руки игрока `target` в движке; маски - по знанию движка, если оно есть."""
+        hand = engine.hand(target)
+        suits, ranks = engine.card_suit, engine.card_rank
+        idents = tuple(
+            suits[order] * NUM_RANKS + ranks[order] - 1 if suits[order] >= 0 else -1 for order in hand
+        )
+        knowledge = engine.knowledge
+        if knowledge is not None:
+            masks = tuple(knowledge.possibilities(order, target) for order in hand)
+        else:
+            masks = (self.full_mask,) * len(hand)
+        clued = 0
+        for slot, order in enumerate(hand):
+            if engine.card_clued[order]:
+                clued |= 1 << slot
+        return self.options(idents, masks, clued)
+
+    def _evaluate(self, idents: Tuple[int, ...], masks: Tuple[int, ...], clued: int) -> Tuple[ClueOption, ...]:
+        colors = ranks = 0
+        for ident in idents:
+            if ident >= 0:
+                colors |= self.color_touch[ident]
+                ranks |= self.rank_touch[ident]
+        result = []
+        for kind, available, clue_masks in ((COLOR, colors, self.color_masks), (RANK, ranks, self.rank_masks)):
+            while available:
+                low = available & -available
+                value = low.bit_length() - 1
+                available ^= low
+                result.append(self._read(kind, value, clue_masks[value], idents, masks, clued))
+        return tuple(result)
+
+    @staticmethod
+    def _read(
+            kind: int, value: int, clue_mask: int, idents: Tuple[int, ...], masks: Tuple[int, ...], clued: int,
+    ) -> ClueOption:
+        touched = 0
+        after = []
+        for slot, ident in enumerate(idents):
+            if ident >= 0 and clue_mask >> ident & 1:
+                touched |= 1 << slot
+                after.append(masks[slot] & clue_mask)
+            else:
+                after.append(masks[slot] & ~clue_mask)
+        new = touched & ~clued
+        unclued = ~clued & ((1 << len(idents)) - 1)
+        chop = (unclued & -unclued).bit_length() - 1
+        if new:
+            focus = chop if chop >= 0 and new >> chop & 1 else new.bit_length() - 1
+        else:
+            focus = touched.bit_length() - 1
+        return ClueOption(kind, value, touched, new, focus, tuple(after))
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Общие таблицы процесса: по одной на вариант, вместе с кэшем прочтений
+_tables: Dict[str, ClueTable] = {}
+
+
+def clue_table(variant: Variant) -> ClueTable:
+    table = _tables.get(variant.name)
+    if table is None:
+        table = _tables[variant.name] = ClueTable(variant)
+    return table
+
+
+def standard_table(num_suits: int) -> ClueTable:
+    """Таблица варианта без особых мастей, цвет подсказки = индекс масти."""
+    return clue_table(standard_variant(num_suits))
+
+
+def engine_table(engine: GameEngine) -> ClueTable:
+    """Таблица варианта партии движка (`engine.variant`)."""
+    return clue_table(get_variant(engine.variant)) if engine.variant else standard_table(engine.num_suits)
@@ -0,0 +1,380 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from oraclehlb.models import GameState, Card
+
+NUM_RANKS = 5
+MAX_CLUE_TOKENS = 8
+MAX_STRIKES = 3
+RANK_COPIES = (3, 2, 2, 2, 1)
+COLOR_CLUE, RANK_CLUE = 0, 1
+UNKNOWN = -1
+
+
+def default_hand_size(num_players: int) -> int:
+    if num_players <= 3:
+        return 5
+    if num_players <= 5:
+        return 4
+    return 3
+
+
+def card_id(suit: int, rank: int) -> int:
+    """Компактный идентификатор карты: suit * 5 + (rank - 1)."""
+    return suit * NUM_RANKS + rank - 1
+
+
+class GameEngine:
+    """
+    Компактное состояние партии для горячего пути: только `__slots__` и плоские списки малых int.
+    Масти и ранги карт хранятся по `order`, руки - в массиве фиксированного размера
+    (`num_players * hand_size`, пустые слоты = -1). Понимает действия сервера hanab.live
+    (draw/play/discard/clue/strike/turn/status/gameOver) и умеет дёшево копироваться и откатываться.
+    Pydantic-модель `GameState` строится только на границе (`to_model`).
+    """
+
+    __slots__ = (
+        "table_id", "player_names", "our_player_index",
+        "num_players", "num_suits", "hand_size", "deck_total",
+        "card_suit", "card_rank", "card_clued",
+        "hands", "hand_counts", "stacks", "discards",
+        "clue_tokens", "strikes", "deck_size", "turn", "current_player", "end_turn",
+        "num_actions", "game_over", "variant", "knowledge", "_undo",
+    )
+
+    def __init__(
+            self,
+            num_players: int,
+            num_suits: int = 5,
+            our_player_index: int = UNKNOWN,
+            table_id: int = 0,
+            player_names: Optional[List[str]] = None,
+            hand_size: Optional[int] = None,
+            deck_total: Optional[int] = None,
+            track_undo: bool = False,
+            variant: str = "",
+    ):
+        self.table_id = table_id
+        self.player_names = player_names or [f"player{i}" for i in range(num_players)]
+        self.our_player_index = our_player_index
+        self.num_players = num_players
+        self.num_suits = num_suits
+        self.hand_size = hand_size or default_hand_size(num_players)
+        self.deck_total = deck_total or num_suits * sum(RANK_COPIES)
+
+        self.card_suit = [UNKNOWN] * self.deck_total
+        self.card_rank = [UNKNOWN] * self.deck_total
+        self.card_clued = bytearray(self.deck_total)
+        self.hands = [UNKNOWN] * (num_players * self.hand_size)
+        self.hand_counts = [0] * num_players
+        self.stacks = [0] * num_suits
+        self.discards = [0] * (num_suits * NUM_RANKS)
+
+        self.clue_tokens = MAX_CLUE_TOKENS
+        self.strikes = 0
+        self.deck_size = self.deck_total
+        self.turn = 0
+        self.current_player = 0
+        # Последний ход партии: назначается, когда берут последнюю карту колоды (-1 - колода не пуста)
+        self.end_turn = UNKNOWN
+        self.num_actions = 0
+        self.game_over = False
+        # Имя варианта hanab.live (`oraclehlb.game.variants`); пусто - масти без особых правил
+        self.variant = variant
+        # `oraclehlb.game.knowledge.Knowledge`, если нужно отслеживать возможные идентичности карт
+        self.knowledge = None
+        self._undo: Optional[List[Tuple]] = [] if track_undo else None
+
+    # --- Доступ ---
+
+    @property
+    def score(self) -> int:
+        return sum(self.stacks)
+
+    @property
+    def max_score(self) -> int:
+        return self.num_suits * NUM_RANKS
+
+    def hand(self, player: int) -> List[int]:
+        """Orders карт игрока, от самой старой к самой новой."""
+        base = player * self.hand_size
+        return self.hands[base:base + self.hand_counts[player]]
+
+    def identity(self, order: int) -> Tuple[int, int]:
+        return self.card_suit[order], self.card_rank[order]
+
+    def is_playable(self, suit: int, rank: int) -> bool:
+        return suit >= 0 and self.stacks[suit] + 1 == rank
+
+    @property
+    def next_order(self) -> int:
+        """Order следующей карты из колоды."""
+        return self.deck_total - self.deck_size
+
+    def is_finished(self) -> bool:
+        """Партия окончена по правилам: три страйка, максимум очков или сыгран последний круг."""
+        return (
+                self.game_over
+                or self.strikes >= MAX_STRIKES
+                or self.score == self.max_score
+                or 0 <= self.end_turn < self.turn
+        )
+
+    # --- Копирование и откат ---
+
+    def copy(self, track_undo: bool = True, with_knowledge: bool = True) -> "GameEngine":
+        """
+        Независимая копия (история отката не копируется). Для поиска откат по умолчанию включён;
+        роллаутам с полной информацией знание не нужно - `with_knowledge=False` экономит копирование.
+        """
+        other = GameEngine.__new__(GameEngine)
+        other.table_id = self.table_id
+        other.player_names = self.player_names
+        other.our_player_index = self.our_player_index
+        other.num_players = self.num_players
+        other.num_suits = self.num_suits
+        other.hand_size = self.hand_size
+        other.deck_total = self.deck_total
+        other.card_suit = self.card_suit[:]
+        other.card_rank = self.card_rank[:]
+        other.card_clued = self.card_clued[:]
+        other.hands = self.hands[:]
+        other.hand_counts = self.hand_counts[:]
+        other.stacks = self.stacks[:]
+        other.discards = self.discards[:]
+        other.clue_tokens = self.clue_tokens
+        other.strikes = self.strikes
+        other.deck_size = self.deck_size
+        other.turn = self.turn
+        other.current_player = self.current_player
+        other.end_turn = self.end_turn
+        other.num_actions = self.num_actions
+        other.game_over = self.game_over
+        other.variant = self.variant
+        other.knowledge = self.knowledge.copy() if with_knowledge and self.knowledge is not None else None
+        other._undo = [] if track_undo else None
+        return other
+
+    def __getstate__(self) -> Tuple:
+        """Компактное представление для pickle (передача в процессы-воркеры): значения слотов без истории отката."""
+        return tuple(getattr(self, name) for name in self.__slots__[:-1])
+
+    def __setstate__(self, state: Tuple):
+        for name, value in zip(self.__slots__[:-1], state):
+            setattr(self, name, value)
+        self._undo = None
+
+    def undo(self):
+        """Откатывает последнее действие, применённое с включённой историей (знание не откатывается)."""
+        record = self._undo.pop()
+        kind = record[0]
+        if kind == "draw":
+            _, player, order, suit, rank = record
+            self._pop_newest(player)
+            self.card_suit[order] = suit
+            self.card_rank[order] = rank
+            if self.deck_size == 0:
+                self.end_turn = UNKNOWN
+            self.deck_size += 1
+        elif kind == "remove":
+            # play/discard: вернуть карту в тот же слот и откатить счётчики
+            _, player, slot, order, suit, rank, clue_tokens, stack_or_discard, value = record
+            self._insert_at(player, slot, order)
+            self.card_suit[order] = suit
+            self.card_rank[order] = rank
+            self.clue_tokens = clue_tokens
+            if stack_or_discard >= 0:
+                self.stacks[stack_or_discard] = value
+            else:
+                self.discards[-stack_or_discard - 1] -= 1
+        elif kind == "clue":
+            _, clue_tokens, newly_clued = record
+            self.clue_tokens = clue_tokens
+            for order in newly_clued:
+                self.card_clued[order] = 0
+        elif kind == "scalars":
+            _, self.clue_tokens, self.strikes, self.turn, self.current_player, self.game_over = record
+        self.num_actions -= 1
+
+    def _save_scalars(self):
+        if self._undo is not None:
+            self._undo.append(
+                ("scalars", self.clue_tokens, self.strikes, self.turn, self.current_player, self.game_over)
+            )
+
+    # --- Руки ---
+
+    def _ensure_order(self, order: int):
+        if order >= len(self.card_suit):
+            grow = order + 1 - len(self.card_suit)
+            self.card_suit.extend([UNKNOWN] * grow)
+            self.card_rank.extend([UNKNOWN] * grow)
+            self.card_clued.extend(bytes(grow))
+
+    def _remove_from_hand(self, player: int, order: int) -> int:
+        base = player * self.hand_size
+        count = self.hand_counts[player]
+        slot = self.hands.index(order, base, base + count) - base
+        hands = self.hands
+        hands[base + slot:base + count - 1] = hands[base + slot + 1:base + count]
+        hands[base + count - 1] = UNKNOWN
+        self.hand_counts[player] = count - 1
+        return slot
+
+    def _insert_at(self, player: int, slot: int, order: int):
+        base = player * self.hand_size
+        count = self.hand_counts[player]
+        hands = self.hands
+        hands[base + slot + 1:base + count + 1] = hands[base + slot:base + count]
+        hands[base + slot] = order
+        self.hand_counts[player] = count + 1
+
+    def _pop_newest(self, player: int):
+        count = self.hand_counts[player] - 1
+        self.hands[player * self.hand_size + count] = UNKNOWN
+        self.hand_counts[player] = count
+
+    # --- Действия ---
+
+    def draw(self, player: int, order: int, suit: int = UNKNOWN, rank: int = UNKNOWN):
+        self._ensure_order(order)
+        if self._undo is not None:
+            self._undo.append(("draw", player, order, self.card_suit[order], self.card_rank[order]))
+        self.hands[player * self.hand_size + self.hand_counts[player]] = order
+        self.hand_counts[player] += 1
+        if suit >= 0:
+            self.card_suit[order] = suit
+            self.card_rank[order] = rank
+        self.deck_size -= 1
+        if self.deck_size == 0:
+            # После хода, в котором взята последняя карта, каждый игрок ходит ещё раз
+            self.end_turn = self.turn + self.num_players
+        self.num_actions += 1
+
+    def play(self, player: int, order: int, suit: int, rank: int):
+        """Успешная игра карты (неудачная приходит от сервера как discard(failed) + strike)."""
+        slot = self._remove_from_hand(player, order)
+        if self._undo is not None:
+            self._undo.append((
+                "remove", player, slot, order, self.card_suit[order], self.card_rank[order],
+                self.clue_tokens, suit, self.stacks[suit],
+            ))
+        self.card_suit[order] = suit
+        self.card_rank[order] = rank
+        self.stacks[suit] = rank
+        if rank == NUM_RANKS and self.clue_tokens < MAX_CLUE_TOKENS:
+            self.clue_tokens += 1
+        self.num_actions += 1
+
+    def discard(self, player: int, order: int, suit: int, rank: int, failed: bool = False):
+        slot = self._remove_from_hand(player, order)
+        index = card_id(suit, rank)
+        if self._undo is not None:
+            self._undo.append((
+                "remove", player, slot, order, self.card_suit[order], self.card_rank[order],
+                self.clue_tokens, -index - 1, 0,
+            ))
+        self.card_suit[order] = suit
+        self.card_rank[order] = rank
+        self.discards[index] += 1
+        if not failed and self.clue_tokens < MAX_CLUE_TOKENS:
+            self.clue_tokens += 1
+        self.num_actions += 1
+
+    def attempt_play(self, player: int, order: int):
+        """Игра карты с известной движку идентичностью: успех или сброс со страйком (для симуляций)."""
+        suit, rank = self.card_suit[order], self.card_rank[order]
+        if self.is_playable(suit, rank):
+            self.play(player, order, suit, rank)
+        else:
+            self.discard(player, order, suit, rank, failed=True)
+            self.strike(self.strikes + 1)
+
+    def clue(self, giver: int, target: int, clue_type: int, value: int, touched: List[int]):
+        newly_clued = [order for order in touched if not self.card_clued[order]]
+        if self._undo is not None:
+            self._undo.append(("clue", self.clue_tokens, newly_clued))
+        for order in newly_clued:
+            self.card_clued[order] = 1
+        self.clue_tokens -= 1
+        self.num_actions += 1
+
+    def strike(self, num: int):
+        self._save_scalars()
+        self.strikes = num
+        self.num_actions += 1
+
+    def set_turn(self, num: int, current_player: int):
+        self._save_scalars()
+        self.turn = num
+        self.current_player = current_player
+        self.num_actions += 1
+
+    def set_status(self, clues: int):
+        self._save_scalars()
+        self.clue_tokens = clues
+        self.num_actions += 1
+
+    def finish(self):
+        self._save_scalars()
+        self.game_over = True
+        self.num_actions += 1
+
+    def apply(self, action: Dict[str, Any]):
+        """Применяет одно действие в формате `gameAction` сервера hanab.live."""
+        kind = action.get("type")
+        if kind == "draw":
+            self.draw(action["playerIndex"], action["order"], action.get("suitIndex", UNKNOWN), action.get("rank", UNKNOWN))
+        elif kind == "play":
+            self.play(action["playerIndex"], action["order"], action["suitIndex"], action["rank"])
+        elif kind == "discard":
+            self.discard(action["playerIndex"], action["order"], action["suitIndex"], action["rank"], action.get("failed", False))
+        elif kind == "clue":
+            clue = action["clue"]
+            self.clue(action["giver"], action["target"], clue["type"], clue["value"], action["list"])
+        elif kind == "turn":
+            self.set_turn(action["num"], action["currentPlayerIndex"])
+        elif kind == "strike":
+            self.strike(action["num"])
+        elif kind == "status":
+            self.set_status(action["clues"])
+        elif kind == "gameOver":
+            self.finish()
+        else:
+            # Неизвестные действия (playerTimes, cardIdentity, ...) не меняют состояние,
+            # но считаются, чтобы индекс действия совпадал с индексом в gameActionList.
+            self._save_scalars()
+            self.num_actions += 1
+        if self.knowledge is not None:
+            self.knowledge.apply(action, self)
+
+    def apply_all(self, actions: List[Dict[str, Any]]):
+        """Пакетное применение истории (gameActionList) без каких-либо событий."""
+        apply = self.apply
+        for action in actions:
+            apply(action)
+
+    # --- Граница с pydantic ---
+
+    def to_model(self) -> GameState:
+        """Pydantic-представление для стратегий; сам движок доступен через `state.engine`."""
+        state = GameState(
+            table_id=self.table_id,
+            player_names=self.player_names,
+            our_player_index=self.our_player_index,
+            hands={
+                player: [
+                    Card(order=order, suit_index=self.card_suit[order], rank=self.card_rank[order])
+                    for order in self.hand(player)
+                ]
+                for player in range(self.num_players)
+            },
+            clue_tokens=self.clue_tokens,
+            mistake_tokens=MAX_STRIKES - self.strikes,
+            current_player_index=self.current_player,
+            stacks=self.stacks[:],
+            deck_size=self.deck_size,
+            turn=self.turn,
+            variant=self.variant,
+        )
+        state._engine = self
+        return state
@@ -0,0 +1,174 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from oraclehlb.game.engine import NUM_RANKS, RANK_COPIES, COLOR_CLUE, UNKNOWN, card_id
+
+
+def suit_mask(suit: int) -> int:
+    return ((1 << NUM_RANKS) - 1) << (suit * NUM_RANKS)
+
+
+def rank_mask(rank: int, num_suits: int) -> int:
+    mask = 0
+    for suit in range(num_suits):
+        mask |= 1 << card_id(suit, rank)
+    return mask
+
+
+def identities(mask: int) -> List[Tuple[int, int]]:
+    """Раскладывает битовую маску на список (suit, rank)."""
+    result = []
+    while mask:
+        low = mask & -mask
+        index = low.bit_length() - 1
+        result.append(divmod(index, NUM_RANKS))
+        mask ^= low
+    return [(suit, rank + 1) for suit, rank in result]
+
+
+class Knowledge:
+    """
+    Что может быть каждой картой: битовая маска по идентичностям (suit * 5 + rank - 1) на каждый `order`.
+    Маски сужаются подсказками (включая отрицательную информацию для нетронутых карт),
+    а глобальные таблицы счётчиков (сыгранные/сброшенные + видимые в руках) ведутся инкрементально.
+    Эмпатия игрока - маска карты минус идентичности, все копии которых он уже видит (`exhausted`).
+
+    Цвета и ранги подсказок задаются масками (`color_masks`, `rank_masks`), число копий - `copies`,
+    так что модуль не зависит от конкретного варианта hanab.live.
+    """
+
+    __slots__ = (
+        "num_players", "num_suits", "num_ids", "full_mask", "copies",
+        "color_masks", "rank_masks",
+        "possible", "counted", "public", "held", "total_held", "exhausted",
+    )
+
+    def __init__(
+            self,
+            num_players: int,
+            num_suits: int = 5,
+            copies: Optional[List[int]] = None,
+            color_masks: Optional[List[int]] = None,
+            rank_masks: Optional[List[int]] = None,
+            deck_total: Optional[int] = None,
+    ):
+        self.num_players = num_players
+        self.num_suits = num_suits
+        self.num_ids = num_suits * NUM_RANKS
+        self.full_mask = (1 << self.num_ids) - 1
+        self.copies = copies or [RANK_COPIES[i % NUM_RANKS] for i in range(self.num_ids)]
+        self.color_masks = color_masks or [suit_mask(suit) for suit in range(num_suits)]
+        # Индекс = ранг подсказки (1..5), нулевой элемент не используется
+        self.rank_masks = rank_masks or [0] + [rank_mask(rank, num_suits) for rank in range(1, NUM_RANKS + 1)]
+
+        deck_total = deck_total or sum(self.copies)
+        self.possible = [self.full_mask] * deck_total
+        # Идентичность, под которой карта учтена в `held` (-1 - не учтена)
+        self.counted = [UNKNOWN] * deck_total
+        self.public = [0] * self.num_ids
+        self.held = [[0] * self.num_ids for _ in range(num_players)]
+        self.total_held = [0] * self.num_ids
+        self.exhausted = [0] * num_players
+
+    def copy(self) -> "Knowledge":
+        other = Knowledge.__new__(Knowledge)
+        other.num_players = self.num_players
+        other.num_suits = self.num_suits
+        other.num_ids = self.num_ids
+        other.full_mask = self.full_mask
+        other.copies = self.copies
+        other.color_masks = self.color_masks
+        other.rank_masks = self.rank_masks
+        other.possible = self.possible[:]
+        other.counted = self.counted[:]
+        other.public = self.public[:]
+        other.held = [row[:] for row in self.held]
+        other.total_held = self.total_held[:]
+        other.exhausted = self.exhausted[:]
+        return other
+
+    def __getstate__(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    # --- Запросы ---
+
+    def possibilities(self, order: int, holder: int) -> int:
+        """Маска того, чем карта может быть с точки зрения её владельца."""
+        possible = self.possible[order]
+        narrowed = possible & ~self.exhausted[holder]
+        return narrowed or possible
+
+    def candidates(self, order: int, holder: int) -> List[Tuple[int, int]]:
+        return identities(self.possibilities(order, holder))
+
+    def visible_count(self, ident: int, player: int) -> int:
+        """Сколько копий идентичности видит игрок: в колоде сброса/на столе и в чужих руках."""
+        return self.public[ident] + self.total_held[ident] - self.held[player][ident]
+
+    # --- Обновления ---
+
+    def _ensure_order(self, order: int):
+        if order >= len(self.possible):
+            grow = order + 1 - len(self.possible)
+            self.possible.extend([self.full_mask] * grow)
+            self.counted.extend([UNKNOWN] * grow)
+
+    def _refresh(self, ident: int):
+        bit = 1 << ident
+        seen = self.public[ident] + self.total_held[ident]
+        need = self.copies[ident]
+        exhausted = self.exhausted
+        for player in range(self.num_players):
+            if seen - self.held[player][ident] >= need:
+                exhausted[player] |= bit
+            else:
+                exhausted[player] &= ~bit
+
+    def _count_in_hand(self, order: int, player: int, ident: int):
+        self.counted[order] = ident
+        self.held[player][ident] += 1
+        self.total_held[ident] += 1
+        self._refresh(ident)
+
+    def draw(self, player: int, order: int, suit: int, rank: int):
+        self._ensure_order(order)
+        self.possible[order] = self.full_mask
+        if suit >= 0:
+            self._count_in_hand(order, player, card_id(suit, rank))
+
+    def reveal(self, player: int, order: int, suit: int, rank: int):
+        """Карта ушла из руки в открытую (сыграна или сброшена)."""
+        ident = card_id(suit, rank)
+        previous = self.counted[order]
+        if previous >= 0:
+            self.held[player][previous] -= 1
+            self.total_held[previous] -= 1
+            self.counted[order] = UNKNOWN
+            if previous != ident:
+                self._refresh(previous)
+        self.public[ident] += 1
+        self.possible[order] = 1 << ident
+        self._refresh(ident)
+
+    def clue(self, clue_type: int, value: int, hand: List[int], touched: List[int]):
+        mask = self.color_masks[value] if clue_type == COLOR_CLUE else self.rank_masks[value]
+        possible = self.possible
+        for order in hand:
+            if order in touched:
+                possible[order] &= mask
+            else:
+                possible[order] &= ~mask
+
+    def apply(self, action: Dict[str, Any], engine):
+        """Обновление по действию сервера; вызывается движком после того, как он сам применил действие."""
+        kind = action.get("type")
+        if kind == "draw":
+            self.draw(action["playerIndex"], action["order"], action.get("suitIndex", UNKNOWN), action.get("rank", UNKNOWN))
+        elif kind == "play" or kind == "discard":
+            self.reveal(action["playerIndex"], action["order"], action["suitIndex"], action["rank"])
+        elif kind == "clue":
+            clue = action["clue"]
+            self.clue(clue["type"], clue["value"], engine.hand(action["target"]), action["list"])
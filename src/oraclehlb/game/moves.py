@@ -0,0 +1,90 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from oraclehlb.game.engine import GameEngine, COLOR_CLUE, RANK_CLUE, MAX_CLUE_TOKENS, NUM_RANKS
+from oraclehlb.models import ActionType
+
+# Ход игрока как кортеж (вид, цель, значение); виды совпадают с типами команды `action` hanab.live.
+# PLAY/DISCARD: цель - order карты; COLOR/RANK: цель - индекс игрока, значение - цвет или ранг.
+PLAY, DISCARD, COLOR, RANK = (
+    ActionType.PLAY.value, ActionType.DISCARD.value, ActionType.SUIT_CLUE.value, ActionType.RANK_CLUE.value,
+)
+Move = Tuple[int, int, int]
+
+_KINDS = frozenset((PLAY, DISCARD, COLOR, RANK))
+
+
+def touched_by(engine: GameEngine, target: int, kind: int, value: int, table=None) -> List[int]:
+    """
+    Orders карт `target`, которых касается подсказка (идентичности должны быть известны движку).
+    Без `table` (`game.clues.ClueTable`) - правила варианта без особых мастей: цвет = масть.
+    """
+    if table is not None:
+        return table.touched(engine, target, kind, value)
+    identity = engine.card_suit if kind == COLOR else engine.card_rank
+    return [order for order in engine.hand(target) if identity[order] == value]
+
+
+def legal_moves(engine: GameEngine, player: int, table=None) -> List[Move]:
+    """
+    Все разрешённые ходы игрока; подсказки - только касающиеся хотя бы одной карты
+    (по правилам `table`, если он задан, см. `touched_by`).
+    """
+    hand = engine.hand(player)
+    moves: List[Move] = [(PLAY, order, 0) for order in hand]
+    if engine.clue_tokens < MAX_CLUE_TOKENS:
+        moves += [(DISCARD, order, 0) for order in hand]
+    if engine.clue_tokens > 0:
+        for offset in range(1, engine.num_players):
+            target = (player + offset) % engine.num_players
+            if table is not None:
+                moves += [(option.kind, target, option.value) for option in table.hand_options(engine, target)]
+                continue
+            target_hand = engine.hand(target)
+            suits = {engine.card_suit[order] for order in target_hand}
+            ranks = {engine.card_rank[order] for order in target_hand}
+            moves += [(COLOR, target, suit) for suit in sorted(suits) if suit >= 0]
+            moves += [(RANK, target, rank) for rank in sorted(ranks) if 1 <= rank <= NUM_RANKS]
+    return moves
+
+
+def draw_from(engine: GameEngine, player: int, deck: List[Tuple[int, int]]):
+    """Добор из детерминированной колоды (карта берётся с конца списка)."""
+    if deck and engine.deck_size > 0:
+        suit, rank = deck.pop()
+        engine.draw(player, engine.next_order, suit, rank)
+
+
+def apply_move(engine: GameEngine, player: int, move: Move, deck: List[Tuple[int, int]]):
+    """Применяет ход при полной информации (симуляции, роллауты) вместе с добором карты."""
+    kind, target, value = move
+    if kind == PLAY:
+        engine.attempt_play(player, target)
+        draw_from(engine, player, deck)
+    elif kind == DISCARD:
+        engine.discard(player, target, engine.card_suit[target], engine.card_rank[target])
+        draw_from(engine, player, deck)
+    else:
+        clue_type = COLOR_CLUE if kind == COLOR else RANK_CLUE
+        engine.clue(player, target, clue_type, value, touched_by(engine, target, kind, value))
+
+
+def next_turn(engine: GameEngine):
+    """Передаёт ход следующему игроку без записи в историю отката."""
+    engine.turn += 1
+    engine.current_player = (engine.current_player + 1) % engine.num_players
+
+
+def move_to_payload(move: Move) -> Dict[str, Any]:
+    """Ход -> payload команды `action` (без tableID)."""
+    kind, target, value = move
+    payload = {"type": kind, "target": target}
+    if kind in (COLOR, RANK):
+        payload["value"] = value
+    return payload
+
+
+def payload_to_move(payload: Dict[str, Any]) -> Optional[Move]:
+    kind = payload.get("type")
+    if not isinstance(kind, int) or kind not in _KINDS or not isinstance(payload.get("target"), int):
+        return None
+    return kind, payload["target"], int(payload.get("value", 0))
@@ -0,0 +1,332 @@
+import logging
+import mmap
+import os
+import struct
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+from oraclehlb.game.clues import clue_table, standard_table
+from oraclehlb.game.engine import GameEngine, UNKNOWN
+from oraclehlb.game.variants import find_variant
+
+log = logging.getLogger(__name__)
+
+# Хранилище сыгранных партий: три файла в одном каталоге.
+#   actions.bin - записи действий фиксированной ширины подряд, партия за партией;
+#   games.bin   - заголовки партий фиксированной ширины (ссылка на первое действие, счёт, стратегия...);
+#   strings.txt - интернированные строки (сиды, варианты, стратегии, имена), id = номер строки.
+# Заголовок пишется последним, поэтому оборванная запись не видна читателю.
+
+# kind, a, b, c, d, flags, h, mask
+#   draw/play/discard: a = playerIndex, c = suitIndex, d = rank, h = order, flags & 1 = failed
+#   clue: a = giver, b = target, c = тип подсказки, d = значение, mask = битовая маска orders из list
+#   turn: a = currentPlayerIndex, h = num; strike: h = num; status: b = clues, c = score
+#   gameOver: a = playerIndex, b = endCondition
+#   cardIdentity: как draw - раскрытая идентичность карты (импорт дописывает так невзятые карты колоды)
+ACTION = struct.Struct("<BbbbbBhQ")
+GAME = struct.Struct("<QQIBBBBB3xIII6Id")
+MAX_PLAYERS = 6
+# Clue list хранится битовой маской, поэтому orders должны помещаться в 64 бита
+MAX_ORDERS = 64
+
+DRAW, PLAY, DISCARD, CLUE, TURN, STRIKE, STATUS, GAME_OVER, OTHER, IDENTITY = range(10)
+_KINDS = {
+    "draw": DRAW, "play": PLAY, "discard": DISCARD, "clue": CLUE, "turn": TURN,
+    "strike": STRIKE, "status": STATUS, "gameOver": GAME_OVER, "cardIdentity": IDENTITY,
+}
+
+# Описание записи действия для numpy (`RecordStore.columns`)
+ACTION_FIELDS = [
+    ("kind", "u1"), ("a", "i1"), ("b", "i1"), ("c", "i1"), ("d", "i1"), ("flags", "u1"), ("h", "<i2"), ("mask", "<u8"),
+]
+
+
+def encode_action(action: Dict[str, Any]) -> bytes:
+    """Действие `gameAction` hanab.live -> запись фиксированной ширины."""
+    kind = _KINDS.get(action.get("type"), OTHER)
+    if kind in (DRAW, PLAY, DISCARD, IDENTITY):
+        return ACTION.pack(
+            kind, action.get("playerIndex", UNKNOWN), 0, action.get("suitIndex", UNKNOWN), action.get("rank", UNKNOWN),
+            1 if action.get("failed") else 0, action["order"], 0,
+        )
+    if kind == CLUE:
+        mask = 0
+        for order in action["list"]:
+            if order >= MAX_ORDERS:
+                raise ValueError(f"Card order {order} does not fit the clue mask")
+            mask |= 1 << order
+        clue = action["clue"]
+        return ACTION.pack(kind, action["giver"], action["target"], clue["type"], clue["value"], 0, 0, mask)
+    if kind == TURN:
+        return ACTION.pack(kind, action["currentPlayerIndex"], 0, 0, 0, 0, action["num"], 0)
+    if kind == STRIKE:
+        return ACTION.pack(kind, 0, 0, 0, 0, 0, action["num"], 0)
+    if kind == STATUS:
+        return ACTION.pack(kind, 0, action["clues"], action.get("score", 0), 0, 0, 0, 0)
+    if kind == GAME_OVER:
+        return ACTION.pack(kind, action.get("playerIndex", 0), action.get("endCondition", 0), 0, 0, 0, 0, 0)
+    # Прочие действия не меняют состояние, но сохраняются, чтобы индексы действий совпадали
+    return ACTION.pack(OTHER, 0, 0, 0, 0, 0, 0, 0)
+
+
+def _mask_orders(mask: int) -> List[int]:
+    orders = []
+    order = 0
+    while mask:
+        if mask & 1:
+            orders.append(order)
+        mask >>= 1
+        order += 1
+    return orders
+
+
+def decode_action(record: Tuple) -> Dict[str, Any]:
+    """Распакованная запись -> действие в формате сервера (для `GameEngine.apply` и `Knowledge`)."""
+    kind, a, b, c, d, flags, h, mask = record
+    if kind == DRAW:
+        return {"type": "draw", "playerIndex": a, "order": h, "suitIndex": c, "rank": d}
+    if kind == PLAY:
+        return {"type": "play", "playerIndex": a, "order": h, "suitIndex": c, "rank": d}
+    if kind == DISCARD:
+        return {"type": "discard", "playerIndex": a, "order": h, "suitIndex": c, "rank": d, "failed": bool(flags & 1)}
+    if kind == CLUE:
+        return {"type": "clue", "giver": a, "target": b, "clue": {"type": c, "value": d}, "list": _mask_orders(mask)}
+    if kind == TURN:
+        return {"type": "turn", "num": h, "currentPlayerIndex": a}
+    if kind == STRIKE:
+        return {"type": "strike", "num": h}
+    if kind == STATUS:
+        return {"type": "status", "clues": b, "score": c}
+    if kind == GAME_OVER:
+        return {"type": "gameOver", "playerIndex": a, "endCondition": b}
+    if kind == IDENTITY:
+        return {"type": "cardIdentity", "playerIndex": a, "order": h, "suitIndex": c, "rank": d}
+    return {"type": "unknown"}
+
+
+@dataclass(slots=True)
+class GameRecord:
+    """Заголовок сохранённой партии."""
+    row: int
+    table_id: int
+    first_action: int
+    num_actions: int
+    num_players: int
+    our_player_index: int
+    num_suits: int
+    score: int
+    strikes: int
+    variant: str
+    strategy: str
+    seed: str
+    players: List[str]
+    finished_at: float
+
+
+class RecordWriter:
+    """Дописывает партии в хранилище. Один писатель на каталог."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        self._strings_path = path / "strings.txt"
+        self._strings: Dict[str, int] = {}
+        if self._strings_path.exists():
+            for index, value in enumerate(self._strings_path.read_text(encoding="utf-8").split("\n")[:-1]):
+                self._strings[value] = index
+        self._actions_path = path / "actions.bin"
+        self._games_path = path / "games.bin"
+        # Хвост от оборванной записи (действия без заголовка) отрезается
+        self._actions_path.touch()
+        self._games_path.touch()
+        games_size = self._games_path.stat().st_size
+        games_size -= games_size % GAME.size
+        self._num_actions = 0
+        if games_size:
+            with open(self._games_path, "rb") as f:
+                f.seek(games_size - GAME.size)
+                last = GAME.unpack(f.read(GAME.size))
+            self._num_actions = last[1] + last[2]
+        os.truncate(self._games_path, games_size)
+        os.truncate(self._actions_path, self._num_actions * ACTION.size)
+
+    def _intern(self, value: str, new_strings: List[str]) -> int:
+        value = value.replace("\n", " ")
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+            new_strings.append(value)
+        return index
+
+    def append(
+            self,
+            engine: GameEngine,
+            actions: List[Dict[str, Any]],
+            strategy: str = "",
+            variant: str = "No Variant",
+            seed: str = "",
+    ) -> int:
+        """Сохраняет партию (движок - её итоговое состояние) и возвращает номер её заголовка."""
+        if engine.num_players > MAX_PLAYERS:
+            raise ValueError(f"At most {MAX_PLAYERS} players can be recorded")
+        blob = b"".join(encode_action(action) for action in actions)
+        new_strings: List[str] = []
+        players = [self._intern(name, new_strings) for name in engine.player_names]
+        players += [0] * (MAX_PLAYERS - len(players))
+        header = GAME.pack(
+            engine.table_id, self._num_actions, len(actions), engine.num_players,
+            max(engine.our_player_index, 0), engine.num_suits, engine.score, engine.strikes,
+            self._intern(variant, new_strings), self._intern(strategy, new_strings), self._intern(seed, new_strings),
+            *players, time.time(),
+        )
+        if new_strings:
+            with open(self._strings_path, "a", encoding="utf-8") as f:
+                f.write("".join(value + "\n" for value in new_strings))
+        with open(self._actions_path, "ab") as f:
+            f.write(blob)
+        with open(self._games_path, "ab") as f:
+            row = f.tell() // GAME.size
+            f.write(header)
+        self._num_actions += len(actions)
+        return row
+
+
+class RecordStore:
+    """
+    Чтение хранилища: файлы отображаются в память (mmap), заголовки разбираются один раз
+    и индексируются по tableID, стратегии и счёту. Действия распаковываются потоково,
+    без JSON, и могут сразу проигрываться в `GameEngine`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        strings_path = path / "strings.txt"
+        strings = strings_path.read_text(encoding="utf-8").split("\n")[:-1] if strings_path.exists() else []
+        self._actions = self._map(path / "actions.bin")
+        games = self._map(path / "games.bin")
+
+        self.games: List[GameRecord] = []
+        self.by_table: Dict[int, List[int]] = defaultdict(list)
+        self.by_strategy: Dict[str, List[int]] = defaultdict(list)
+        self.by_score: Dict[int, List[int]] = defaultdict(list)
+        if games is not None:
+            for row, fields in enumerate(GAME.iter_unpack(games[:len(games) - len(games) % GAME.size])):
+                (table_id, first_action, num_actions, num_players, our_player_index, num_suits, score, strikes,
+                 variant, strategy, seed, *players, finished_at) = fields
+                record = GameRecord(
+                    row, table_id, first_action, num_actions, num_players, our_player_index, num_suits,
+                    score, strikes, strings[variant], strings[strategy], strings[seed],
+                    [strings[index] for index in players[:num_players]], finished_at,
+                )
+                self.games.append(record)
+                self.by_table[table_id].append(row)
+                self.by_strategy[record.strategy].append(row)
+                self.by_score[score].append(row)
+            games.close()
+
+    @staticmethod
+    def _map(path: Path) -> Optional[mmap.mmap]:
+        if not path.exists() or path.stat().st_size == 0:
+            return None
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self._actions is not None:
+            self._actions.close()
+            self._actions = None
+
+    def __enter__(self) -> "RecordStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def find(
+            self,
+            table_id: Optional[int] = None,
+            strategy: Optional[str] = None,
+            min_score: Optional[int] = None,
+            max_score: Optional[int] = None,
+    ) -> List[GameRecord]:
+        """Партии, удовлетворяющие всем заданным условиям, в порядке записи."""
+        rows: Optional[set] = None
+        if table_id is not None:
+            rows = set(self.by_table.get(table_id, ()))
+        if strategy is not None:
+            matching = set(self.by_strategy.get(strategy, ()))
+            rows = matching if rows is None else rows & matching
+        if min_score is not None or max_score is not None:
+            low = 0 if min_score is None else min_score
+            high = max(self.by_score, default=0) if max_score is None else max_score
+            matching = {row for score in range(low, high + 1) for row in self.by_score.get(score, ())}
+            rows = matching if rows is None else rows & matching
+        if rows is None:
+            return list(self.games)
+        return [self.games[row] for row in sorted(rows)]
+
+    def raw_actions(self, record: GameRecord) -> Iterator[Tuple]:
+        """Распакованные записи действий партии (кортежи полей `ACTION`)."""
+        if self._actions is None:
+            return iter(())
+        start = record.first_action * ACTION.size
+        return ACTION.iter_unpack(self._actions[start:start + record.num_actions * ACTION.size])
+
+    def actions(self, record: GameRecord) -> Iterator[Dict[str, Any]]:
+        """Действия партии в формате сервера hanab.live."""
+        return map(decode_action, self.raw_actions(record))
+
+    def replay(self, record: GameRecord, with_knowledge: bool = False) -> GameEngine:
+        """Новый движок с проигранной партией (с точки зрения записавшего её игрока)."""
+        variant = find_variant(record.variant)
+        if variant is not None and variant.num_suits != record.num_suits:
+            variant = None
+        engine = GameEngine(
+            num_players=record.num_players,
+            num_suits=record.num_suits,
+            our_player_index=record.our_player_index,
+            table_id=record.table_id,
+            player_names=record.players,
+            deck_total=variant.deck_size if variant else None,
+            variant=variant.name if variant else "",
+        )
+        if with_knowledge:
+            table = clue_table(variant) if variant else standard_table(record.num_suits)
+            engine.knowledge = table.knowledge(engine.num_players)
+            engine.apply_all(list(self.actions(record)))
+            return engine
+        # Без знания действия применяются прямо из кортежей, минуя словари
+        for kind, a, b, c, d, flags, h, mask in self.raw_actions(record):
+            if kind == DRAW:
+                engine.draw(a, h, c, d)
+            elif kind == PLAY:
+                engine.play(a, h, c, d)
+            elif kind == DISCARD:
+                engine.discard(a, h, c, d, bool(flags & 1))
+            elif kind == CLUE:
+                engine.clue(a, b, c, d, _mask_orders(mask))
+            elif kind == TURN:
+                engine.set_turn(h, a)
+            elif kind == STRIKE:
+                engine.strike(h)
+            elif kind == STATUS:
+                engine.set_status(b)
+            elif kind == GAME_OVER:
+                engine.finish()
+            else:
+                engine.num_actions += 1
+        return engine
+
+    def columns(self):
+        """Все действия хранилища как структурированный массив numpy (без копирования; нужен numpy)."""
+        import numpy as np
+        dtype = np.dtype(ACTION_FIELDS)
+        if self._actions is None:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(self._actions, dtype=dtype)
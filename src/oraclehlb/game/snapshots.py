@@ -0,0 +1,54 @@
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from oraclehlb.game.engine import GameEngine
+
+log = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    """
+    Снимки движка по (tableID, ourPlayerIndex, индекс действия), общие для всех ботов процесса.
+    После переподключения или перезапуска бота gameActionList доигрывается от последнего
+    подходящего снимка, а не с нуля. Хранит несколько последних снимков на стол, столы вытесняются по LRU.
+    """
+
+    def __init__(self, max_tables: int = 256, per_table: int = 4):
+        self._max_tables = max_tables
+        self._per_table = per_table
+        # (table_id, perspective) -> [(num_actions, engine, последнее применённое действие), ...]
+        self._entries: OrderedDict[Tuple[int, int], List[Tuple[int, GameEngine, Dict[str, Any]]]] = OrderedDict()
+
+    def store(self, engine: GameEngine, last_action: Dict[str, Any]):
+        key = (engine.table_id, engine.our_player_index)
+        entries = self._entries.get(key)
+        if entries is None:
+            entries = self._entries[key] = []
+            if len(self._entries) > self._max_tables:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        if entries and entries[-1][0] >= engine.num_actions:
+            return
+        entries.append((engine.num_actions, engine.copy(track_undo=False), last_action))
+        if len(entries) > self._per_table:
+            del entries[0]
+
+    def restore(self, table_id: int, perspective: int, actions: List[Dict[str, Any]]) -> Optional[GameEngine]:
+        """Копия самого свежего снимка, чья история совпадает с префиксом `actions`."""
+        entries = self._entries.get((table_id, perspective))
+        if not entries:
+            return None
+        for num_actions, engine, last_action in reversed(entries):
+            if num_actions <= len(actions) and actions[num_actions - 1] == last_action:
+                self._entries.move_to_end((table_id, perspective))
+                return engine.copy(track_undo=False)
+        return None
+
+    def drop(self, table_id: int, perspective: int):
+        self._entries.pop((table_id, perspective), None)
+
+
+# Синглтон на процесс: переживает перезапуск ботов супервизором
+snapshot_cache = SnapshotCache()
@@ -0,0 +1,208 @@
+"""
+Каталог вариантов hanab.live: масти, цвета и ранги подсказок, состав колоды.
+
+Определения лежат в `oraclehlb/data/variants.json` (поля как в suits.json/variants.json hanab.live).
+Варианты ищутся только по имени: сервер присылает его в `options.variantName`, а собственных id
+у каталога нет. Не поддерживаются варианты с особыми рангами (Pink-Ones, Brown-Fives, Odds and Evens,
+Deceptive-Ones, Up or Down...) и прочими особыми правилами: их нет в каталоге, и стол с таким
+вариантом бот покидает (см. `services.state`).
+Разобранный каталог кэшируется pickle-файлом, так что следующие процессы (боты, воркеры пула решений,
+симулятор) загружают готовые неизменяемые структуры (именованные кортежи - самое быстрое для pickle),
+не разбирая JSON. Кэш привязан к размеру и
+времени изменения файла данных и пересобирается сам.
+"""
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from oraclehlb.config import USER_CACHE_DIR
+from oraclehlb.game.engine import NUM_RANKS, RANK_COPIES
+
+log = logging.getLogger(__name__)
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "variants.json"
+CACHE_DIR = USER_CACHE_DIR
+ALL_RANKS = tuple(range(1, NUM_RANKS + 1))
+
+
+class Suit(NamedTuple):
+    """
+    Масть hanab.live и правила, по которым её касаются подсказки.
+    `colors` - цвета подсказок, которые её касаются (пусто - ни один, как у White/Null; два - у Orange),
+    `all_colors` - касается любой цвет (Rainbow, Omni, Muddy Rainbow),
+    `prism` - карту ранга r касается цвет с индексом (r - 1) % число цветов,
+    `all_ranks`/`no_ranks` - касается любая подсказка рангом (Pink) или ни одна (Brown),
+    `dark` - по одной копии каждой карты (Black, Gray, ...).
+    """
+    name: str
+    colors: Tuple[str, ...] = ()
+    all_colors: bool = False
+    prism: bool = False
+    all_ranks: bool = False
+    no_ranks: bool = False
+    dark: bool = False
+
+    @property
+    def plain(self) -> bool:
+        """Обычная масть: ровно один собственный цвет и обычные подсказки рангом."""
+        return (
+                len(self.colors) == 1 and not self.dark
+                and not (self.all_colors or self.prism or self.all_ranks or self.no_ranks)
+        )
+
+
+class Variant(NamedTuple):
+    """Вариант: масти, доступные цвета и ранги подсказок, число копий каждой идентичности (suit * 5 + rank - 1)."""
+    name: str
+    suits: Tuple[Suit, ...]
+    clue_colors: Tuple[str, ...]
+    clue_ranks: Tuple[int, ...]
+    copies: Tuple[int, ...]
+
+    @property
+    def num_suits(self) -> int:
+        return len(self.suits)
+
+    @property
+    def deck_size(self) -> int:
+        return sum(self.copies)
+
+    @property
+    def plain(self) -> bool:
+        return all(suit.plain for suit in self.suits)
+
+
+class VariantCatalog:
+    """Все варианты с поиском по имени за O(1); структуры неизменяемы и общие для всех ботов процесса."""
+
+    __slots__ = ("variants", "by_name")
+
+    def __init__(self, variants: Tuple[Variant, ...]):
+        self.variants = variants
+        self.by_name: Mapping[str, Variant] = MappingProxyType({variant.name: variant for variant in variants})
+
+    def __len__(self) -> int:
+        return len(self.variants)
+
+    def __getstate__(self) -> Tuple[Variant, ...]:
+        return self.variants
+
+    def __setstate__(self, variants: Tuple[Variant, ...]):
+        self.__init__(variants)
+
+    def get(self, name: str) -> Optional[Variant]:
+        return self.by_name.get(name)
+
+    def __getitem__(self, name: str) -> Variant:
+        return self.by_name[name]
+
+
+def _parse_suit(entry: Dict[str, Any]) -> Suit:
+    all_colors = entry.get("allClueColors", False)
+    prism = entry.get("prism", False)
+    if "clueColors" in entry:
+        colors = tuple(entry["clueColors"])
+    elif all_colors or prism or entry.get("noClueColors", False):
+        colors = ()
+    else:
+        colors = (entry["name"],)
+    return Suit(
+        name=entry["name"],
+        colors=colors,
+        all_colors=all_colors,
+        prism=prism,
+        all_ranks=entry.get("allClueRanks", False),
+        no_ranks=entry.get("noClueRanks", False),
+        dark=entry.get("oneOfEach", False),
+    )
+
+
+def _parse_variant(entry: Dict[str, Any], suits: Dict[str, Suit], shared: Dict[Tuple, Tuple]) -> Variant:
+    variant_suits = tuple(suits[name] for name in entry["suits"])
+    if "clueColors" in entry:
+        clue_colors = tuple(entry["clueColors"])
+    else:
+        # Цвета подсказок - собственные цвета мастей в порядке мастей, без повторов
+        clue_colors = tuple(dict.fromkeys(color for suit in variant_suits for color in suit.colors))
+    copies = tuple(
+        1 if suit.dark else RANK_COPIES[rank]
+        for suit in variant_suits for rank in range(NUM_RANKS)
+    )
+    clue_ranks = tuple(entry.get("clueRanks", ALL_RANKS))
+    return Variant(
+        name=entry["name"],
+        suits=variant_suits,
+        clue_colors=shared.setdefault(clue_colors, clue_colors),
+        clue_ranks=shared.setdefault(clue_ranks, clue_ranks),
+        copies=shared.setdefault(copies, copies),
+    )
+
+
+def parse_catalog(data: Dict[str, Any]) -> VariantCatalog:
+    # Одинаковые масти и кортежи - один и тот же объект во всех вариантах (так же и после pickle)
+    suits = {entry["name"]: _parse_suit(entry) for entry in data["suits"]}
+    shared: Dict[Tuple, Tuple] = {}
+    return VariantCatalog(tuple(_parse_variant(entry, suits, shared) for entry in data["variants"]))
+
+
+def load_catalog(data_path: Path = DATA_PATH, cache_dir: Optional[Path] = CACHE_DIR) -> VariantCatalog:
+    """
+    Каталог из кэша, если он соответствует файлу данных, иначе из JSON (с записью кэша).
+    `cache_dir=None` - без кэша. Ошибки кэша не фатальны: каталог просто собирается заново.
+    """
+    stat = data_path.stat()
+    cache_path = cache_dir / f"variants-{stat.st_size}-{stat.st_mtime_ns}.pickle" if cache_dir else None
+    if cache_path is not None:
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError) as e:
+            log.warning("Ignoring broken variant cache %s: %r", cache_path, e)
+
+    catalog = parse_catalog(json.loads(data_path.read_text(encoding="utf-8")))
+    if cache_path is not None:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # Запись через временный файл: параллельно стартующие процессы не прочитают половину кэша
+            temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, "wb") as f:
+                pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+            for stale in cache_dir.glob("variants-*.pickle"):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            log.debug("Could not write variant cache %s: %r", cache_path, e)
+    log.debug("Loaded %d variants from %s", len(catalog), data_path)
+    return catalog
+
+
+_catalog: Optional[VariantCatalog] = None
+
+
+def catalog() -> VariantCatalog:
+    """Каталог процесса; загружается при первом обращении."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+def find_variant(name: str) -> Optional[Variant]:
+    return catalog().by_name.get(name)
+
+
+def get_variant(name: str) -> Variant:
+    """Вариант по имени hanab.live; KeyError для неизвестных."""
+    return catalog().by_name[name]
+
+
+def standard_variant(num_suits: int) -> Variant:
+    """Вариант без особых мастей с `num_suits` мастями (так движок понимает партию без имени варианта)."""
+    return get_variant("No Variant" if num_suits == 5 else f"{num_suits} Suits")
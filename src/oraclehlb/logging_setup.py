@@ -0,0 +1,162 @@
+import json
+import logging
+import logging.handlers
+import queue
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Sequence
+
+from oraclehlb.config import Settings
+
+# Контекст записи: задаётся в задаче бота и в полосе стола, наследуется дочерними задачами
+current_bot: ContextVar[Optional[str]] = ContextVar("current_bot", default=None)
+current_table: ContextVar[Optional[int]] = ContextVar("current_table", default=None)
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class ContextFilter(logging.Filter):
+    """Добавляет в запись `bot` и `table` из контекста задачи, пока она ещё в потоке event loop."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.bot = current_bot.get()
+        record.table = current_table.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись: время, уровень, логгер, сообщение, бот и стол."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        bot = getattr(record, "bot", None)
+        if bot is not None:
+            entry["bot"] = bot
+        table = getattr(record, "table", None)
+        if table is not None:
+            entry["table"] = table
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Запись из шарда: трассировка отформатирована ещё в шарде (`ShardQueueHandler`)
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(settings: Settings) -> logging.Handler:
+    path = Path(settings.log_file).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if settings.log_rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            path, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count,
+            encoding="utf-8",
+        )
+    if settings.log_rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=settings.log_rotate_when, backupCount=settings.log_backup_count,
+            encoding="utf-8",
+        )
+    return logging.FileHandler(path, encoding="utf-8")
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладёт запись в очередь как есть. Стандартный `QueueHandler.prepare` форматирует её прямо в event loop,
+    вклеивает трассировку в текст и стирает `exc_info` - тогда `JsonFormatter` не видит исключения.
+    Здесь сообщение (`msg % args`) и трассировку форматирует поток listener'а, поэтому в `args`
+    не стоит передавать объекты, которые меняются сразу после вызова логгера.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(settings: Settings) -> logging.handlers.QueueListener:
+    """
+    Настраивает логирование процесса: в event loop запись только кладётся в очередь,
+    а форматирование и запись в консоль/файл делает фоновый поток `QueueListener`.
+    Возвращает запущенный listener; `stop()` дописывает очередь перед выходом.
+    """
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(settings.log_level.upper())
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [console_handler]
+
+    if settings.log_file:
+        file_handler = _file_handler(settings)
+        file_handler.setLevel(settings.log_file_level.upper())
+        file_handler.setFormatter(JsonFormatter() if settings.log_json else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    # Корневой уровень - самый подробный из обработчиков: более подробные записи даже не создаются
+    root.setLevel(min(handler.level for handler in handlers))
+    for name, level in settings.log_levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+# Поля обычной записи плюс контекст `ContextFilter`: только они и пересылаются из шарда родителю
+_RECORD_FIELDS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "bot", "table"}
+_EXC_FORMATTER = logging.Formatter()
+
+
+class ShardQueueHandler(logging.handlers.QueueHandler):
+    """
+    Записи шарда уходят в другой процесс, поэтому поля из `extra` отбрасываются:
+    библиотеки (например, websockets) кладут туда свои объекты, которые не сериализуются.
+    По той же причине сообщение собирается здесь, а трассировка едет текстом в `exc_text`
+    (её выводят и текстовый формат, и `JsonFormatter` родителя).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        fields = {key: value for key, value in record.__dict__.items() if key in _RECORD_FIELDS}
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+        fields.update(msg=message, args=None, message=message, exc_info=None, exc_text=exc_text)
+        return logging.makeLogRecord(fields)
+
+
+def setup_shard_logging(settings: Settings, log_queue) -> None:
+    """
+    Логирование процесса-шарда (`core.shards`): записи с ботом и столом уходят в очередь
+    `multiprocessing` родителя, а форматирует и пишет их `QueueListener` родителя (один файл на всех).
+    """
+    queue_handler = ShardQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    levels = [logging.getLevelName(settings.log_level.upper())]
+    if settings.log_file:
+        levels.append(logging.getLevelName(settings.log_file_level.upper()))
+    root.setLevel(min(levels))
+    for name, level in settings.log_levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+
+def forward_shard_logs(log_queue, handlers: Sequence[logging.Handler]) -> logging.handlers.QueueListener:
+    """Поток родителя, который пишет записи шардов теми же обработчиками, что и свои."""
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -1,34 +1,37 @@
 import asyncio
 import logging
 
-from oraclehlb.core.bot_manager import BotManager
+from oraclehlb.config import settings
+from oraclehlb.core.bot_manager import BotManager, configure_services
+from oraclehlb.core.shards import ShardManager
+from oraclehlb.game.variants import catalog
+from oraclehlb.logging_setup import setup_logging
 
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-
-file_handler = logging.FileHandler('oraclehlb.log')
-file_handler.setLevel(logging.DEBUG)
-
-logging.basicConfig(level=logging.DEBUG,
-                    format="%(asctime)s - %(levelname)s - %(message)s",
-                    handlers=[console_handler, file_handler])
 log = logging.getLogger(__name__)
 
 
-async def async_main():
+async def async_main(listener):
     """Асинхронная точка входа в приложение."""
-    manager = BotManager()
+    # В шардированном режиме боты работают в процессах-шардах, а их логи пишет listener этого процесса
+    manager = ShardManager(listener.handlers) if settings.sharded else BotManager()
     await manager.run()
 
 
 def main():
     """Синхронная точка входа для безопасного запуска и остановки."""
+    # Запись логов - в фоновом потоке, чтобы файловый ввод-вывод не тормозил event loop
+    listener = setup_logging(settings)
+    configure_services()
     try:
-        asyncio.run(async_main())
+        # Каталог вариантов загружается до первого стола (и оставляет кэш процессам пула решений)
+        catalog()
+        asyncio.run(async_main(listener))
     except (KeyboardInterrupt, asyncio.CancelledError):
         log.info("Shutdown requested by user.")
     except Exception:
         log.exception("An unhandled exception caused the application to terminate.")
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
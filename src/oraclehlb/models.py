@@ -1,14 +1,15 @@
-from enum import Enum
-from typing import List, Dict
+from enum import IntEnum
+from typing import List, Dict, Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
-class ActionType(str, Enum):
-    PLAY = "play"
-    DISCARD = "discard"
-    RANK_CLUE = "clueRank"
-    SUIT_CLUE = "clueSuit"
+class ActionType(IntEnum):
+    """Тип команды `action` hanab.live: сервер принимает только эти числа."""
+    PLAY = 0
+    DISCARD = 1
+    SUIT_CLUE = 2
+    RANK_CLUE = 3
 
 
 class Card(BaseModel):
@@ -18,6 +19,10 @@ class Card(BaseModel):
 
 
 class GameState(BaseModel):
+    """
+    Снимок партии для стратегий. Неизвестные карты (свои) имеют suit_index = rank = -1.
+    Живое компактное состояние, из которого построен снимок, доступно как `engine`.
+    """
     table_id: int
     player_names: List[str] = []
     our_player_index: int = -1
@@ -25,3 +30,15 @@ class GameState(BaseModel):
     clue_tokens: int = 8
     mistake_tokens: int = 3
     current_player_index: int = 0
+    stacks: List[int] = Field(default_factory=list)
+    deck_size: int = 0
+    turn: int = 0
+    # Имя варианта hanab.live; пусто - масти без особых правил (их число - len(stacks))
+    variant: str = ""
+
+    _engine: Any = PrivateAttr(default=None)
+
+    @property
+    def engine(self):
+        """`oraclehlb.game.engine.GameEngine`, если снимок построен из движка."""
+        return self._engine
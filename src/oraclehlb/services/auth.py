@@ -1,35 +1,68 @@
 import logging
+from typing import Optional
+
 import aiohttp
+
 from oraclehlb.config import BotConfig
+from oraclehlb.core.rate_limit import TokenBucket
+from oraclehlb.services.cookie_cache import CookieCache
 
 log = logging.getLogger(__name__)
 
 
 class AuthService:
-    def __init__(self, auth_url: str, session: aiohttp.ClientSession):
+    """
+    Логин на hanab.live. Сессии берутся из `CookieCache`, пока не истекли или не отвергнуты сервером;
+    настоящие логины всех ботов проходят через общий `TokenBucket`, чтобы не упереться в rate limit.
+    """
+
+    def __init__(
+            self,
+            auth_url: str,
+            session: aiohttp.ClientSession,
+            cookie_cache: Optional[CookieCache] = None,
+            limiter: Optional[TokenBucket] = None,
+    ):
         self._auth_url = auth_url
         self._session = session
+        self._cache = cookie_cache or CookieCache(None)
+        self._limiter = limiter
+
+    def invalidate(self, username: str):
+        """Сервер отверг сессию (401 при подключении websocket): следующий вызов залогинится заново."""
+        self._cache.invalidate(username)
 
     async def authenticate(self, bot_config: BotConfig) -> str:
+        cached = self._cache.get(bot_config.username)
+        if cached:
+            log.info("Using cached session for '%s'.", bot_config.username)
+            return cached
+
+        if self._limiter is not None:
+            await self._limiter.acquire()
+
         payload = {
             "username": bot_config.username,
             "password": bot_config.password.get_secret_value(),
             "version": "bot",
         }
-        log.info(f"Authenticating '{bot_config.username}'...")
+        log.info("Authenticating '%s'...", bot_config.username)
         try:
             async with self._session.post(self._auth_url, data=payload) as resp:
                 resp.raise_for_status()
                 cookie = resp.cookies.get("hanabi.sid")
                 if not cookie:
-                    log.error(f"Cookie not found in response for '{bot_config.username}'.")
+                    log.error("Cookie not found in response for '%s'.", bot_config.username)
                     return ""
 
-                log.info(f"Authentication successful for '{bot_config.username}'.")
-                return f"hanabi.sid={cookie.value}"
+                log.info("Authentication successful for '%s'.", bot_config.username)
+                session_cookie = f"hanabi.sid={cookie.value}"
+                max_age = cookie["max-age"]
+                self._cache.put(bot_config.username, session_cookie, float(max_age) if max_age.isdigit() else None)
+                return session_cookie
         except aiohttp.ClientResponseError as e:
-            log.error(f"Auth failed for '{bot_config.username}' with status {e.status}: {e.message}")
+            log.error("Auth failed for '%s' with status %s: %s", bot_config.username, e.status, e.message)
         except aiohttp.ClientError as e:
-            log.error(f"An error occurred for '{bot_config.username}' during authentication: {e}")
+            log.error("An error occurred for '%s' during authentication: %s", bot_config.username, e)
 
         return ""
@@ -0,0 +1,67 @@
+import dataclasses
+import json
+import logging
+from typing import Any, Callable, Dict, Type, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Быстрый JSON-бэкенд, если он установлен (`pip install oraclehlb[fast]`), иначе stdlib.
+try:
+    import orjson
+
+    BACKEND = "orjson"
+    DecodeError = orjson.JSONDecodeError
+
+    def loads(data: str | bytes) -> Any:
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+    try:
+        import msgspec
+
+        BACKEND = "msgspec"
+        DecodeError = (ValueError, msgspec.DecodeError)
+        _decoder = msgspec.json.Decoder()
+        _encoder = msgspec.json.Encoder()
+
+        def loads(data: str | bytes) -> Any:
+            return _decoder.decode(data)
+
+        def dumps(obj: Any) -> str:
+            return _encoder.encode(obj).decode()
+
+    except ImportError:
+        BACKEND = "json"
+        DecodeError = json.JSONDecodeError
+
+        loads = json.loads
+
+        def dumps(obj: Any) -> str:
+            return json.dumps(obj, separators=(",", ":"))
+
+
+def wire(name: str, **kwargs) -> Any:
+    """Поле структуры протокола, которое на проводе называется иначе (`tableID` -> `table_id`)."""
+    return dataclasses.field(metadata={"wire": name}, **kwargs)
+
+
+def struct_converter(schema: Type[T]) -> Callable[[Dict[str, Any]], T]:
+    """
+    Строит преобразователь dict -> типизированная структура (dataclass) для одной схемы.
+    Соответствие имён полей вычисляется один раз; лишние ключи игнорируются,
+    отсутствие обязательного поля даёт TypeError.
+    """
+    key_map = tuple(
+        (field.metadata.get("wire", field.name), field.name)
+        for field in dataclasses.fields(schema)
+    )
+
+    def convert(payload: Dict[str, Any]) -> T:
+        return schema(**{name: payload[key] for key, name in key_map if key in payload})
+
+    return convert
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+log = logging.getLogger(__name__)
+
+
+class CookieCache:
+    """
+    Сессионные cookie hanab.live на диске: `{username: {"cookie": ..., "expires": unix time}}`.
+    Позволяет перезапускать ботов без повторного логина. Файл пишется атомарно и доступен только владельцу.
+    """
+
+    def __init__(self, path: Optional[Path], ttl: float = 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path is not None and self.path.exists():
+                try:
+                    self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    log.warning("Cookie cache %s is unreadable, starting empty.", self.path)
+        return self._entries
+
+    def _save(self):
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            # Режим из os.open действует только при создании: оставшийся от сбоя .tmp мог быть шире
+            os.fchmod(fd, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            log.exception("Could not write cookie cache %s", self.path)
+
+    def get(self, username: str) -> Optional[str]:
+        entry = self._load().get(username)
+        if entry is None:
+            return None
+        if entry.get("expires", 0) <= time.time():
+            self.invalidate(username)
+            return None
+        return entry["cookie"]
+
+    def put(self, username: str, cookie: str, max_age: Optional[float] = None):
+        ttl = self.ttl if max_age is None else min(max_age, self.ttl)
+        self._load()[username] = {"cookie": cookie, "expires": time.time() + ttl}
+        self._save()
+
+    def invalidate(self, username: str):
+        if self._load().pop(username, None) is not None:
+            log.info("Cached session for '%s' invalidated.", username)
+            self._save()
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+from oraclehlb.core.event_bus import EventBus, RawMessageReceived
+from oraclehlb.logging_setup import current_table
+
+log = logging.getLogger(__name__)
+
+# Команды конкретной партии: их порядок важен только внутри стола, разные столы обрабатываются параллельно
+TABLE_COMMANDS = frozenset({
+    "init", "gameAction", "gameActionList", "tableStart", "connected", "clock", "noteList", "noteListPlayer",
+})
+_TABLE_ID = re.compile(r'"tableID":\s*(\d+)')
+
+
+def table_key(message: str) -> Optional[int]:
+    """Стол, к которому относится кадр (None - общий упорядоченный поток: лобби, чат, welcome...)."""
+    command, _, payload_str = message.partition(" ")
+    if command not in TABLE_COMMANDS:
+        return None
+    match = _TABLE_ID.search(payload_str)
+    return int(match.group(1)) if match else None
+
+
+@dataclass(slots=True)
+class DispatchStats:
+    handled: int = 0
+    max_pending: int = 0
+    lag_total: float = 0.0
+    lag_max: float = 0.0
+
+    def as_dict(self, pending: int, lanes: int) -> Dict[str, Any]:
+        return {
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "lanes": lanes,
+            "handled": self.handled,
+            "lag_mean_ms": round(self.lag_total / self.handled * 1000, 3) if self.handled else 0.0,
+            "lag_max_ms": round(self.lag_max * 1000, 3),
+        }
+
+
+class FrameDispatcher:
+    """
+    Развязывает чтение сокета и обработку кадров.
+
+    Цикл чтения только ставит кадр в очередь его «полосы»: у каждого стола своя полоса,
+    всё остальное идёт в общую. Внутри полосы кадры обрабатываются строго по порядку,
+    полосы - параллельно, так что долгий ход на одном столе не задерживает остальные столы,
+    пинги и чтение. Общее число необработанных кадров ограничено: при переполнении чтение ждёт.
+    Лаг - время от получения кадра до завершения его обработчиков.
+    """
+
+    def __init__(self, event_bus: EventBus, max_pending: int = 1024):
+        self._bus = event_bus
+        self._slots = asyncio.Semaphore(max_pending)
+        self._lanes: Dict[Optional[int], deque] = {}
+        self._workers: Dict[Optional[int], asyncio.Task] = {}
+        self._pending = 0
+        self.stats = DispatchStats()
+
+    async def submit(self, message: str):
+        await self._slots.acquire()
+        key = table_key(message)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = deque()
+        lane.append((message, time.perf_counter()))
+        self._pending += 1
+        if self._pending > self.stats.max_pending:
+            self.stats.max_pending = self._pending
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key, lane))
+
+    async def _drain(self, key: Optional[int], lane: deque):
+        """Обрабатывает полосу, пока в ней есть кадры; пустая полоса удаляется вместе с задачей."""
+        publish = self._bus.publish
+        stats = self.stats
+        # У полосы своя задача и свой контекст: записи лога её обработчиков помечаются столом
+        current_table.set(key)
+        try:
+            while lane:
+                message, received_at = lane.popleft()
+                try:
+                    await publish(RawMessageReceived(message=message))
+                except Exception:
+                    log.exception("Unhandled error while dispatching a frame")
+                finally:
+                    self._pending -= 1
+                    self._slots.release()
+                lag = time.perf_counter() - received_at
+                stats.handled += 1
+                stats.lag_total += lag
+                if lag > stats.lag_max:
+                    stats.lag_max = lag
+        finally:
+            # Отменённая задача оставляет необработанные кадры: их места в очереди освобождаются,
+            # иначе чтение сокета однажды встанет на семафоре навсегда
+            if lane:
+                log.warning("Dropping %d unhandled frames of lane %s", len(lane), key)
+            while lane:
+                lane.popleft()
+                self._pending -= 1
+                self._slots.release()
+            del self._workers[key]
+            del self._lanes[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.stats.as_dict(self._pending, len(self._lanes))
+
+    def close(self):
+        for task in list(self._workers.values()):
+            task.cancel()
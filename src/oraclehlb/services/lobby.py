@@ -0,0 +1,151 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Set
+
+from oraclehlb.core.event_bus import EventBus, ConnectionStateChanged
+from oraclehlb.core.global_bus import global_event_bus, LobbyTableChanged, LobbyTableRemoved
+from oraclehlb.services.parser import ProtocolParser
+
+log = logging.getLogger(__name__)
+
+
+class LobbyIndex:
+    """
+    In-memory индекс лобби hanab.live: столы по id, пользователи по userID и столы по имени игрока.
+    Поля, зависящие от смотрящего (`joined`, `owned`), относятся к тому, чей поток разобран;
+    участие конкретного бота проверяется по `players` (`tables_with_player`).
+    """
+
+    def __init__(self):
+        self.tables: Dict[int, Dict[str, Any]] = {}
+        self.users: Dict[int, Dict[str, Any]] = {}
+        self._tables_by_player: Dict[str, Set[int]] = defaultdict(set)
+
+    def table(self, table_id: int) -> Optional[Dict[str, Any]]:
+        return self.tables.get(table_id)
+
+    def tables_with_player(self, username: str) -> List[Dict[str, Any]]:
+        return [self.tables[table_id] for table_id in self._tables_by_player.get(username, ())]
+
+    def replace_tables(self, tables: List[Dict[str, Any]]):
+        self.tables.clear()
+        self._tables_by_player.clear()
+        for table in tables:
+            self.put_table(table)
+
+    def put_table(self, table: Dict[str, Any]):
+        table_id = table["id"]
+        self.remove_table(table_id)
+        self.tables[table_id] = table
+        for player in table.get("players") or ():
+            self._tables_by_player[player].add(table_id)
+
+    def remove_table(self, table_id: int) -> bool:
+        table = self.tables.pop(table_id, None)
+        if table is None:
+            return False
+        for player in table.get("players") or ():
+            tables = self._tables_by_player.get(player)
+            if tables is not None:
+                tables.discard(table_id)
+                if not tables:
+                    del self._tables_by_player[player]
+        return True
+
+    def replace_users(self, users: List[Dict[str, Any]]):
+        self.users = {user["userID"]: user for user in users}
+
+    def put_user(self, user: Dict[str, Any]):
+        self.users[user["userID"]] = user
+
+    def remove_user(self, user_id: int):
+        self.users.pop(user_id, None)
+
+
+class SharedLobby:
+    """
+    Один разбор лобби на всех ботов процесса. Лобби-поток сервер шлёт в каждое подключение,
+    но декодирует его только «лидер» - первый подключённый бот; остальные отбрасывают такие кадры
+    по имени команды. Когда лидер теряет соединение, лидером становится следующий подключённый бот
+    (индекс при этом сохраняется и дальше обновляется из его потока).
+    Изменения столов раздаются через `global_event_bus` (`LobbyTableChanged`/`LobbyTableRemoved`).
+    """
+
+    def __init__(self):
+        self.index = LobbyIndex()
+        # Подключённые боты в порядке подключения; первый - лидер
+        self._connected: List[str] = []
+
+    @property
+    def leader(self) -> Optional[str]:
+        return self._connected[0] if self._connected else None
+
+    def is_leader(self, username: str) -> bool:
+        return bool(self._connected) and self._connected[0] == username
+
+    def join(self, username: str):
+        if username not in self._connected:
+            self._connected.append(username)
+            if self.is_leader(username):
+                log.info("Bot '%s' now parses the shared lobby.", username)
+
+    def leave(self, username: str):
+        was_leader = self.is_leader(username)
+        if username in self._connected:
+            self._connected.remove(username)
+        if was_leader and self.leader:
+            log.info("Lobby leader '%s' disconnected, handing the lobby over to '%s'.", username, self.leader)
+
+    async def handle_table_list(self, tables: List[Dict[str, Any]]):
+        self.index.replace_tables(tables)
+        for table in tables:
+            await global_event_bus.publish(LobbyTableChanged(table=table))
+
+    async def handle_table(self, table: Dict[str, Any]):
+        self.index.put_table(table)
+        await global_event_bus.publish(LobbyTableChanged(table=table))
+
+    async def handle_table_gone(self, payload: Dict[str, Any]):
+        table_id = payload["tableID"]
+        if self.index.remove_table(table_id):
+            await global_event_bus.publish(LobbyTableRemoved(table_id=table_id))
+
+    async def handle_user_list(self, users: List[Dict[str, Any]]):
+        self.index.replace_users(users)
+
+    async def handle_user(self, user: Dict[str, Any]):
+        self.index.put_user(user)
+
+    async def handle_user_left(self, payload: Dict[str, Any]):
+        self.index.remove_user(payload["userID"])
+
+
+class LobbyClient:
+    """Подключает парсер одного бота к `SharedLobby`: лобби-команды декодируются, только пока бот - лидер."""
+
+    def __init__(self, username: str, lobby: SharedLobby, event_bus: EventBus, parser: ProtocolParser):
+        self.username = username
+        self._lobby = lobby
+
+        is_leader = self._is_leader
+        parser.register("tableList", lobby.handle_table_list, prefilter=is_leader)
+        parser.register("table", lobby.handle_table, prefilter=is_leader)
+        parser.register("tableGone", lobby.handle_table_gone, prefilter=is_leader)
+        parser.register("userList", lobby.handle_user_list, prefilter=is_leader)
+        parser.register("user", lobby.handle_user, prefilter=is_leader)
+        parser.register("userLeft", lobby.handle_user_left, prefilter=is_leader)
+
+        event_bus.subscribe(ConnectionStateChanged, self._handle_connection_state)
+
+    def _is_leader(self, payload_str: str) -> bool:
+        return self._lobby.is_leader(self.username)
+
+    async def _handle_connection_state(self, event: ConnectionStateChanged):
+        if event.connected:
+            self._lobby.join(self.username)
+        else:
+            self._lobby.leave(self.username)
+
+
+# Общий для всех ботов процесса (режим `shared_lobby = true`)
+shared_lobby = SharedLobby()
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Any, Optional
+
+from aiohttp import web
+
+from oraclehlb.core.metrics import MetricsRegistry
+
+log = logging.getLogger(__name__)
+
+
+class MonitoringServer:
+    """
+    Локальный HTTP-эндпоинт мониторинга на aiohttp:
+    `/metrics` - метрики в текстовом формате Prometheus, `/health` - JSON состояния ботов.
+    """
+
+    def __init__(
+            self,
+            registry: MetricsRegistry,
+            health: Callable[[], Dict[str, Any]],
+            host: str = "127.0.0.1",
+            port: int = 9108,
+    ):
+        self._registry = registry
+        self._health = health
+        self._host = host
+        self._port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self._registry.render(), content_type="text/plain", charset="utf-8")
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self._health())
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        app.router.add_get("/health", self._handle_health)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+        log.info("Monitoring endpoint listening on http://%s:%d/metrics", self._host, self._port)
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def dump_periodically(registry: MetricsRegistry, interval: float):
+    """Раз в `interval` секунд пишет текстовую сводку метрик в лог."""
+    while True:
+        await asyncio.sleep(interval)
+        log.info("%s", registry.summary())
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 from typing import Dict, Any, Optional
 
@@ -8,51 +7,151 @@ from websockets import ConnectionClosed
 from websockets.asyncio.client import ClientConnection
 
 from oraclehlb.config import settings
-from oraclehlb.core.event_bus import EventBus, RawMessageReceived
+from oraclehlb.core.event_bus import EventBus, ConnectionStateChanged
+from oraclehlb.core.metrics import metrics
+from oraclehlb.core.reconnect import ReconnectCoordinator, reconnect_coordinator
+from oraclehlb.services.dispatcher import FrameDispatcher
+from oraclehlb.services.outbox import Outbox, CRITICAL
 
 log = logging.getLogger(__name__)
 
+# HTTP-статусы ответа на websocket handshake, означающие, что сессионная cookie больше не действует
+SESSION_REJECTED_STATUSES = (401, 403)
+
+
+class SessionRejected(Exception):
+    """Сервер отверг cookie при подключении: нужно залогиниться заново."""
+
 
 class NetworkService:
     """Отвечает исключительно за WebSocket-соединение и его стабильность."""
 
-    def __init__(self, cookie: str, event_bus: EventBus):
+    def __init__(
+            self,
+            cookie: str,
+            event_bus: EventBus,
+            username: str = "",
+            coordinator: Optional[ReconnectCoordinator] = None,
+    ):
         self._cookie = cookie
         self._bus = event_bus
+        self._username = username
+        # Паузы переподключения и предохранитель общие для всех ботов процесса
+        self._coordinator = coordinator or reconnect_coordinator
         self._ws: Optional[ClientConnection] = None
+        # Исходящие команды уходят через очередь и отдельную задачу-писателя
+        self.outbox = Outbox(settings.send_queue_size)
+        self._connected = asyncio.Event()
+        # Входящие кадры обрабатываются вне цикла чтения: по порядку внутри стола, параллельно между столами
+        self.dispatcher = FrameDispatcher(event_bus, settings.receive_queue_size)
+        self._received = metrics.counter("oraclehlb_ws_frames_received_total", "Websocket frames received", bot=username)
+        self._sent = metrics.counter("oraclehlb_ws_frames_sent_total", "Websocket frames sent", bot=username)
+        metrics.add_collector("oraclehlb_outbox", self.outbox.snapshot, bot=username)
+        metrics.add_collector("oraclehlb_dispatch", self.dispatcher.snapshot, bot=username)
 
     async def run(self):
-        delay = settings.reconnect_delay_base
+        writer = asyncio.create_task(self._write_loop())
+        connection = asyncio.create_task(self._run_connection())
+        try:
+            # Писатель не должен умирать молча: иначе команды копятся в очереди при живом сокете
+            done, _ = await asyncio.wait({writer, connection}, return_when=asyncio.FIRST_COMPLETED)
+            if writer in done and not writer.cancelled() and writer.exception() is not None:
+                log.error("Send loop failed, restarting the connection.")
+            for task in done:
+                task.result()
+        finally:
+            writer.cancel()
+            connection.cancel()
+            await asyncio.gather(writer, connection, return_exceptions=True)
+            self.dispatcher.close()
+
+    async def _run_connection(self):
+        coordinator = self._coordinator
+        username = self._username
         while True:
+            established = False
             try:
-                log.info(f"Connecting to {settings.ws_url}...")
+                await coordinator.before_connect(username)
+                log.info("Connecting to %s...", settings.ws_url)
                 additional_headers = {"Cookie": self._cookie}
                 async with websockets.connect(settings.ws_url, additional_headers=additional_headers) as ws:
                     self._ws = ws
+                    established = True
                     log.info("Connection established.")
-                    delay = settings.reconnect_delay_base
-                    await self._listen_for_messages()
-            except (ConnectionClosed, OSError, websockets.InvalidStatus) as e:
-                log.warning(f"Connection lost: {e}. Reconnecting in {delay:.2f}s...")
-                await asyncio.sleep(delay)
-                delay = min(delay * 2, settings.reconnect_delay_max)
+                    await coordinator.connected(username)
+                    self._connected.set()
+                    await self._bus.publish(ConnectionStateChanged(connected=True))
+                    try:
+                        await self._listen_for_messages()
+                    finally:
+                        self._ws = None
+                        self._connected.clear()
+                        self.outbox.disconnected()
+                        await self._bus.publish(ConnectionStateChanged(connected=False))
+                await coordinator.disconnected(username, "closed by server")
+            except websockets.InvalidStatus as e:
+                if e.response.status_code in SESSION_REJECTED_STATUSES:
+                    # Сервер ответил - значит, он доступен, даже если cookie устарела
+                    coordinator.breaker.record_success()
+                    raise SessionRejected(str(e)) from e
+                await coordinator.failed(username, f"Connection rejected: {e}")
+            except (ConnectionClosed, OSError) as e:
+                if established:
+                    log.warning("Connection lost: %s. Reconnecting...", e)
+                    await coordinator.disconnected(username, str(e))
+                else:
+                    await coordinator.failed(username, f"Connection failed: {e}")
             except asyncio.CancelledError:
                 log.info("Network service was cancelled.")
-                break
-            except Exception:
+                raise
+            except Exception as e:
                 log.exception("An unexpected network error occurred. Reconnecting...")
-                await asyncio.sleep(delay)
+                await coordinator.failed(username, repr(e), crashed=established)
 
     async def _listen_for_messages(self):
+        submit = self.dispatcher.submit
+        received = self._received
         async for message in self._ws:
             if isinstance(message, str):
-                await self._bus.publish(RawMessageReceived(message=message))
+                received.inc()
+                await submit(message)
+
+    async def _write_loop(self):
+        """Единственный писатель в сокет: отправляет команды по приоритету, критичные повторяет после обрыва."""
+        outbox = self.outbox
+        sent = self._sent
+        while True:
+            await self._connected.wait()
+            item = await outbox.get()
+            ws = self._ws
+            try:
+                if ws is None:
+                    self._unsent(item)
+                    continue
+                await ws.send(item.message)
+            except ConnectionClosed:
+                self._unsent(item)
+                continue
+            except Exception:
+                # Команду, которую не удалось отправить не из-за обрыва, повторять бессмысленно
+                log.exception("Could not send '%s', dropping it.", item.command)
+                outbox.stats.dropped += 1
+                continue
+            outbox.mark_sent(item)
+            sent.inc()
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Sent command: %s (queue depth %d)", item.command, len(outbox))
 
-    async def send_command(self, command: str, payload: Dict[str, Any]):
-        if not self._ws:
-            log.error("Cannot send command, WebSocket is not connected.")
-            return
+    def _unsent(self, item):
+        if item.priority == CRITICAL:
+            self.outbox.requeue(item)
+            log.info("Connection lost before '%s' was sent, will resend after reconnect if still valid.", item.command)
+        else:
+            self.outbox.stats.dropped += 1
 
-        full_message = f"{command} {json.dumps(payload)}"
-        await self._ws.send(full_message)
-        log.debug(f"Sent command: {command}")
+    async def send_command(self, command: str, payload: Dict[str, Any], turn: Optional[int] = None):
+        """
+        Ставит команду в очередь отправки и сразу возвращается; во время переподключения команды копятся.
+        `turn` - ход партии, для которого решён `action`: после обрыва он уйдёт, только если ход не сменился.
+        """
+        self.outbox.put(command, payload, turn)
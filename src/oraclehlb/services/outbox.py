@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Set, Tuple
+
+from oraclehlb.services import codec
+
+log = logging.getLogger(__name__)
+
+# Приоритеты исходящих команд: ход в партии важнее служебных запросов, а те - важнее чата
+CRITICAL, NORMAL, LOW = 0, 1, 2
+COMMAND_PRIORITIES = {
+    "action": CRITICAL,
+    "chat": LOW,
+    "chatPM": LOW,
+}
+# Команды, у которых в очереди достаточно последней версии на стол: более новая заменяет ожидающую
+COALESCED_COMMANDS = frozenset({"action", "getGameInfo2"})
+
+
+@dataclass(slots=True)
+class OutgoingCommand:
+    command: str
+    message: str
+    priority: int
+    key: Optional[Tuple[str, Any]]
+    enqueued_at: float
+    # Ход партии, для которого решена команда `action`; None - команда не привязана к ходу
+    turn: Optional[int] = None
+
+
+@dataclass(slots=True)
+class OutboxStats:
+    sent: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    replayed: int = 0
+    max_depth: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+    def as_dict(self, depth: int) -> Dict[str, Any]:
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "replayed": self.replayed,
+            "latency_mean_ms": round(self.latency_total / self.sent * 1000, 3) if self.sent else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+        }
+
+
+class Outbox:
+    """
+    Ограниченная очередь исходящих команд одного подключения с приоритетами.
+
+    Критичные команды (`action`) никогда не отбрасываются и переживают переподключение;
+    при переполнении сначала вытесняется самый старый низкоприоритетный трафик (чат), а если
+    его нет - отбрасывается новая некритичная команда. `action`/`getGameInfo2` для одного стола
+    склеиваются: в очереди остаётся только последняя версия. Ходы, не ушедшие до обрыва (в полёте или
+    в очереди), и ходы, решённые после него, не отправляются вслепую: они ждут пересинхронизации
+    своего стола (`release_parked`) и уходят, только если партия ещё на том же ходу.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._queues = (deque(), deque(), deque())
+        self._pending: Dict[Tuple[str, Any], OutgoingCommand] = {}
+        # Ходы, не отправленные из-за обрыва: tableID -> команда, до пересинхронизации стола
+        self._parked: Dict[Any, OutgoingCommand] = {}
+        # Столы, пересинхронизированные после последнего обрыва (None - обрывов ещё не было)
+        self._synced: Optional[Set[Any]] = None
+        self._size = 0
+        self._not_empty = asyncio.Event()
+        self.stats = OutboxStats()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, command: str, payload: Dict[str, Any], turn: Optional[int] = None) -> bool:
+        """Ставит команду в очередь; False, если она отброшена политикой переполнения."""
+        message = f"{command} {codec.dumps(payload)}"
+        key = (command, payload.get("tableID")) if command in COALESCED_COMMANDS else None
+        if turn is not None and key is not None and self._synced is not None and key[1] not in self._synced:
+            # Ход решён по состоянию до обрыва: ждёт gameActionList своего стола
+            self._park(OutgoingCommand(command, message, CRITICAL, key, time.perf_counter(), turn))
+            return True
+        if key is not None:
+            queued = self._pending.get(key)
+            if queued is not None:
+                queued.message = message
+                queued.turn = turn
+                self.stats.coalesced += 1
+                return True
+
+        priority = COMMAND_PRIORITIES.get(command, NORMAL)
+        if self._size >= self.max_size and priority != CRITICAL and not self._evict_below(priority):
+            self.stats.dropped += 1
+            log.warning("Send queue full (%d), dropping '%s'.", self._size, command)
+            return False
+
+        item = OutgoingCommand(command, message, priority, key, time.perf_counter(), turn)
+        self._append(item)
+        return True
+
+    def requeue(self, item: OutgoingCommand):
+        """
+        Возвращает неотправленную критичную команду в голову очереди (повтор после переподключения).
+        Ход партии вместо этого откладывается до пересинхронизации его стола (`release_parked`).
+        """
+        if item.key is not None:
+            if item.key in self._pending:
+                # Пока команда была в полёте, пришла более новая версия - она и уйдёт
+                return
+            if item.turn is not None:
+                self._park(item)
+                return
+            self._pending[item.key] = item
+        self._queues[item.priority].appendleft(item)
+        self._size += 1
+        self._not_empty.set()
+        self.stats.replayed += 1
+
+    def release_parked(self, table_id: Any, turn: int) -> bool:
+        """
+        Стол пересинхронизирован после переподключения: отложенный ход уходит, если партия всё ещё
+        на том же ходу (True), а устаревший отбрасывается.
+        """
+        if self._synced is not None:
+            self._synced.add(table_id)
+        item = self._parked.pop(table_id, None)
+        if item is None:
+            return False
+        if item.turn != turn or item.key in self._pending:
+            self.stats.dropped += 1
+            log.info("Dropping the unsent move for turn %s at table %s: the game is at turn %d.", item.turn, table_id, turn)
+            return False
+        self._pending[item.key] = item
+        self._queues[item.priority].appendleft(item)
+        self._size += 1
+        self._not_empty.set()
+        self.stats.replayed += 1
+        return True
+
+    def disconnected(self):
+        """
+        Обрыв соединения. Запросы и чат прошлой сессии не нужны: сервер заново пришлёт tableStart.
+        Ходы партий из очереди откладываются до пересинхронизации своих столов, как и все ходы,
+        решённые до неё; прочие критичные команды уйдут после переподключения.
+        """
+        self._synced = set()
+        for priority in (NORMAL, LOW):
+            queue = self._queues[priority]
+            while queue:
+                self._forget(queue.popleft())
+                self.stats.dropped += 1
+        critical = self._queues[CRITICAL]
+        for item in list(critical):
+            if item.turn is not None:
+                critical.remove(item)
+                self._forget(item)
+                self._park(item)
+        if not self._size:
+            self._not_empty.clear()
+
+    async def get(self) -> OutgoingCommand:
+        while not self._size:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        for queue in self._queues:
+            if queue:
+                item = queue.popleft()
+                self._forget(item)
+                return item
+
+    def mark_sent(self, item: OutgoingCommand):
+        latency = time.perf_counter() - item.enqueued_at
+        stats = self.stats
+        stats.sent += 1
+        stats.latency_total += latency
+        if latency > stats.latency_max:
+            stats.latency_max = latency
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.stats.as_dict(self._size)
+
+    def _append(self, item: OutgoingCommand):
+        self._queues[item.priority].append(item)
+        if item.key is not None:
+            self._pending[item.key] = item
+        self._size += 1
+        if self._size > self.stats.max_depth:
+            self.stats.max_depth = self._size
+        self._not_empty.set()
+
+    def _park(self, item: OutgoingCommand):
+        previous = self._parked.get(item.key[1])
+        if previous is not None and previous is not item:
+            # Для стола важен только последний решённый ход
+            self.stats.coalesced += 1
+        self._parked[item.key[1]] = item
+
+    def _forget(self, item: OutgoingCommand):
+        self._size -= 1
+        if item.key is not None and self._pending.get(item.key) is item:
+            del self._pending[item.key]
+
+    def _evict_below(self, priority: int) -> bool:
+        """Вытесняет самую старую команду с приоритетом ниже `priority`."""
+        for lower in range(len(self._queues) - 1, priority, -1):
+            queue = self._queues[lower]
+            if queue:
+                victim = queue.popleft()
+                self._forget(victim)
+                self.stats.dropped += 1
+                log.warning("Send queue full, evicted '%s'.", victim.command)
+                return True
+        return False
@@ -1,22 +1,103 @@
-import json
 import logging
+import time
+from typing import Dict, Any, Callable, Awaitable, Optional, Type, NamedTuple
 
 from oraclehlb.core.event_bus import RawMessageReceived, CommandReceived, EventBus
+from oraclehlb.core.metrics import metrics
+from oraclehlb.services import codec
 
 log = logging.getLogger(__name__)
 
 
+class _Route(NamedTuple):
+    handler: Callable[[Any], Awaitable[None]]
+    convert: Optional[Callable[[Dict[str, Any]], Any]]
+    prefilter: Optional[Callable[[str], bool]]
+
+
+def _measured_handler(command: str, handler: Callable[[Any], Awaitable[None]]) -> Callable[[Any], Awaitable[None]]:
+    histogram = metrics.histogram("oraclehlb_handler_seconds", "Command handler time", command=command)
+
+    async def measured(payload: Any):
+        started = time.perf_counter()
+        try:
+            await handler(payload)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return measured
+
+
 class ProtocolParser:
-    """Слушает сырые сообщения и парсит их в структурированные команды."""
+    """
+    Слушает сырые сообщения и сразу вызывает обработчик команды (без промежуточного события).
+    Сначала читается только имя команды: кадры без обработчика не декодируются вовсе.
+    """
 
     def __init__(self, event_bus: EventBus):
         self._bus = event_bus
+        self._routes: Dict[str, _Route] = {}
+        if metrics.enabled:
+            self._decode_histogram = metrics.histogram("oraclehlb_parse_seconds", "Payload decoding time")
+            self._decode = self._decode_measured
         self._bus.subscribe(RawMessageReceived, self.handle_raw_message)
 
+    def register(
+            self,
+            command: str,
+            handler: Callable[[Any], Awaitable[None]],
+            schema: Optional[Type] = None,
+            prefilter: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Регистрирует обработчик команды.
+        `schema` - dataclass из `services.protocol`, в который превращается payload вместо dict.
+        `prefilter` - дешёвая проверка сырой строки payload: если вернула False, кадр не декодируется.
+        """
+        convert = codec.struct_converter(schema) if schema else None
+        if metrics.enabled:
+            handler = _measured_handler(command, handler)
+        self._routes[command] = _Route(handler, convert, prefilter)
+
     async def handle_raw_message(self, event: RawMessageReceived):
+        message = event.message
+        command, _, payload_str = message.partition(" ")
+
+        route = self._routes.get(command)
+        if route is None:
+            # Неизвестные/неинтересные команды (tableList, table, ...) декодируем,
+            # только если кто-то подписан на общий CommandReceived.
+            if self._bus.has_listeners(CommandReceived):
+                payload = self._decode(message, payload_str)
+                if payload is not None:
+                    await self._bus.publish(CommandReceived(command=command, payload=payload))
+            return
+
+        if route.prefilter is not None and not route.prefilter(payload_str):
+            return
+
+        payload = self._decode(message, payload_str)
+        if payload is None:
+            return
+        if route.convert is not None:
+            try:
+                payload = route.convert(payload)
+            except (TypeError, AttributeError):
+                log.error("Malformed '%s' payload: '%s'", command, message)
+                return
+        await route.handler(payload)
+
+    def _decode_measured(self, message: str, payload_str: str) -> Optional[Any]:
+        started = time.perf_counter()
+        try:
+            return ProtocolParser._decode(message, payload_str)
+        finally:
+            self._decode_histogram.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _decode(message: str, payload_str: str) -> Optional[Any]:
         try:
-            command, payload_str = event.message.split(" ", 1)
-            payload = json.loads(payload_str)
-            await self._bus.publish(CommandReceived(command=command, payload=payload))
-        except (ValueError, json.JSONDecodeError):
-            log.error(f"Failed to parse message: '{event.message}'")
+            return codec.loads(payload_str)
+        except codec.DecodeError:
+            log.error("Failed to parse message: '%s'", message)
+            return None
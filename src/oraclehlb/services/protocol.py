@@ -0,0 +1,30 @@
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
+
+from oraclehlb.services.codec import wire
+
+
+# Типизированные структуры для «горячих» команд протокола hanab.live.
+# Парсер собирает их сразу из декодированного JSON, обработчики не ходят по словарям.
+
+@dataclass(slots=True)
+class InitPayload:
+    table_id: int = wire("tableID")
+    player_names: List[str] = wire("playerNames")
+    our_player_index: int = wire("ourPlayerIndex")
+    seed: str = ""
+    spectating: bool = False
+    replay: bool = False
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class GameActionPayload:
+    table_id: int = wire("tableID")
+    action: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class GameActionListPayload:
+    table_id: int = wire("tableID")
+    actions: List[Dict[str, Any]] = wire("list", default_factory=list)
@@ -0,0 +1,53 @@
+import logging
+from pathlib import Path
+from typing import Callable, Optional, Set
+
+from oraclehlb.core.event_bus import GameFinished
+from oraclehlb.game.records import RecordWriter
+
+log = logging.getLogger(__name__)
+
+
+class GameRecorder:
+    """
+    Записывает сыгранные партии в `game.records`. Один на процесс: если за столом несколько
+    наших ботов, партия сохраняется один раз - с точки зрения бота, который увидел gameOver первым.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self._writer: Optional[RecordWriter] = None
+        self._recorded: Set[int] = set()
+        # В процессе-шарде (`core.shards`) партии пишет родитель: сюда передаётся функция пересылки
+        self.forward: Optional[Callable[[GameFinished, str], None]] = None
+
+    def configure(self, path: Optional[Path]):
+        """Каталог из config.toml; сам модуль настроек не читает и импортируется без config.toml."""
+        self.path = path
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def record(self, event: GameFinished, strategy: str):
+        if self.path is None or event.engine.table_id in self._recorded:
+            return
+        self._recorded.add(event.engine.table_id)
+        if self.forward is not None:
+            self.forward(event, strategy)
+            return
+        try:
+            if self._writer is None:
+                self._writer = RecordWriter(self.path)
+            row = self._writer.append(event.engine, event.actions, strategy, event.variant, event.seed)
+        except (OSError, ValueError):
+            log.exception("Could not record game at table %s", event.engine.table_id)
+            return
+        log.info(
+            "Recorded game at table %s (score %d, %d actions) as #%d",
+            event.engine.table_id, event.engine.score, len(event.actions), row,
+        )
+
+
+# Синглтон на процесс; не пишет, пока `configure` не задаст каталог
+game_recorder = GameRecorder(None)
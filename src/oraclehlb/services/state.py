@@ -1,60 +1,66 @@
 import logging
-from typing import Dict, Any, Callable, Awaitable
+from typing import Dict, Any, List, Set
 
-from oraclehlb.core.event_bus import EventBus, CommandReceived, OurTurn
+from oraclehlb.core.event_bus import EventBus, OurTurn, TheirTurn, GameFinished
 from oraclehlb.core.global_bus import global_event_bus, GlobalPingEvent
-from oraclehlb.models import GameState
+from oraclehlb.game.clues import clue_table
+from oraclehlb.game.engine import GameEngine
+from oraclehlb.game.snapshots import snapshot_cache
+from oraclehlb.game.variants import find_variant
 from oraclehlb.services.network import NetworkService
+from oraclehlb.services.parser import ProtocolParser
+from oraclehlb.services.protocol import InitPayload, GameActionPayload, GameActionListPayload
 
 log = logging.getLogger(__name__)
 
+# Как часто (в действиях) сохранять снимок живой партии для быстрого переподключения
+SNAPSHOT_INTERVAL = 32
+
 
 class GameStateManager:
     """Управляет состоянием игр, реагируя на команды от сервера."""
 
-    def __init__(self, username: str, event_bus: EventBus, network_service: NetworkService):
+    def __init__(
+            self,
+            username: str,
+            event_bus: EventBus,
+            network_service: NetworkService,
+            parser: ProtocolParser,
+    ):
         self.username = username
-        self.games: Dict[int, GameState] = {}
+        self.games: Dict[int, GameEngine] = {}
+        # Столы после init, для которых ещё не пришёл gameActionList: живые действия для них
+        # придут в составе списка, поэтому до него их не применяем.
+        self._loading: Set[int] = set()
+        # История и параметры живых партий - для записи сыгранной партии после gameOver
+        self._actions: Dict[int, List[Dict[str, Any]]] = {}
+        self._tables: Dict[int, InitPayload] = {}
 
         self._bus = event_bus
         self._network = network_service
 
-        self._handlers: Dict[str, Callable[[Dict], Awaitable[None]]] = {
-            "welcome": self._handle_welcome,
-            "warning": self._handle_warning,
-            "error": self._handle_error,
-            "chat": self._handle_chat,
-            "table": self._handle_table,
-            "tableList": self._handle_table_list,
-            "tableGone": self._handle_table_gone,
-            "tableStart": self._handle_table_start,
-
-            "init": self._handle_init,
-            "gameAction": self._handle_game_action,
-            "gameActionList": self._handle_game_action_list,
-            "databaseID": self._handle_database_id,
-        }
-
-        self._bus.subscribe(CommandReceived, self._dispatch_command)
+        # Команды без обработчика (table, tableList, tableGone, warning, ...) парсер даже не декодирует.
+        parser.register("welcome", self._handle_welcome)
+        parser.register("chat", self._handle_chat, prefilter=self._chat_may_concern_us)
+        parser.register("tableStart", self._handle_table_start)
+        parser.register("init", self._handle_init, schema=InitPayload)
+        parser.register("gameAction", self._handle_game_action, schema=GameActionPayload)
+        parser.register("gameActionList", self._handle_game_action_list, schema=GameActionListPayload)
 
         global_event_bus.subscribe(GlobalPingEvent, self._handle_global_ping)
 
-    async def _dispatch_command(self, event: CommandReceived):
-        """Диспетчер, который вызывает нужный обработчик команды."""
-        handler = self._handlers.get(event.command, self._handle_unknown)
-        await handler(event.payload)
-
     async def _handle_welcome(self, payload: Dict[str, Any]):
         server_username = payload.get("username")
         if self.username != server_username:
-            log.error(f"Logged in as '{server_username}', but expected '{self.username}'.")
-        log.info(f"[{self.username}] Welcome to the server!")
+            log.error("Logged in as '%s', but expected '%s'.", server_username, self.username)
+        log.info("[%s] Welcome to the server!", self.username)
 
-    async def _handle_warning(self, payload: Dict[str, Any]):
-        pass
-
-    async def _handle_error(self, payload: Dict[str, Any]):
-        pass
+    def _chat_may_concern_us(self, payload_str: str) -> bool:
+        """
+        Грубый фильтр лобби-чата до декодирования: интересны только сообщения, где встречается
+        наш username (recipient), и команды, начинающиеся с "/". Ложных отрицаний быть не должно.
+        """
+        return self.username in payload_str or '"/' in payload_str
 
     async def _handle_chat(self, payload: Dict[str, Any]):
         # {'msg': 'hello!', 'who': 'antowkas', 'discord': False,
@@ -95,47 +101,112 @@ class GameStateManager:
             },
         )
 
-    async def _handle_table(self, payload: Dict[str, Any]):
-        pass
-
-    async def _handle_table_list(self, payload: Dict[str, Any]):
-        pass
+    async def _handle_game_action(self, payload: GameActionPayload):
+        engine = self.games.get(payload.table_id)
+        if not engine or payload.table_id in self._loading:
+            return
 
-    async def _handle_table_gone(self, payload: Dict[str, Any]):
-        pass
+        action = payload.action
+        engine.apply(action)
+        history = self._actions.get(payload.table_id)
+        if history is not None:
+            history.append(action)
+        if engine.num_actions % SNAPSHOT_INTERVAL == 0:
+            snapshot_cache.store(engine, action)
+
+        action_type = action.get("type")
+        if action_type == "turn":
+            if engine.current_player == engine.our_player_index:
+                await self._bus.publish(OurTurn(state=engine.to_model()))
+            elif engine.our_player_index >= 0:
+                await self._bus.publish(TheirTurn(engine=engine))
+        elif action_type == "gameOver":
+            snapshot_cache.drop(engine.table_id, engine.our_player_index)
+            await self._finish_game(payload.table_id)
+
+    async def _finish_game(self, table_id: int):
+        actions = self._actions.pop(table_id, None)
+        table = self._tables.pop(table_id, None)
+        engine = self.games.get(table_id)
+        if actions is None or table is None or engine is None or table.replay or table.spectating:
+            return
+        await self._bus.publish(GameFinished(
+            engine=engine,
+            actions=actions,
+            seed=table.seed,
+            variant=table.options.get("variantName", "No Variant"),
+        ))
 
     async def _handle_table_start(self, payload: Dict[str, Any]):
-        pass
-
-    async def _handle_game_action(self, payload: Dict[str, Any]):
-        table_id = payload["tableID"]
-        state = self.games.get(table_id)
-        if not state:
+        # Партия началась или мы вернулись за стол после переподключения: как и клиент hanab.live,
+        # параметры стола запрашиваем сами, в ответ придёт init
+        await self._network.send_command("getGameInfo1", {"tableID": payload["tableID"]})
+
+    async def _handle_init(self, payload: InitPayload):
+        table_id = payload.table_id
+        variant_name = payload.options.get("variantName", "No Variant")
+        variant = find_variant(variant_name)
+        if variant is None:
+            # Правил варианта (особые ранги и т.п.) движок не знает: играть по правилам No Variant нельзя
+            log.warning("Unsupported variant '%s' at table %s, leaving the table", variant_name, table_id)
+            await self._network.send_command(
+                "chat", {"msg": f"Sorry, I can't play {variant_name}.", "room": f"table{table_id}"},
+            )
+            await self._network.send_command("tableUnattend", {"tableID": table_id})
             return
-
-        # Ниже просто затычка
-        action = payload.get("action", {})
-        if action.get("type") == "turn":
-            state.current_player_index = action["currentPlayerIndex"]
-            if state.current_player_index == state.our_player_index:
-                await self._bus.publish(OurTurn(state=state))
-
-    async def _handle_init(self, payload: Dict[str, Any]):
-        table_id = payload["tableID"]
-        state = GameState(
+        engine = GameEngine(
+            num_players=len(payload.player_names),
+            num_suits=variant.num_suits,
+            our_player_index=payload.our_player_index,
             table_id=table_id,
-            player_names=payload["playerNames"],
-            our_player_index=payload["ourPlayerIndex"]
+            player_names=payload.player_names,
+            deck_total=variant.deck_size,
+            variant=variant.name,
         )
-        self.games[table_id] = state
-        log.info(f"Game initialized for table {table_id}")
+        engine.knowledge = clue_table(variant).knowledge(engine.num_players)
+        self.games[table_id] = engine
+        self._loading.add(table_id)
+        self._tables[table_id] = payload
+        self._actions[table_id] = []
+        log.info("Game initialized for table %s (%s)", table_id, variant.name)
         await self._network.send_command("getGameInfo2", {"tableID": table_id})
 
-    async def _handle_game_action_list(self, payload: Dict[str, Any]):
-        pass
-
-    async def _handle_database_id(self, payload: Dict[str, Any]):
-        pass
-
-    async def _handle_unknown(self, payload: Dict[str, Any]):
-        pass  # Игнорируем неизвестные команды
+    async def _handle_game_action_list(self, payload: GameActionListPayload):
+        """
+        Восстанавливает партию одним пакетным проходом (переподключение, наблюдение).
+        Исторические ходы событий не порождают; решение запрашивается только для последнего хода.
+        """
+        table_id = payload.table_id
+        engine = self.games.get(table_id)
+        if not engine:
+            return
+        self._loading.discard(table_id)
+
+        actions = payload.actions
+        self._actions[table_id] = list(actions)
+        restored = snapshot_cache.restore(table_id, engine.our_player_index, actions)
+        if restored is not None:
+            engine = self.games[table_id] = restored
+        resumed_from = engine.num_actions
+        engine.apply_all(actions[resumed_from:])
+        if actions:
+            snapshot_cache.store(engine, actions[-1])
+        log.info("Replayed %d actions for table %s (resumed from action %d)",
+                 len(actions) - resumed_from, table_id, resumed_from)
+
+        if not engine.game_over and _last_turn_player(actions) == engine.our_player_index:
+            # Ход, решённый до обрыва и ещё не отправленный, уходит, если партия на том же ходу;
+            # устаревший отбрасывается, и решение принимается заново
+            if self._network.outbox.release_parked(table_id, engine.turn):
+                return
+            await self._bus.publish(OurTurn(state=engine.to_model()))
+        else:
+            self._network.outbox.release_parked(table_id, engine.turn)
+
+
+def _last_turn_player(actions: List[Dict[str, Any]]) -> int:
+    """Чей ход по последнему `turn` в истории (-1, если партия ещё не началась)."""
+    for action in reversed(actions):
+        if action.get("type") == "turn":
+            return action["currentPlayerIndex"]
+    return -1
@@ -0,0 +1,222 @@
+"""
+Корпус реальных раскладов: импорт партий, выгруженных с hanab.live в JSON (колода + действия).
+
+    python -m oraclehlb.sim.corpus games/ --out corpus --workers 8
+
+Файл - одна партия или список партий в формате экспорта hanab.live:
+`{"id": ..., "players": [...], "deck": [{"suitIndex": 0, "rank": 1}, ...],
+"actions": [{"type": 0, "target": 12}, ...], "options": {"variant": "No Variant"}, "seed": ...}`.
+Каждая партия проигрывается `FakeTable` (недопустимый ход отклоняется, как на hanab.live),
+получившийся поток действий сервера прогоняется через `GameEngine` + `Knowledge`, как у живого бота,
+и сохраняется в хранилище `game.records`. Оно и есть корпус: из него берут колоды симулятор
+(`sim.runner --corpus`) и бенчмарк задержки решений (`bench.decisions`).
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterator, Union
+
+from oraclehlb.bench.fake_server import FakeTable, InvalidAction
+from oraclehlb.game.clues import clue_table
+from oraclehlb.game.engine import GameEngine, NUM_RANKS, RANK_COPIES, UNKNOWN
+from oraclehlb.game.records import RecordWriter, RecordStore, GameRecord, DRAW, IDENTITY
+from oraclehlb.game.variants import find_variant
+
+log = logging.getLogger(__name__)
+
+# Источник партии в поле «стратегия» хранилища
+SOURCE = "hanab.live"
+# Действие экспорта: 0 - play, 1 - discard, 2 - подсказка цветом, 3 - рангом, 4 - досрочный конец партии
+TERMINATE = 4
+
+
+class InvalidGame(ValueError):
+    """Партию нельзя импортировать: неподдерживаемый вариант, битая колода или недопустимый ход."""
+
+
+@dataclass
+class ImportedGame:
+    table_id: int
+    players: List[str]
+    variant: str
+    seed: str
+    engine: GameEngine
+    actions: List[Dict[str, Any]]
+
+
+def convert_game(data: Dict[str, Any]) -> ImportedGame:
+    """Экспорт hanab.live -> действия в формате `gameAction`, проверенные движком бота."""
+    players = data.get("players") or []
+    if not 2 <= len(players) <= 6:
+        raise InvalidGame(f"Unsupported number of players: {len(players)}")
+    options = data.get("options") or {}
+    variant_name = options.get("variant", "No Variant")
+    variant = find_variant(variant_name)
+    if variant is None:
+        raise InvalidGame(f"Unknown variant '{variant_name}'")
+    # Строгий стол фейкового сервера знает только обычные масти
+    if not variant.plain:
+        raise InvalidGame(f"Unsupported variant '{variant_name}'")
+    num_suits = variant.num_suits
+    if options.get("startingPlayer", 0):
+        raise InvalidGame("Games with a custom starting player are not supported")
+
+    try:
+        deck = [(card["suitIndex"], card["rank"]) for card in data["deck"]]
+    except (KeyError, TypeError) as e:
+        raise InvalidGame(f"Malformed deck: {e}") from e
+    expected = Counter({
+        (ident // NUM_RANKS, ident % NUM_RANKS + 1): copies for ident, copies in enumerate(variant.copies)
+    })
+    if Counter(deck) != expected:
+        raise InvalidGame("Deck does not match the variant")
+
+    table_id = int(data.get("id") or 0)
+    table = FakeTable(table_id, list(players), seed=0, deck=deck)
+    table.deal()
+    table.start()
+    try:
+        for action in data.get("actions") or []:
+            if table.finished:
+                raise InvalidGame("Actions after the end of the game")
+            if action.get("type") == TERMINATE:
+                table.terminate(int(action.get("target", table.current_player)), int(action.get("value", 0)))
+            else:
+                table.apply_client_action(table.current_player, action)
+    except InvalidAction as e:
+        raise InvalidGame(f"Turn {table.turn}: {e}") from e
+    if not table.finished:
+        raise InvalidGame("Game did not finish")
+
+    # Проверка тем же путём, что у живого бота: действия сервера -> GameEngine + Knowledge
+    engine = GameEngine(
+        num_players=len(players), num_suits=num_suits, table_id=table_id, player_names=list(players),
+        variant=variant.name,
+    )
+    engine.knowledge = clue_table(variant).knowledge(engine.num_players)
+    try:
+        engine.apply_all(table.actions)
+    except (ValueError, IndexError, KeyError) as e:
+        raise InvalidGame(f"Engine rejected the action stream: {e!r}") from e
+    if engine.stacks != table.stacks or engine.strikes != table.strikes or not engine.game_over:
+        raise InvalidGame("Engine state diverged from the replayed game")
+    # Невзятые карты тоже нужны корпусу: колода целиком - это расклад для симулятора
+    for order in range(table.next_order, len(deck)):
+        suit, rank = deck[order]
+        table.actions.append({
+            "type": "cardIdentity", "playerIndex": UNKNOWN, "order": order, "suitIndex": suit, "rank": rank,
+        })
+    # Знание нужно было только для проверки; без него результат дешевле передать из воркера
+    engine.knowledge = None
+    return ImportedGame(table_id, list(players), variant.name, str(data.get("seed", "")), engine, table.actions)
+
+
+def import_file(path: Path) -> List[Union[ImportedGame, str]]:
+    """Точка входа процесса-воркера: партии файла или описания ошибок (`"<file>: <причина>"`)."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        return [f"{path}: {e}"]
+    results: List[Union[ImportedGame, str]] = []
+    for index, game in enumerate(data if isinstance(data, list) else [data]):
+        try:
+            results.append(convert_game(game))
+        except InvalidGame as e:
+            results.append(f"{path}[{index}]: {e}")
+    return results
+
+
+def _iter_files(source: Path) -> Iterator[Path]:
+    if source.is_file():
+        yield source
+        return
+    yield from sorted(source.rglob("*.json"))
+
+
+def import_directory(source: Path, out: Path, workers: int = 1, max_pending: int = 64) -> Dict[str, int]:
+    """
+    Импортирует все `*.json` из `source` в хранилище `out` (дописывая). Файлы разбираются
+    в `workers` процессах, в полёте не больше `max_pending` файлов, так что каталог читается потоково;
+    пишет только родитель. Партии, чей tableID уже есть в хранилище, пропускаются.
+    """
+    known = set()
+    if (out / "games.bin").exists():
+        with RecordStore(out) as store:
+            known = set(store.by_table)
+    writer = RecordWriter(out)
+    stats = Counter()
+
+    def store_results(results: List[Union[ImportedGame, str]]):
+        for result in results:
+            if isinstance(result, str):
+                stats["invalid"] += 1
+                log.warning("Skipped %s", result)
+            elif result.table_id and result.table_id in known:
+                stats["duplicate"] += 1
+            else:
+                known.add(result.table_id)
+                writer.append(result.engine, result.actions, SOURCE, result.variant, result.seed)
+                stats["imported"] += 1
+
+    if workers <= 1:
+        for path in _iter_files(source):
+            store_results(import_file(path))
+        return dict(stats)
+
+    pending: List[Future] = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for path in _iter_files(source):
+            pending.append(executor.submit(import_file, path))
+            if len(pending) >= max_pending:
+                store_results(pending.pop(0).result())
+        for future in pending:
+            store_results(future.result())
+    return dict(stats)
+
+
+def corpus_decks(
+        store: RecordStore, num_players: int = 0, num_suits: int = 5,
+) -> List[Tuple[GameRecord, List[Tuple[int, int]]]]:
+    """
+    Партии корпуса с колодами (`[(suit, rank), ...]` по order), восстановленными по draw и cardIdentity.
+    `num_players` > 0 оставляет только партии с таким числом игроков.
+    """
+    decks = []
+    for record in store.games:
+        if record.num_suits != num_suits or (num_players and record.num_players != num_players):
+            continue
+        deck = {}
+        for kind, _, _, suit, rank, _, order, _ in store.raw_actions(record):
+            if kind == DRAW or kind == IDENTITY:
+                deck[order] = (suit, rank)
+        if len(deck) == num_suits * sum(RANK_COPIES) and all(suit >= 0 for suit, _ in deck.values()):
+            decks.append((record, [deck[order] for order in range(len(deck))]))
+    return decks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import hanab.live game exports into a seed corpus.")
+    parser.add_argument("source", type=Path, help="A JSON export or a directory of them (searched recursively).")
+    parser.add_argument("--out", type=Path, default=Path("corpus"), help="Record store to append to.")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s - %(levelname)s - %(message)s")
+    started = time.perf_counter()
+    stats = import_directory(args.source, args.out, args.workers)
+    elapsed = time.perf_counter() - started
+    print(
+        f"imported {stats.get('imported', 0)}, skipped {stats.get('invalid', 0)} invalid "
+        f"and {stats.get('duplicate', 0)} duplicate games in {elapsed:.1f}s -> {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Офлайн self-play: полные партии между стратегиями без сети.
+
+    python -m oraclehlb.sim.runner --strategy MonteCarloStrategy --players 2 3 4 5 --games 1000 --workers 8
+    python -m oraclehlb.sim.runner --variant "6 Suits" --params '{"max_determinizations": 64}'
+    python -m oraclehlb.sim.runner --vectorized --players 2 3 4 5 --games 100000
+    python -m oraclehlb.sim.runner --corpus corpus --players 3 --games 500
+
+Правила и поток действий - как у фейкового сервера (`FakeTable`), каждое место видит партию
+через свой `GameEngine` с `Knowledge`, т.е. стратегия получает то же состояние, что и в живой игре.
+Колоды детерминированы: партия `i` играется колодой с сидом `seed + i`, так что разные стратегии
+сравниваются на одних и тех же раскладах. С `--corpus` вместо сидов берутся реальные
+расклады партий hanab.live (см. `sim.corpus`), и в отчёте есть счёт людей на них.
+Стратегии с бюджетом по часам (`time_bound`) играют по одной партии на процесс: одновременные партии
+делили бы время, и сила игры зависела бы от `--concurrency`. По умолчанию `MonteCarloStrategy`
+получает бюджет в детерминизациях (`SIM_PARAMS`), так что результат не зависит от загрузки CPU.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.bench.fake_server import FakeTable, InvalidAction
+from oraclehlb.core.strategy_loader import load_strategy
+from oraclehlb.game.clues import clue_table
+from oraclehlb.game.engine import GameEngine, MAX_STRIKES, NUM_RANKS
+from oraclehlb.game.records import RecordStore
+from oraclehlb.game.variants import Variant, get_variant
+from oraclehlb.sim.corpus import corpus_decks
+
+log = logging.getLogger(__name__)
+
+MAX_SCORE = 25
+# Колода партии: (suit, rank) по order
+Deck = List[Tuple[int, int]]
+# Параметры стратегии по умолчанию (без --strategy и --params): бюджет в детерминизациях, а не в секундах
+SIM_PARAMS: Dict[str, Any] = {"max_determinizations": 32, "time_budget": 60.0}
+
+
+@dataclass
+class GameResult:
+    seed: int
+    num_players: int
+    # Как на hanab.live: при трёх страйках счёт 0
+    score: int
+    strikes: int
+    turns: int
+    invalid_actions: int
+    decision_time: float
+
+
+def shuffled_deck(variant: Variant, seed: int) -> Deck:
+    """Колода варианта, перемешанная по сиду (для No Variant - та же, что у `FakeTable` с этим сидом)."""
+    deck = [
+        (ident // NUM_RANKS, ident % NUM_RANKS + 1)
+        for ident, copies in enumerate(variant.copies)
+        for _ in range(copies)
+    ]
+    random.Random(seed).shuffle(deck)
+    return deck
+
+
+async def play_game(
+        strategies: List[BaseStrategy], seed: int, deck: Optional[Deck] = None, variant: str = "No Variant",
+) -> GameResult:
+    """
+    Играет одну партию варианта `variant`; `strategies[i]` ходит за место `i`. `deck` - готовая колода вместо сида.
+    Стол фейкового сервера знает только обычные масти, поэтому варианты с особыми мастями не поддерживаются.
+    """
+    spec = get_variant(variant)
+    if not spec.plain:
+        raise ValueError(f"The simulator supports only variants without special suits, not '{variant}'")
+    num_players = len(strategies)
+    table = FakeTable(0, [f"sim{i}" for i in range(num_players)], seed, deck=deck or shuffled_deck(spec, seed))
+    table_rules = clue_table(spec)
+    engines = []
+    for seat in range(num_players):
+        engine = GameEngine(
+            num_players=num_players, num_suits=spec.num_suits, our_player_index=seat, player_names=table.players,
+            deck_total=spec.deck_size, variant=spec.name,
+        )
+        engine.knowledge = table_rules.knowledge(num_players)
+        engines.append(engine)
+
+    table.deal()
+    table.start()
+    seen = 0
+    decision_time = 0.0
+    while True:
+        new_actions = table.actions[seen:]
+        seen = len(table.actions)
+        for seat, engine in enumerate(engines):
+            for action in new_actions:
+                engine.apply(table.visible_to(seat, action))
+        if table.finished:
+            break
+
+        seat = table.current_player
+        started = time.perf_counter()
+        state = engines[seat].to_model()
+        payload = await strategies[seat].decide_action(state)
+        decision_time += time.perf_counter() - started
+        try:
+            table.apply_client_action(seat, payload)
+        except InvalidAction as e:
+            # Живой сервер отклонил бы ход и ждал другого; здесь за игрока ходит запасной ход стратегии
+            log.debug("Seat %d sent an invalid action %s: %s", seat, payload, e)
+            table.apply_client_action(seat, strategies[seat].fallback_action(state))
+
+    return GameResult(
+        seed=seed,
+        num_players=num_players,
+        score=0 if table.strikes >= MAX_STRIKES else table.score,
+        strikes=table.strikes,
+        turns=table.turn,
+        invalid_actions=table.invalid_actions,
+        decision_time=decision_time,
+    )
+
+
+async def _play_many(
+        strategy_names: List[str], num_players: int, seeds: List[int], concurrency: int, decks: Optional[List[Deck]],
+        params: Optional[Dict[str, Any]], variant: str,
+) -> List[GameResult]:
+    # Партии идут одновременно: стратегии, которые ждут (asyncio.sleep, I/O), не тормозят остальные
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int, seed: int) -> GameResult:
+        async with semaphore:
+            # Свой экземпляр стратегии на каждое место: у стратегий может быть состояние партии
+            strategies = [
+                load_strategy(strategy_names[seat % len(strategy_names)], params) for seat in range(num_players)
+            ]
+            return await play_game(strategies, seed, decks[index] if decks else None, variant)
+
+    return await asyncio.gather(*(one(index, seed) for index, seed in enumerate(seeds)))
+
+
+def play_chunk(
+        strategy_names: List[str],
+        num_players: int,
+        seeds: List[int],
+        concurrency: int = 16,
+        decks: Optional[List[Deck]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        variant: str = "No Variant",
+) -> List[GameResult]:
+    """Точка входа процесса-воркера: играет пачку партий в собственном event loop."""
+    return asyncio.run(_play_many(strategy_names, num_players, seeds, concurrency, decks, params, variant))
+
+
+def effective_concurrency(strategy_names: List[str], params: Optional[Dict[str, Any]], concurrency: int) -> int:
+    """Одна партия на процесс, если хоть одна стратегия ограничена временем на часах."""
+    if concurrency > 1 and any(load_strategy(name, params).time_bound for name in set(strategy_names)):
+        log.warning("Time-budgeted strategies play one game per worker (--concurrency %d ignored).", concurrency)
+        return 1
+    return concurrency
+
+
+def run_batch(
+        strategy_names: List[str],
+        num_players: int,
+        games: int,
+        seed: int = 0,
+        workers: int = 1,
+        concurrency: int = 16,
+        decks: Optional[List[Deck]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        variant: str = "No Variant",
+) -> List[GameResult]:
+    """
+    Играет `games` партий, распределяя их по `workers` процессам (1 - в текущем процессе).
+    С `decks` партия `i` играется колодой `decks[i]` (корпус реальных раскладов), а не сидом.
+    `params` - параметры конструктора всех стратегий.
+    """
+    if decks is not None:
+        games = min(games, len(decks))
+        decks = decks[:games]
+    seeds = list(range(seed, seed + games))
+    concurrency = effective_concurrency(strategy_names, params, concurrency)
+    if workers <= 1:
+        return play_chunk(strategy_names, num_players, seeds, concurrency, decks, params, variant)
+
+    # Мелкие пачки выравнивают нагрузку, если партии сильно различаются по длине,
+    # но пачка не меньше `concurrency`, иначе ждущие стратегии не играют параллельно
+    chunk_size = max(1, min(concurrency, math.ceil(games / workers)), games // (workers * 4))
+    results: List[GameResult] = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            executor.submit(
+                play_chunk, strategy_names, num_players, seeds[i:i + chunk_size], concurrency,
+                decks[i:i + chunk_size] if decks else None, params, variant,
+            )
+            for i in range(0, games, chunk_size)
+        ]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def summarize(
+        scores: List[int], elapsed: float, results: Optional[List[GameResult]] = None, max_score: int = MAX_SCORE,
+) -> Dict[str, Any]:
+    """Распределение очков, доля идеальных партий и скорость."""
+    games = len(scores)
+    report = {
+        "games": games,
+        "elapsed_s": round(elapsed, 3),
+        "games_per_sec": round(games / elapsed, 1) if elapsed else 0.0,
+        "mean_score": round(statistics.fmean(scores), 3) if scores else 0.0,
+        "stdev_score": round(statistics.stdev(scores), 3) if games > 1 else 0.0,
+        "perfect_rate": round(sum(1 for score in scores if score == max_score) / games, 4) if games else 0.0,
+        "distribution": dict(sorted(Counter(scores).items())),
+    }
+    if results:
+        report["strikeout_rate"] = round(sum(1 for r in results if r.strikes >= MAX_STRIKES) / games, 4)
+        report["invalid_actions"] = sum(r.invalid_actions for r in results)
+        turns = sum(r.turns for r in results)
+        report["decision_ms"] = round(sum(r.decision_time for r in results) / turns * 1000, 3) if turns else 0.0
+    return report
+
+
+def print_report(label: str, report: Dict[str, Any]):
+    line = (f"{label}: {report['games']} games in {report['elapsed_s']}s ({report['games_per_sec']} games/sec), "
+            f"score {report['mean_score']} ± {report['stdev_score']}, perfect {report['perfect_rate']:.2%}")
+    if "strikeout_rate" in report:
+        line += (f", strikeouts {report['strikeout_rate']:.2%}, invalid actions {report['invalid_actions']}, "
+                 f"{report['decision_ms']} ms/decision")
+    if "human_mean_score" in report:
+        line += f", humans scored {report['human_mean_score']} on these deals"
+    print(line)
+    peak = max(report["distribution"].values(), default=1)
+    for score, count in report["distribution"].items():
+        print(f"  {score:>2} {count:>7} {'#' * max(1, round(40 * count / peak))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless self-play simulator for strategy evaluation.")
+    parser.add_argument("--strategy", action="append", help="Strategy class; repeat to alternate seats (default MonteCarloStrategy).")
+    parser.add_argument("--params", type=json.loads, help="Constructor parameters of every strategy as a JSON object "
+                                                          "(default for MonteCarloStrategy: a determinization budget).")
+    parser.add_argument("--variant", default="No Variant", help="hanab.live variant without special suits.")
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3, 4, 5, 6])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Concurrent games per worker process (1 for time-budgeted strategies).")
+    parser.add_argument("--corpus", type=Path, help="Play the real deals of a record store (see sim.corpus) instead of seeds.")
+    parser.add_argument("--vectorized", action="store_true", help="Use the NumPy batch policy instead of strategies.")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--json", type=Path, help="Also write the reports to this file.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s - %(levelname)s - %(message)s")
+    strategy_names = args.strategy or ["MonteCarloStrategy"]
+    params = args.params if args.params is not None else (SIM_PARAMS if args.strategy is None else None)
+    try:
+        variant = get_variant(args.variant)
+    except KeyError:
+        parser.error(f"unknown variant '{args.variant}'")
+    if not variant.plain:
+        parser.error(f"variant '{args.variant}' has special suits, which the simulator does not support")
+    if args.vectorized and variant.num_suits != 5:
+        parser.error("--vectorized plays No Variant only")
+    max_score = variant.num_suits * NUM_RANKS
+    reports = {}
+    for num_players in args.players:
+        started = time.perf_counter()
+        if args.vectorized:
+            from oraclehlb.sim.vectorized import play_batch
+            scores = play_batch(args.games, num_players, seed=args.seed).tolist()
+            report = summarize(scores, time.perf_counter() - started)
+        elif args.corpus:
+            with RecordStore(args.corpus) as store:
+                games = [
+                    (record, deck) for record, deck in corpus_decks(store, num_players, variant.num_suits)
+                    if record.variant == variant.name
+                ][:args.games]
+            if not games:
+                print(f"{num_players} players: no games in {args.corpus}")
+                continue
+            started = time.perf_counter()
+            results = run_batch(
+                strategy_names, num_players, len(games), args.seed, args.workers, args.concurrency,
+                decks=[deck for _, deck in games], params=params, variant=variant.name,
+            )
+            report = summarize([r.score for r in results], time.perf_counter() - started, results, max_score)
+            # Счёт людей на тех же раскладах (как и у симулятора, при трёх страйках - 0)
+            report["human_mean_score"] = round(statistics.fmean(
+                0 if record.strikes >= MAX_STRIKES else record.score for record, _ in games
+            ), 3)
+        else:
+            results = run_batch(
+                strategy_names, num_players, args.games, args.seed, args.workers, args.concurrency,
+                params=params, variant=variant.name,
+            )
+            report = summarize([r.score for r in results], time.perf_counter() - started, results, max_score)
+        print_report(f"{num_players} players", report)
+        reports[num_players] = report
+
+    if args.json:
+        args.json.write_text(json.dumps(reports, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Пакетная симуляция простой политики на NumPy: тысячи партий идут одновременно, один ход - одна операция над массивами.
+
+Политика с полной информацией (базовая линия и проверка пропускной способности, а не сильная игра):
+сыграть самую старую играбельную карту, иначе сбросить самую старую карту, если подсказки не полны,
+иначе потратить подсказку. Колода партии `i` строится тем же сидом `seed + i`, что и в `runner`, но
+порядок перемешивания у NumPy свой, поэтому расклады с поштучной симуляцией не совпадают.
+
+NumPy - необязательная зависимость (`pip install -e .[sim]`).
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+from oraclehlb.game.engine import NUM_RANKS, MAX_CLUE_TOKENS, RANK_COPIES, default_hand_size
+
+NUM_SUITS = 5
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("NumPy is required for vectorized simulation: pip install -e .[sim]")
+
+
+def shuffled_decks(games: int, seed: int = 0) -> "np.ndarray":
+    """Колоды (games, 50) идентичностей suit * 5 + rank - 1; колода `i` зависит только от `seed + i`."""
+    _require_numpy()
+    base = np.array(
+        [suit * NUM_RANKS + rank for suit in range(NUM_SUITS) for rank in range(NUM_RANKS) for _ in range(RANK_COPIES[rank])],
+        dtype=np.int8,
+    )
+    return np.stack([np.random.default_rng(seed + i).permutation(base) for i in range(games)])
+
+
+def play_batch(games: int, num_players: int, seed: int = 0) -> "np.ndarray":
+    """Играет `games` партий и возвращает массив итоговых очков."""
+    _require_numpy()
+    hand_size = default_hand_size(num_players)
+    decks = shuffled_decks(games, seed)
+    deck_total = decks.shape[1]
+    rows = np.arange(games)
+
+    # Руки (games, players, hand_size), от старой карты к новой; -1 - пустой слот
+    hands = np.full((games, num_players, hand_size), -1, dtype=np.int8)
+    # Раздача как на hanab.live (и в `FakeTable`): каждый игрок получает всю руку подряд
+    for player in range(num_players):
+        for slot in range(hand_size):
+            hands[:, player, slot] = decks[:, player * hand_size + slot]
+    next_card = np.full(games, num_players * hand_size)
+    stacks = np.zeros((games, NUM_SUITS), dtype=np.int8)
+    clues = np.full(games, MAX_CLUE_TOKENS, dtype=np.int8)
+    # Последний ход партии: назначается, когда взята последняя карта
+    end_turn = np.full(games, -1)
+    active = np.ones(games, dtype=bool)
+    shift = np.arange(hand_size)
+
+    turn = 0
+    while active.any():
+        player = turn % num_players
+        hand = hands[:, player]
+        suits = np.where(hand >= 0, hand // NUM_RANKS, 0)
+        ranks = hand % NUM_RANKS + 1
+        playable = (hand >= 0) & (np.take_along_axis(stacks, suits, axis=1) + 1 == ranks)
+
+        plays = active & playable.any(axis=1)
+        discards = active & ~plays & (clues < MAX_CLUE_TOKENS)
+        clue_givers = active & ~plays & ~discards
+
+        slot = np.where(plays, playable.argmax(axis=1), 0)
+        card = hand[rows, slot]
+        played_suit, played_rank = card // NUM_RANKS, card % NUM_RANKS + 1
+
+        stacks[rows[plays], played_suit[plays]] = played_rank[plays]
+        clues += (plays & (played_rank == NUM_RANKS) & (clues < MAX_CLUE_TOKENS)).astype(np.int8)
+        clues += discards.astype(np.int8)
+        clues -= clue_givers.astype(np.int8)
+
+        # Убираем карту из руки сдвигом влево и добираем новую в конец
+        removes = plays | discards
+        source = shift[None, :] + (shift[None, :] >= slot[:, None])
+        shifted = np.take_along_axis(hand, np.minimum(source, hand_size - 1), axis=1)
+        has_card = next_card < deck_total
+        drawn = np.where(has_card, decks[rows, np.minimum(next_card, deck_total - 1)], -1)
+        shifted[:, -1] = drawn
+        hands[removes, player] = shifted[removes]
+        drawing = removes & has_card
+        next_card += drawing
+        end_turn = np.where(drawing & (next_card == deck_total), turn + num_players, end_turn)
+
+        turn += 1
+        finished = (stacks.sum(axis=1) == NUM_SUITS * NUM_RANKS) | ((end_turn >= 0) & (end_turn < turn))
+        active &= ~finished
+
+    return stacks.sum(axis=1, dtype=np.int32)
@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+from oraclehlb.core.reconnect import CircuitBreaker, CircuitState, ReconnectCoordinator
+
+
+def test_opens_after_threshold_failures_in_a_row():
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=10.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # успех сбрасывает счётчик
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_closed_breaker_lets_everyone_through():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=3)
+        assert await breaker.acquire() is False
+        assert await breaker.acquire() is False
+
+    asyncio.run(scenario())
+
+
+def test_one_probe_after_cooldown_and_success_releases_the_rest():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.05)
+        breaker.record_failure()
+        started = time.monotonic()
+
+        tasks = [asyncio.create_task(breaker.acquire()) for _ in range(2)]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        assert [task.result() for task in done] == [True]
+        assert time.monotonic() - started >= 0.04
+        assert breaker.state == CircuitState.HALF_OPEN
+        await asyncio.sleep(0.01)
+        (waiting,) = pending
+        assert not waiting.done()  # пока идёт проба, остальные ждут
+
+        breaker.record_success()
+        assert await asyncio.wait_for(waiting, timeout=1) is True
+        assert breaker.state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_opens_again_with_a_longer_cooldown():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.02, max_open_seconds=0.2)
+        breaker.record_failure()
+        await breaker.acquire()
+        assert breaker.state == CircuitState.HALF_OPEN
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert 0.02 <= breaker._cooldown <= 0.2
+        # Пока разомкнут, неудачи других попыток не продлевают остывание
+        open_until = breaker._open_until
+        breaker.record_failure()
+        assert breaker._open_until == open_until
+
+        await breaker.acquire()
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker._cooldown == breaker.open_seconds
+
+    asyncio.run(scenario())
+
+
+def test_silent_probe_is_replaced_after_probe_timeout():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.03)
+        breaker.record_failure()
+        await breaker.acquire()  # проба так и не отчиталась
+
+        started = time.monotonic()
+        assert await asyncio.wait_for(breaker.acquire(), timeout=1) is True
+        assert time.monotonic() - started >= breaker.probe_timeout * 0.9
+        assert breaker.state == CircuitState.HALF_OPEN
+
+    asyncio.run(scenario())
+
+
+def test_connection_closed_right_after_connecting_counts_as_a_failure():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=3, open_seconds=10.0)
+        coordinator = ReconnectCoordinator(
+            base_delay=0.001, max_delay=0.02, breaker=breaker, release_window=0.0, stable_seconds=0.2,
+        )
+        # Сервер принимает сокет и тут же его закрывает: пауза растёт, предохранитель размыкается
+        for _ in range(3):
+            await coordinator.before_connect("alice")
+            await coordinator.connected("alice")
+            await coordinator.disconnected("alice", "closed by server")
+        status = coordinator._bots["alice"]
+        assert status.failures == 3 and status.delay > coordinator.base_delay
+        assert breaker.state == CircuitState.OPEN
+
+    asyncio.run(scenario())
+
+
+def test_connection_that_stays_up_resets_the_backoff():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=3, open_seconds=0.01)
+        coordinator = ReconnectCoordinator(
+            base_delay=0.001, max_delay=0.02, breaker=breaker, release_window=0.0, stable_seconds=0.05,
+        )
+        for _ in range(3):
+            await coordinator.failed("alice", "refused")
+        await coordinator.before_connect("alice")
+        assert breaker.state == CircuitState.HALF_OPEN
+
+        await coordinator.connected("alice")
+        await asyncio.sleep(0.1)
+        status = coordinator._bots["alice"]
+        assert breaker.state == CircuitState.CLOSED
+        assert (status.failures, status.delay) == (0, coordinator.base_delay)
+        await coordinator.disconnected("alice", "closed by server")  # долгое соединение - не неудача
+        assert status.failures == 0 and breaker.state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
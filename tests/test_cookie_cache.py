@@ -0,0 +1,57 @@
+import asyncio
+import json
+import stat
+import time
+
+from oraclehlb.core.rate_limit import TokenBucket
+from oraclehlb.services.cookie_cache import CookieCache
+
+
+def test_cookies_survive_a_restart_and_expire(tmp_path):
+    path = tmp_path / "cache" / "cookies.json"
+    cache = CookieCache(path, ttl=60.0)
+    cache.put("alice", "session=a")
+    cache.put("bob", "session=b", max_age=-1.0)  # сервер прислал уже истёкшую cookie
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    restarted = CookieCache(path, ttl=60.0)
+    assert restarted.get("alice") == "session=a"
+    assert restarted.get("bob") is None
+    assert "bob" not in json.loads(path.read_text(encoding="utf-8"))  # истёкшая запись удалена и с диска
+    restarted.invalidate("alice")
+    assert CookieCache(path).get("alice") is None
+
+
+def test_unreadable_cache_starts_empty(tmp_path):
+    path = tmp_path / "cookies.json"
+    path.write_text("{broken", encoding="utf-8")
+    cache = CookieCache(path)
+    assert cache.get("alice") is None
+    cache.put("alice", "session=a")
+    assert CookieCache(path).get("alice") == "session=a"
+
+
+def test_token_bucket_allows_a_burst_then_keeps_the_rate():
+    async def scenario():
+        bucket = TokenBucket(rate=20.0, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        assert time.monotonic() - started < 0.05
+        for _ in range(4):
+            await bucket.acquire()
+        # Четыре операции сверх всплеска - не быстрее 4 / rate
+        assert time.monotonic() - started >= 4 / 20.0 * 0.9
+
+    asyncio.run(scenario())
+
+
+def test_zero_rate_means_no_limit():
+    async def scenario():
+        bucket = TokenBucket(rate=0.0)
+        started = time.monotonic()
+        for _ in range(100):
+            await bucket.acquire()
+        assert time.monotonic() - started < 0.05
+
+    asyncio.run(scenario())
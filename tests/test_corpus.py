@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+from oraclehlb.bench.fake_server import FakeTable, MAX_CLUE_TOKENS
+from oraclehlb.game.engine import default_hand_size
+from oraclehlb.game.records import RecordStore
+from oraclehlb.sim.corpus import convert_game, corpus_decks, import_directory
+
+FIXTURE = Path(__file__).parent / "fixtures" / "hanablive_export.json"
+
+
+def _export(table_id: int, seed: int, num_players: int = 3) -> dict:
+    """Партия в формате экспорта hanab.live: сбросы, а при полном запасе - подсказка ранга."""
+    players = [f"p{i}" for i in range(num_players)]
+    table = FakeTable(table_id, players, seed)
+    table.deal()
+    table.start()
+    actions = []
+    while not table.finished:
+        seat = table.current_player
+        if table.clue_tokens < MAX_CLUE_TOKENS:
+            action = {"type": 1, "target": table.hands[seat][0]}
+        else:
+            target = (seat + 1) % num_players
+            action = {"type": 3, "target": target, "value": table.cards[table.hands[target][0]][1]}
+        table.apply_client_action(seat, action)
+        actions.append(action)
+    return {
+        "id": table_id,
+        "players": players,
+        "deck": [{"suitIndex": suit, "rank": rank} for suit, rank in table.deck],
+        "actions": actions,
+        "seed": str(seed),
+    }
+
+
+def test_exported_game_replays_through_the_engine():
+    imported = convert_game(_export(table_id=5, seed=1))
+    assert imported.engine.game_over and imported.engine.knowledge is None
+    # Каждая карта колоды видна в потоке: взятые - в draw, невзятые - в дописанных cardIdentity
+    dealt = {action["order"] for action in imported.actions if action["type"] in ("draw", "cardIdentity")}
+    assert dealt == set(range(50))
+
+
+def test_directory_import_skips_duplicates_and_invalid_games(tmp_path):
+    games = [_export(table_id=1, seed=1), _export(table_id=2, seed=2)]
+    broken = dict(games[0], id=3, deck=games[0]["deck"][:-1])
+    source = tmp_path / "exports"
+    source.mkdir()
+    (source / "a.json").write_text(json.dumps(games), encoding="utf-8")
+    (source / "b.json").write_text(json.dumps([games[0], broken]), encoding="utf-8")
+
+    stats = import_directory(source, tmp_path / "corpus")
+    assert stats == {"imported": 2, "duplicate": 1, "invalid": 1}
+    with RecordStore(tmp_path / "corpus") as store:
+        decks = [deck for _, deck in corpus_decks(store, num_players=3)]
+    assert decks == [[(card["suitIndex"], card["rank"]) for card in game["deck"]] for game in games]
+
+
+def test_hanablive_export_imports_with_per_seat_deal():
+    games = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    for data in games:
+        imported = convert_game(data)
+        num_players = len(data["players"])
+        hand_size = default_hand_size(num_players)
+        first_draws = [action for action in imported.actions if action["type"] == "draw"][:num_players * hand_size]
+        # hanab.live раздаёт каждому игроку всю руку подряд: у места 0 - orders 0..h-1
+        for action in first_draws:
+            assert action["playerIndex"] == action["order"] // hand_size
+        assert imported.engine.game_over
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import signal
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.core.decision_pool import DecisionPool
+from oraclehlb.core.strategy_loader import strategy_registry
+
+from test_montecarlo import _first_turn
+
+
+class SlowStrategy(BaseStrategy):
+    async def decide_action(self, state):
+        await asyncio.sleep(10)
+
+
+class BrokenStrategy(BaseStrategy):
+    async def decide_action(self, state):
+        raise RuntimeError("boom")
+
+
+class DiscardStrategy(BaseStrategy):
+    async def decide_action(self, state):
+        return {"type": 1, "target": state.hands[state.our_player_index][-1].order}
+
+
+def test_decisions_in_the_event_loop_fall_back_on_timeout_and_errors():
+    async def scenario():
+        pool = DecisionPool(workers=0, timeout=0.05)
+        state = _first_turn().to_model()
+        newest = state.hands[0][-1].order
+        assert await pool.decide(DiscardStrategy(), state) == {"type": 1, "target": newest}
+        for strategy in (SlowStrategy(), BrokenStrategy()):
+            assert await pool.decide(strategy, state) == strategy.fallback_action(state)
+            assert await pool.ponder(strategy, state) is None
+
+    asyncio.run(scenario())
+
+
+def test_cpu_bound_decisions_run_in_worker_processes_and_survive_a_dead_worker():
+    async def scenario():
+        pool = DecisionPool(workers=1, timeout=30.0)
+        pool.start(["MonteCarloStrategy"])
+        try:
+            strategy = strategy_registry.create("MonteCarloStrategy", {"max_determinizations": 4, "seed": 1})
+            state = _first_turn().to_model()
+            action = await pool.decide(strategy, state)
+            assert action["type"] in (0, 1, 2, 3)
+            assert strategy.last_stats == {}  # решение считал воркер, а не экземпляр в event loop
+
+            # Воркер убит (OOM, сигнал): ход заменяется запасным, пул пересоздаётся
+            for pid in list(pool._executor._processes):
+                os.kill(pid, signal.SIGKILL)
+            await asyncio.sleep(0.5)
+            assert await pool.decide(strategy, state) == strategy.fallback_action(state)
+            assert (await pool.decide(strategy, state))["type"] in (0, 1, 2, 3)
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
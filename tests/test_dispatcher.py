@@ -0,0 +1,94 @@
+import asyncio
+
+from oraclehlb.core.event_bus import EventBus, RawMessageReceived
+from oraclehlb.services.dispatcher import FrameDispatcher, table_key
+
+
+def _frame(command: str, table_id: int, n: int) -> str:
+    return f'{command} {{"tableID": {table_id}, "n": {n}}}'
+
+
+def test_table_key_splits_table_commands_from_the_shared_lane():
+    assert table_key(_frame("gameAction", 7, 0)) == 7
+    assert table_key('chat {"msg": "hi", "tableID": 7}') is None
+    assert table_key("welcome {}") is None
+
+
+def test_frames_keep_their_order_within_a_table():
+    async def scenario():
+        bus = EventBus()
+        dispatcher = FrameDispatcher(bus)
+        seen = []
+
+        async def handler(event: RawMessageReceived):
+            await asyncio.sleep(0)
+            seen.append(event.message)
+
+        bus.subscribe(RawMessageReceived, handler)
+        frames = [_frame("gameAction", table, n) for n in range(5) for table in (1, 2)]
+        for frame in frames:
+            await dispatcher.submit(frame)
+        while dispatcher.snapshot()["pending"]:
+            await asyncio.sleep(0)
+
+        for table in (1, 2):
+            assert [m for m in seen if table_key(m) == table] == [f for f in frames if table_key(f) == table]
+        assert dispatcher.snapshot()["lanes"] == 0
+        assert dispatcher.stats.handled == len(frames)
+
+    asyncio.run(scenario())
+
+
+def test_slow_table_does_not_block_other_tables():
+    async def scenario():
+        bus = EventBus()
+        dispatcher = FrameDispatcher(bus)
+        release = asyncio.Event()
+        seen = []
+
+        async def handler(event: RawMessageReceived):
+            if table_key(event.message) == 1:
+                await release.wait()
+            seen.append(table_key(event.message))
+
+        bus.subscribe(RawMessageReceived, handler)
+        await dispatcher.submit(_frame("gameAction", 1, 0))
+        await dispatcher.submit(_frame("gameAction", 2, 0))
+        await dispatcher.submit("chat {}")
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert seen == [2, None]
+
+        release.set()
+        while dispatcher.snapshot()["pending"]:
+            await asyncio.sleep(0)
+        assert seen == [2, None, 1]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_lane_gives_back_the_slots_of_its_frames():
+    async def scenario():
+        bus = EventBus()
+        dispatcher = FrameDispatcher(bus, max_pending=3)
+
+        async def stuck(event: RawMessageReceived):
+            await asyncio.Event().wait()
+
+        bus.subscribe(RawMessageReceived, stuck)
+        for n in range(3):
+            await dispatcher.submit(_frame("gameAction", 1, n))
+        await asyncio.sleep(0)
+        dispatcher.close()
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        assert dispatcher.snapshot()["pending"] == 0
+        assert dispatcher.snapshot()["lanes"] == 0
+        # Все места очереди снова свободны: чтение не блокируется
+        bus._listeners.clear()
+        bus._dispatch_table.clear()
+        for n in range(3):
+            await asyncio.wait_for(dispatcher.submit(_frame("gameAction", 1, n)), timeout=1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,129 @@
+import math
+from typing import List, Tuple
+
+import pytest
+
+from oraclehlb.ai.conventions import search_candidates
+from oraclehlb.ai.endgame import EndgameSolver
+from oraclehlb.game.clues import engine_table
+from oraclehlb.game.engine import GameEngine, MAX_STRIKES, RANK_COPIES
+from oraclehlb.game.moves import PLAY, DISCARD
+
+from test_engine import random_game
+
+
+def _endgame(seed: int, num_players: int, deck_left: int) -> Tuple[GameEngine, List[Tuple[int, int]]]:
+    """
+    Позиция партии, когда в колоде осталось `deck_left` карт, с известными всеми картами,
+    и оставшаяся колода в порядке решателя (добор с конца списка).
+    """
+    table = random_game(num_players=num_players, seed=seed)
+    engine = GameEngine(num_players=num_players, our_player_index=0, player_names=table.players)
+    for action in table.actions:
+        engine.apply(action)
+        if action["type"] == "turn" and engine.deck_size <= deck_left:
+            break
+    return engine, list(reversed(table.deck[engine.next_order:]))
+
+
+def _prepared(engine: GameEngine, deck) -> Tuple[EndgameSolver, GameEngine]:
+    solver = EndgameSolver(time_limit=math.inf)
+    solver._clues = engine_table(engine)
+    solver._copies = list(RANK_COPIES) * engine.num_suits
+    solver._deck = deck
+    solver._deadline = math.inf
+    return solver, engine.copy(track_undo=True, with_knowledge=False)
+
+
+def _exhaustive(solver: EndgameSolver, engine: GameEngine) -> int:
+    """Те же ходы, что у решателя, но полный перебор без таблицы транспозиций и отсечений."""
+    if engine.is_finished():
+        return 0 if engine.strikes >= MAX_STRIKES else engine.score
+    player = engine.current_player
+    best = -1
+    for kind, target, clue_type, clue_value, touched in solver._steps(engine, player):
+        mark = len(engine._undo)
+        if kind == PLAY:
+            engine.play(player, target, engine.card_suit[target], engine.card_rank[target])
+            solver._draw(engine, player)
+        elif kind == DISCARD:
+            engine.discard(player, target, engine.card_suit[target], engine.card_rank[target])
+            solver._draw(engine, player)
+        else:
+            engine.clue(player, target, clue_type, clue_value, touched)
+        engine.set_turn(engine.turn + 1, (player + 1) % engine.num_players)
+        best = max(best, _exhaustive(solver, engine))
+        while len(engine._undo) > mark:
+            engine.undo()
+    return best if best >= 0 else engine.score
+
+
+# (seed, игроков, карт в колоде): позиции, где перебору есть что считать, а полный перебор занимает доли секунды
+POSITIONS = [(0, 3, 2), (1, 3, 2), (2, 2, 4), (2, 3, 3), (2, 4, 2), (3, 2, 3)]
+
+
+@pytest.mark.parametrize("seed,num_players,deck_left", POSITIONS)
+def test_search_with_table_matches_exhaustive_search(seed, num_players, deck_left):
+    engine, deck = _endgame(seed, num_players, deck_left)
+    solver, world = _prepared(engine, deck)
+    expected = _exhaustive(solver, world)
+
+    assert solver._value(world, -1) == expected
+    # Повторный поиск отвечает из таблицы тем же значением
+    solver.lookups = solver.hits = 0
+    assert solver._value(world, -1) == expected
+    assert solver.hits == solver.lookups == 1
+    assert solver._key(world) == solver._key(engine.copy())  # перебор вернул движок в исходное состояние
+
+
+@pytest.mark.parametrize("seed,num_players,deck_left", POSITIONS)
+def test_bounds_stored_for_high_alpha_do_not_corrupt_exact_values(seed, num_players, deck_left):
+    engine, deck = _endgame(seed, num_players, deck_left)
+    solver, world = _prepared(engine, deck)
+    expected = _exhaustive(solver, world)
+
+    # Сначала узкие окна: в таблицу попадают верхние оценки, а не точные значения
+    for alpha in range(world.max_score, -2, -1):
+        value = solver._value(world, alpha)
+        if expected > alpha:
+            assert value == expected
+        else:
+            assert expected <= value <= alpha
+    assert solver._value(world, -1) == expected
+
+
+def test_transposition_table_is_bounded():
+    engine, deck = _endgame(seed=0, num_players=3, deck_left=2)
+    solver, world = _prepared(engine, deck)
+    expected = _exhaustive(solver, world)
+    solver.max_entries = 50
+    assert solver._value(world, -1) == expected
+    assert len(solver._table) == 50
+
+
+def test_solve_picks_the_best_move_when_everything_is_known():
+    engine, _ = _endgame(seed=2, num_players=2, deck_left=0)
+    player = engine.current_player
+    solver = EndgameSolver(time_limit=5.0, seed=0)
+    move = solver.solve(engine, player)
+    assert solver.last_stats["determinizations"] == 1
+
+    reference, world = _prepared(engine, [])
+    values = {candidate: reference._root_value(world, player, candidate)
+              for candidate in search_candidates(engine, player)}
+    assert values[move] == max(values.values())
+
+
+def test_transposition_table_is_kept_per_variant():
+    engine, _ = _endgame(seed=2, num_players=2, deck_left=0)
+    player = engine.current_player
+    solver = EndgameSolver(time_limit=5.0, seed=0)
+    solver.solve(engine, player)
+    solver._table[("stale",)] = (0, True)
+
+    solver.solve(engine, player)
+    assert ("stale",) in solver._table
+    # Те же карты, но другие правила подсказок: значения прошлой партии неверны
+    engine.variant = "Rainbow (5 Suits)"
+    solver.solve(engine, player)
+    assert ("stale",) not in solver._table
@@ -0,0 +1,114 @@
+import copy
+import pickle
+import random
+
+from oraclehlb.bench.fake_server import FakeTable, MAX_CLUE_TOKENS
+from oraclehlb.game.clues import standard_table
+from oraclehlb.game.engine import GameEngine
+
+
+def random_game(num_players: int = 3, seed: int = 0) -> FakeTable:
+    """
+    Партия до конца со случайными допустимыми ходами. Игрок подглядывает в свою руку и чаще играет
+    играбельные карты; ошибки в игре допускаются, пока страйков меньше двух.
+    """
+    rng = random.Random(seed)
+    table = FakeTable(0, [f"p{i}" for i in range(num_players)], seed)
+    table.deal()
+    table.start()
+    while not table.finished:
+        seat = table.current_player
+        hand = table.hands[seat]
+        roll = rng.random()
+        target = (seat + 1) % num_players
+        playable = [order for order in hand if table.stacks[table.cards[order][0]] + 1 == table.cards[order][1]]
+        if playable and roll < 0.6:
+            table.apply_client_action(seat, {"type": 0, "target": rng.choice(playable)})
+        elif roll < 0.8 and table.clue_tokens > 0 and table.hands[target]:
+            value = table.cards[rng.choice(table.hands[target])][1]
+            table.apply_client_action(seat, {"type": 3, "target": target, "value": value})
+        elif roll < 0.9 and table.strikes < 2:
+            table.apply_client_action(seat, {"type": 0, "target": rng.choice(hand)})
+        elif table.clue_tokens < MAX_CLUE_TOKENS:
+            table.apply_client_action(seat, {"type": 1, "target": hand[0]})
+        else:
+            table.apply_client_action(seat, {"type": 3, "target": target, "value": table.cards[table.hands[target][0]][1]})
+    return table
+
+
+def _engine(table: FakeTable, seat: int, track_undo: bool = False, knowledge: bool = True) -> GameEngine:
+    engine = GameEngine(
+        num_players=len(table.players), our_player_index=seat, player_names=table.players, track_undo=track_undo,
+    )
+    if knowledge:
+        engine.knowledge = standard_table(5).knowledge(engine.num_players)
+    return engine
+
+
+def _state(engine: GameEngine):
+    """Значения слотов движка (со знанием) для сравнения; списки копируются."""
+    state = dict(zip(GameEngine.__slots__, copy.deepcopy(engine.__getstate__())))
+    knowledge = state.pop("knowledge")
+    return state, knowledge.__getstate__() if knowledge is not None else None
+
+
+def test_engine_follows_the_server_game():
+    for seed in range(5):
+        table = random_game(num_players=3 + seed % 3, seed=seed)
+        engine = _engine(table, seat=0)
+        engine.apply_all([table.visible_to(0, action) for action in table.actions])
+
+        assert engine.stacks == table.stacks
+        assert engine.score == table.score
+        assert engine.clue_tokens == table.clue_tokens
+        assert engine.strikes == table.strikes
+        assert engine.num_actions == len(table.actions)
+        for player, hand in enumerate(table.hands):
+            assert engine.hand(player) == hand
+        # Свои карты невидимы, чужие - известны
+        assert all(engine.card_suit[order] == -1 for order in engine.hand(0))
+        assert all(engine.identity(order) == table.cards[order] for order in engine.hand(1))
+        assert engine.game_over
+
+
+def test_undo_restores_every_earlier_state():
+    table = random_game(seed=3)
+    engine = _engine(table, seat=1, track_undo=True, knowledge=False)
+    states = [_state(engine)]
+    for action in table.actions:
+        engine.apply(table.visible_to(1, action))
+        states.append(_state(engine))
+
+    for expected in reversed(states[:-1]):
+        engine.undo()
+        assert _state(engine) == expected
+
+
+def test_pickled_engine_continues_like_the_original():
+    table = random_game(seed=7)
+    actions = [table.visible_to(2, action) for action in table.actions]
+    middle = len(actions) // 2
+    engine = _engine(table, seat=2)
+    engine.apply_all(actions[:middle])
+
+    restored = pickle.loads(pickle.dumps(engine, protocol=pickle.HIGHEST_PROTOCOL))
+    assert _state(restored) == _state(engine)
+    assert restored.card_suit is not engine.card_suit
+
+    restored.apply_all(actions[middle:])
+    engine.apply_all(actions[middle:])
+    assert _state(restored) == _state(engine)
+
+
+def test_copy_is_independent_of_the_original():
+    table = random_game(seed=11)
+    actions = [table.visible_to(0, action) for action in table.actions]
+    engine = _engine(table, seat=0)
+    engine.apply_all(actions[:40])
+    before = _state(engine)
+
+    other = engine.copy()
+    other.apply_all(actions[40:])
+    assert _state(engine) == before
+    other.undo()  # копия ведёт свою историю отката
+    assert other.num_actions == len(actions) - 1
@@ -0,0 +1,67 @@
+import asyncio
+from dataclasses import dataclass
+
+from oraclehlb.core.event_bus import Event, EventBus, RawMessageReceived
+
+
+@dataclass
+class Base(Event):
+    value: int
+
+
+@dataclass
+class Derived(Base):
+    pass
+
+
+def test_subscribers_of_a_base_class_receive_subclasses():
+    async def scenario():
+        bus = EventBus()
+        seen = []
+
+        async def on_base(event: Base):
+            seen.append(("base", event.value))
+
+        async def on_derived(event: Derived):
+            seen.append(("derived", event.value))
+
+        bus.subscribe(Base, on_base)
+        await bus.publish(Derived(1))  # один слушатель - быстрый путь
+        bus.subscribe(Derived, on_derived)
+        await bus.publish(Derived(2))
+        await bus.publish(Base(3))
+        await bus.publish(RawMessageReceived("nobody listens"))
+        assert sorted(seen) == [("base", 1), ("base", 2), ("base", 3), ("derived", 2)]
+
+    asyncio.run(scenario())
+
+
+def test_subscribing_later_resets_the_dispatch_table():
+    bus = EventBus()
+
+    async def listener(event: Event):
+        pass
+
+    assert not bus.has_listeners(Derived)
+    bus.subscribe(Base, listener)
+    assert bus.listeners_for(Derived) == (listener,)
+
+
+def test_failing_listener_does_not_stop_the_others():
+    async def scenario():
+        bus = EventBus()
+        seen = []
+
+        async def broken(event: Base):
+            raise RuntimeError("boom")
+
+        async def working(event: Base):
+            seen.append(event.value)
+
+        bus.subscribe(Base, broken)
+        await bus.publish(Base(1))  # ошибка единственного слушателя только логируется
+        bus.subscribe(Base, working)
+        await bus.publish(Base(2))
+        assert seen == [2]
+
+    asyncio.run(scenario())
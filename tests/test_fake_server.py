@@ -0,0 +1,53 @@
+import pytest
+
+from oraclehlb.bench.fake_server import FakeTable, InvalidAction, MAX_CLUE_TOKENS
+
+
+def _started_table() -> FakeTable:
+    table = FakeTable(1, ["alice", "bob"], seed=3)
+    table.deal()
+    table.start()
+    return table
+
+
+@pytest.mark.parametrize("payload", [
+    {"type": "play", "target": 0},
+    {"type": "clueRank", "target": 1, "value": 1},
+    {"type": True, "target": 0},
+    {"type": 7, "target": 0},
+    {"type": 0},
+    {"type": 0, "target": "0"},
+    {"type": 0, "target": 9},  # карта партнёра
+    {"type": 1, "target": 0},  # сброс при 8 подсказках
+    {"type": 3, "target": 0, "value": 1},  # подсказка себе
+    {"type": 3, "target": 1},
+])
+def test_invalid_actions_are_rejected_without_changing_the_table(payload):
+    table = _started_table()
+    actions = list(table.actions)
+    with pytest.raises(InvalidAction):
+        table.apply_client_action(0, payload)
+    assert table.actions == actions
+    assert table.current_player == 0 and table.turn == 0
+    assert table.clue_tokens == MAX_CLUE_TOKENS
+    assert table.invalid_actions == 1
+
+
+def test_actions_out_of_turn_and_untouching_clues_are_rejected():
+    table = _started_table()
+    with pytest.raises(InvalidAction):
+        table.apply_client_action(1, {"type": 0, "target": 5})
+    ranks = {table.cards[order][1] for order in table.hands[1]}
+    missing = next(rank for rank in range(1, 6) if rank not in ranks)
+    with pytest.raises(InvalidAction):
+        table.apply_client_action(0, {"type": 3, "target": 1, "value": missing})
+
+
+def test_numeric_actions_are_applied():
+    table = _started_table()
+    rank = table.cards[table.hands[1][0]][1]
+    table.apply_client_action(0, {"type": 3, "target": 1, "value": rank})
+    assert table.clue_tokens == MAX_CLUE_TOKENS - 1
+    table.apply_client_action(1, {"type": 1, "target": table.hands[1][0]})
+    assert table.clue_tokens == MAX_CLUE_TOKENS
+    assert table.turn == 2 and table.invalid_actions == 0
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import oraclehlb
+
+SRC = Path(oraclehlb.__file__).resolve().parent.parent
+
+# Модули, которые импортируют инструменты без config.toml: симулятор, бенчмарки, тесты, воркеры пула решений
+MODULES = [
+    "oraclehlb.main", "oraclehlb.core.bot_manager", "oraclehlb.core.shards", "oraclehlb.core.bot",
+    "oraclehlb.core.decision_pool", "oraclehlb.core.ponder", "oraclehlb.core.profiler", "oraclehlb.core.metrics",
+    "oraclehlb.core.reconnect", "oraclehlb.services.recorder", "oraclehlb.services.state", "oraclehlb.sim.runner",
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_imports_without_config_toml(module, tmp_path):
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"], cwd=tmp_path, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
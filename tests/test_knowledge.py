@@ -0,0 +1,103 @@
+import pickle
+
+from oraclehlb.game.clues import ClueTable, clue_table, standard_table
+from oraclehlb.game.engine import GameEngine, COLOR_CLUE, RANK_CLUE, card_id
+from oraclehlb.game.knowledge import Knowledge, identities, rank_mask, suit_mask
+from oraclehlb.game.moves import COLOR, RANK
+from oraclehlb.game.variants import get_variant
+
+from test_engine import random_game
+
+
+def test_masks_and_identities():
+    assert identities(suit_mask(1)) == [(1, rank) for rank in range(1, 6)]
+    assert identities(rank_mask(3, 4)) == [(suit, 3) for suit in range(4)]
+    assert identities(suit_mask(2) & rank_mask(5, 5)) == [(2, 5)]
+    assert identities(0) == []
+
+
+def test_clue_narrows_touched_and_untouched_cards():
+    knowledge = Knowledge(num_players=2)
+    hand = [0, 1, 2]
+    for order in hand:
+        knowledge.draw(0, order, -1, -1)
+    knowledge.clue(RANK_CLUE, 2, hand, touched=[1])
+    assert knowledge.possibilities(1, 0) == rank_mask(2, 5)
+    assert knowledge.possibilities(0, 0) == knowledge.full_mask & ~rank_mask(2, 5)
+
+    knowledge.clue(COLOR_CLUE, 3, hand, touched=[1, 2])
+    assert knowledge.candidates(1, 0) == [(3, 2)]
+    assert knowledge.possibilities(2, 0) == suit_mask(3) & ~rank_mask(2, 5)
+
+
+def test_exhausted_identities_are_excluded_for_players_who_see_every_copy():
+    knowledge = Knowledge(num_players=2)
+    red_five, blue_five = card_id(0, 5), card_id(3, 5)
+    knowledge.draw(0, 0, -1, -1)
+    knowledge.draw(1, 1, 3, 5)  # синяя пятёрка у игрока 1: её видит только игрок 0
+    knowledge.draw(1, 2, 0, 5)
+    knowledge.reveal(1, 2, 0, 5)  # красная пятёрка сброшена: её видят все
+
+    assert not knowledge.possibilities(0, 0) >> red_five & 1
+    assert not knowledge.possibilities(0, 0) >> blue_five & 1
+    assert knowledge.possibilities(1, 1) >> blue_five & 1
+    assert knowledge.visible_count(blue_five, 0) == 1 and knowledge.visible_count(blue_five, 1) == 0
+
+
+def test_possibilities_always_contain_the_real_card():
+    for seed in range(4):
+        table = random_game(num_players=2 + seed, seed=seed)
+        for seat in range(len(table.players)):
+            engine = GameEngine(num_players=len(table.players), our_player_index=seat, player_names=table.players)
+            engine.knowledge = standard_table(5).knowledge(engine.num_players)
+            for action in table.actions:
+                engine.apply(table.visible_to(seat, action))
+                for player in range(engine.num_players):
+                    for order in engine.hand(player):
+                        suit, rank = table.cards[order]
+                        assert engine.knowledge.possibilities(order, player) >> card_id(suit, rank) & 1
+
+
+def test_knowledge_copy_and_pickle_are_independent():
+    knowledge = standard_table(5).knowledge(3)
+    knowledge.draw(1, 0, 2, 4)
+    other = knowledge.copy()
+    other.reveal(1, 0, 2, 4)
+    assert knowledge.public[card_id(2, 4)] == 0 and other.public[card_id(2, 4)] == 1
+    assert knowledge.held[1][card_id(2, 4)] == 1 and other.held[1][card_id(2, 4)] == 0
+    assert pickle.loads(pickle.dumps(other)).__getstate__() == other.__getstate__()
+
+
+def test_clue_table_of_a_plain_variant_matches_suit_and_rank_masks():
+    table = standard_table(5)
+    for suit in range(5):
+        assert table.clue_mask(COLOR, suit) == suit_mask(suit)
+    for rank in range(1, 6):
+        assert table.clue_mask(RANK, rank) == rank_mask(rank, 5)
+    assert table.touches(COLOR, 1, 1, 3) and not table.touches(COLOR, 1, 2, 3)
+    assert not table.touches(RANK, 3, -1, -1)
+
+
+def test_rainbow_suit_is_touched_by_every_color():
+    variant = get_variant("Rainbow (6 Suits)")
+    table = clue_table(variant)
+    rainbow = variant.num_suits - 1
+    for color in range(len(variant.clue_colors)):
+        assert table.clue_mask(COLOR, color) == suit_mask(color) | suit_mask(rainbow)
+    knowledge = table.knowledge(2)
+    assert knowledge.num_suits == 6 and len(knowledge.copies) == 30
+
+
+def test_clue_options_are_memoized():
+    table = ClueTable(get_variant("No Variant"))
+    idents = (card_id(0, 1), card_id(1, 1), card_id(0, 3), -1)
+    masks = (table.full_mask,) * 4
+    first = table.options(idents, masks, 0)
+    assert table.options(idents, masks, 0) is first
+    assert (table.hits, table.misses) == (1, 1)
+
+    red = next(option for option in first if option.kind == COLOR and option.value == 0)
+    assert red.touched == 0b0101 and red.new == 0b0101
+    ones = next(option for option in first if option.kind == RANK and option.value == 1)
+    assert ones.touched == 0b0011
+    assert ones.masks[0] == ones.masks[1] == rank_mask(1, 5)
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+from oraclehlb.core.event_bus import ConnectionStateChanged, EventBus, RawMessageReceived
+from oraclehlb.core.global_bus import global_event_bus, LobbyTableChanged, LobbyTableRemoved
+from oraclehlb.services.lobby import LobbyClient, LobbyIndex, SharedLobby
+from oraclehlb.services.parser import ProtocolParser
+
+
+def _table(table_id: int, *players: str) -> dict:
+    return {"id": table_id, "name": f"t{table_id}", "players": list(players)}
+
+
+def test_index_tracks_tables_by_player():
+    index = LobbyIndex()
+    index.replace_tables([_table(1, "alice", "bob"), _table(2, "bob")])
+    assert sorted(table["id"] for table in index.tables_with_player("bob")) == [1, 2]
+
+    index.put_table(_table(1, "carol"))  # стол обновился: алиса и боб его покинули
+    assert index.tables_with_player("alice") == []
+    assert [table["id"] for table in index.tables_with_player("carol")] == [1]
+    assert index.remove_table(2) and not index.remove_table(2)
+    assert index.tables_with_player("bob") == []
+
+
+class _Bot:
+    def __init__(self, username: str, lobby: SharedLobby):
+        self.bus = EventBus()
+        self.client = LobbyClient(username, lobby, self.bus, ProtocolParser(self.bus))
+
+    async def send(self, command: str, payload):
+        await self.bus.publish(RawMessageReceived(message=f"{command} {json.dumps(payload)}"))
+
+    async def connected(self, connected: bool):
+        await self.bus.publish(ConnectionStateChanged(connected=connected))
+
+
+@pytest.fixture
+def lobby_events():
+    """Изменения столов, опубликованные в `global_event_bus` за время теста."""
+    events = []
+
+    async def on_change(event):
+        events.append(event)
+
+    global_event_bus.subscribe(LobbyTableChanged, on_change)
+    global_event_bus.subscribe(LobbyTableRemoved, on_change)
+    yield events
+    for event_type in (LobbyTableChanged, LobbyTableRemoved):
+        global_event_bus._listeners[event_type].remove(on_change)
+    global_event_bus._dispatch_table.clear()
+
+
+def test_only_the_leader_parses_the_lobby_and_leadership_moves_on_disconnect(lobby_events):
+    async def scenario():
+        lobby = SharedLobby()
+        alice, bob = _Bot("alice", lobby), _Bot("bob", lobby)
+        await alice.connected(True)
+        await bob.connected(True)
+        assert lobby.leader == "alice"
+
+        # Сервер шлёт лобби в оба подключения, изменения публикуются один раз
+        for bot in (alice, bob):
+            await bot.send("tableList", [_table(1, "alice")])
+        assert len(lobby_events) == 1
+
+        await alice.connected(False)
+        assert lobby.leader == "bob"
+        await alice.send("table", _table(2, "x"))  # отключённый бывший лидер больше не разбирает
+        await bob.send("table", _table(3, "bob"))
+        await bob.send("tableGone", {"tableID": 1})
+        assert sorted(lobby.index.tables) == [3]
+        assert [type(event) for event in lobby_events] == [LobbyTableChanged] * 2 + [LobbyTableRemoved]
+
+    asyncio.run(scenario())
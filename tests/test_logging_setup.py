@@ -0,0 +1,62 @@
+import json
+import logging
+import pickle
+import queue
+
+import pytest
+
+from oraclehlb.config import Settings
+from oraclehlb.logging_setup import ShardQueueHandler, current_bot, current_table, setup_logging
+
+
+@pytest.fixture
+def root_logger():
+    """`setup_logging` заменяет обработчики корневого логгера: после теста они возвращаются."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_log_file_carries_context_arguments_and_tracebacks(tmp_path, root_logger):
+    path = tmp_path / "logs" / "bot.log"
+    settings = Settings.model_construct(log_file=str(path), log_json=True, log_level="CRITICAL")
+    listener = setup_logging(settings)
+    log = logging.getLogger("oraclehlb.test")
+    bot_token, table_token = current_bot.set("alice"), current_table.set(7)
+    try:
+        payload = {"n": 1}
+        log.info("payload %s", payload)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed")
+    finally:
+        current_bot.reset(bot_token)
+        current_table.reset(table_token)
+        listener.stop()
+
+    first, second = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert first["message"] == "payload {'n': 1}"
+    assert (first["bot"], first["table"], first["logger"]) == ("alice", 7, "oraclehlb.test")
+    assert second["level"] == "ERROR" and "ValueError: boom" in second["exc"]
+
+
+def test_shard_records_are_picklable_and_keep_the_traceback_text():
+    log_queue = queue.SimpleQueue()
+    handler = ShardQueueHandler(log_queue)
+    try:
+        raise KeyError("missing")
+    except KeyError as error:
+        record = logging.LogRecord("oraclehlb.test", logging.ERROR, __file__, 1, "lost %s", ("it",), (KeyError, error, None))
+    record.socket = object()  # поле из `extra` библиотеки, которое не сериализуется
+    handler.emit(record)
+
+    sent = pickle.loads(pickle.dumps(log_queue.get_nowait()))
+    assert sent.getMessage() == "lost it"
+    assert "KeyError" in sent.exc_text and sent.exc_info is None
+    assert not hasattr(sent, "socket")
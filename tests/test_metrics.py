@@ -0,0 +1,46 @@
+from oraclehlb.core.metrics import Histogram, MetricsRegistry
+
+
+def test_disabled_registry_hands_out_shared_no_op_instruments():
+    registry = MetricsRegistry()
+    counter = registry.counter("oraclehlb_x_total")
+    counter.inc()
+    registry.histogram("oraclehlb_y_seconds").observe(1.0)
+    registry.add_collector("oraclehlb_z", lambda: {"size": 1})
+    assert counter is registry.counter("oraclehlb_other_total") and counter.value == 0
+    assert registry.render() == "\n"
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005,) * 98 + (0.05, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [98, 1, 0, 1]
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.99) == 0.1
+    assert histogram.quantile(1.0) == histogram.max == 3.0
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_prometheus_exposition_with_labels_and_collectors():
+    registry = MetricsRegistry(enabled=True)
+    registry.counter("oraclehlb_frames_total", "Frames", bot="alice").inc(2)
+    assert registry.counter("oraclehlb_frames_total", bot="alice").value == 2
+    registry.histogram("oraclehlb_decide_seconds", "Decisions", buckets=(0.1, 1.0)).observe(0.5)
+    registry.add_collector("oraclehlb_outbox", lambda: {"queued": 3, "paused": True, "name": "x"}, bot="alice")
+    registry.add_collector("oraclehlb_broken", lambda: 1 / 0)
+
+    lines = registry.render().splitlines()
+    assert lines[:3] == ["# HELP oraclehlb_frames_total Frames", "# TYPE oraclehlb_frames_total counter",
+                         'oraclehlb_frames_total{bot="alice"} 2']
+    assert 'oraclehlb_decide_seconds_bucket{le="0.1"} 0' in lines
+    assert 'oraclehlb_decide_seconds_bucket{le="1.0"} 1' in lines
+    assert 'oraclehlb_decide_seconds_bucket{le="+Inf"} 1' in lines
+    assert "oraclehlb_decide_seconds_count 1" in lines
+    # Булевы и строковые поля сборщика не выгружаются, упавший сборщик пропускается
+    assert [line for line in lines if line.startswith("oraclehlb_outbox")] == ['oraclehlb_outbox_queued{bot="alice"} 3']
+
+    registry.add_collector("oraclehlb_outbox", lambda: {"queued": 5}, bot="alice")  # бот пересоздан
+    assert 'oraclehlb_outbox_queued{bot="alice"} 5' in registry.render()
+    registry.remove_collector("oraclehlb_outbox", bot="alice")
+    assert "oraclehlb_outbox" not in registry.summary()
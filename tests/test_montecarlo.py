@@ -0,0 +1,64 @@
+import asyncio
+import random
+
+import pytest
+
+from oraclehlb.ai.determinize import SamplingError, determinize, unseen_pool
+from oraclehlb.ai.montecarlostrategy import MonteCarloStrategy
+from oraclehlb.bench.fake_server import FakeTable
+from oraclehlb.game.clues import standard_table
+from oraclehlb.game.engine import GameEngine, NUM_RANKS
+from oraclehlb.game.moves import PLAY, legal_moves, move_to_payload
+
+
+def _first_turn(num_players: int = 3, seed: int = 0) -> GameEngine:
+    table = FakeTable(0, [f"p{i}" for i in range(num_players)], seed)
+    table.deal()
+    table.start()
+    engine = GameEngine(num_players=num_players, our_player_index=0, player_names=table.players)
+    engine.knowledge = standard_table(5).knowledge(num_players)
+    engine.apply_all([table.visible_to(0, action) for action in table.actions])
+    return engine
+
+
+def test_determinization_fills_our_hand_and_the_deck_from_unseen_cards():
+    engine = _first_turn()
+    pool = unseen_pool(engine, 0)
+    root, deck = determinize(engine, 0, random.Random(1))
+    assert len(deck) == engine.deck_size
+    assert all(root.card_suit[order] >= 0 for order in root.hand(0))
+    # Исходный движок не тронут, а сэмплированные карты не превышают числа невидимых копий
+    assert all(engine.card_suit[order] == -1 for order in engine.hand(0))
+    used = [0] * len(pool)
+    for suit, rank in deck + [root.identity(order) for order in root.hand(0)]:
+        used[suit * NUM_RANKS + rank - 1] += 1
+    assert all(count <= available for count, available in zip(used, pool))
+
+
+def test_no_finished_rollout_sends_the_fallback_action():
+    strategy = MonteCarloStrategy(time_budget=0.0, seed=1)
+    state = _first_turn().to_model()
+    action = asyncio.run(strategy.decide_action(state))
+    assert action == strategy.fallback_action(state)
+    assert action["type"] != PLAY
+    assert strategy.last_stats["rollouts"] == 0
+
+
+def test_search_with_budget_returns_a_searched_move():
+    strategy = MonteCarloStrategy(time_budget=0.2, seed=1)
+    engine = _first_turn()
+    action = asyncio.run(strategy.decide_action(engine.to_model()))
+    assert strategy.last_stats["rollouts"] > 0
+    assert action in [move_to_payload(move) for move in legal_moves(engine, 0)]
+
+
+def test_unsampleable_hand_sends_the_fallback_action():
+    engine = _first_turn()
+    # Знание разошлось с партией: все копии всех карт будто бы уже сброшены
+    engine.discards = list(engine.knowledge.copies)
+    with pytest.raises(SamplingError):
+        determinize(engine, 0, random.Random(1))
+
+    strategy = MonteCarloStrategy(time_budget=1.0, seed=1)
+    state = engine.to_model()
+    assert asyncio.run(strategy.decide_action(state)) == strategy.fallback_action(state)
@@ -0,0 +1,62 @@
+import json
+
+from oraclehlb.ai.simplestrategy import SimpleStrategy
+from oraclehlb.game.moves import (
+    PLAY, DISCARD, COLOR, RANK, apply_move, legal_moves, move_to_payload, next_turn, payload_to_move,
+)
+from oraclehlb.models import GameState, Card
+
+from test_montecarlo import _first_turn
+
+
+def test_legal_moves_and_payloads_round_trip():
+    engine = _first_turn()
+    moves = legal_moves(engine, 1)
+    # Полный запас подсказок: сброс запрещён, подсказки только тем, чьи карты видны
+    assert {move for move in moves if move[0] == PLAY} == {(PLAY, order, 0) for order in engine.hand(1)}
+    assert not any(move[0] == DISCARD for move in moves)
+    assert {move[1] for move in moves if move[0] in (COLOR, RANK)} == {2}
+    for move in moves:
+        assert payload_to_move(move_to_payload(move)) == move
+
+
+def test_apply_move_draws_a_replacement_card():
+    engine = _first_turn()
+    world = engine.copy(track_undo=False)
+    deck = [(0, 1), (1, 1)]
+    played = world.hand(1)[0]
+    apply_move(world, 1, (PLAY, played, 0), deck)
+    next_turn(world)
+    assert len(world.hand(1)) == len(engine.hand(1)) and played not in world.hand(1)
+    assert world.identity(world.hand(1)[-1]) == (1, 1) and deck == [(0, 1)]
+    assert world.current_player == (engine.current_player + 1) % world.num_players
+    assert engine.hand(1)[0] == played
+
+
+def test_move_payloads_use_hanablive_action_numbers():
+    # Команда `action` hanab.live: 0 - play, 1 - discard, 2 - подсказка цветом, 3 - рангом
+    assert move_to_payload((PLAY, 7, 0)) == {"type": 0, "target": 7}
+    assert move_to_payload((DISCARD, 3, 0)) == {"type": 1, "target": 3}
+    assert move_to_payload((COLOR, 1, 4)) == {"type": 2, "target": 1, "value": 4}
+    assert move_to_payload((RANK, 2, 5)) == {"type": 3, "target": 2, "value": 5}
+    for move in ((PLAY, 7, 0), (DISCARD, 3, 0), (COLOR, 1, 4), (RANK, 2, 5)):
+        payload = json.loads(json.dumps(move_to_payload(move)))
+        assert type(payload["type"]) is int
+        assert payload_to_move(payload) == move
+
+
+def test_payload_to_move_rejects_string_types():
+    assert payload_to_move({"type": "play", "target": 7}) is None
+    assert payload_to_move({"type": 9, "target": 7}) is None
+
+
+def test_fallback_action_uses_hanablive_action_numbers():
+    strategy = SimpleStrategy()
+    hand = [Card(order=order, suit_index=-1, rank=-1) for order in range(5)]
+    partner = [Card(order=order, suit_index=0, rank=2) for order in range(5, 10)]
+    state = GameState(table_id=1, player_names=["a", "b"], our_player_index=0, hands={0: hand, 1: partner})
+
+    state.clue_tokens = 4
+    assert json.loads(json.dumps(strategy.fallback_action(state))) == {"type": 1, "target": 0}
+    state.clue_tokens = 8
+    assert json.loads(json.dumps(strategy.fallback_action(state))) == {"type": 3, "target": 1, "value": 2}
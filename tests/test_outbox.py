@@ -0,0 +1,94 @@
+import asyncio
+import json
+from typing import List
+
+from oraclehlb.services.outbox import Outbox
+
+
+def _drain(outbox: Outbox) -> List[str]:
+    async def drain():
+        messages = []
+        while len(outbox):
+            item = await outbox.get()
+            outbox.mark_sent(item)
+            messages.append(item.message)
+        return messages
+
+    return asyncio.run(drain())
+
+
+def _action(table_id: int, target: int) -> dict:
+    return {"tableID": table_id, "type": 1, "target": target}
+
+
+def test_actions_go_before_requests_and_chat():
+    outbox = Outbox()
+    outbox.put("chat", {"msg": "hi"})
+    outbox.put("getGameInfo2", {"tableID": 1})
+    outbox.put("action", _action(1, 3), turn=0)
+    assert [message.split(" ")[0] for message in _drain(outbox)] == ["action", "getGameInfo2", "chat"]
+
+
+def test_full_queue_evicts_chat_and_never_drops_actions():
+    outbox = Outbox(max_size=2)
+    outbox.put("chat", {"msg": "first"})
+    outbox.put("getGameInfo2", {"tableID": 1})
+    assert outbox.put("getGameInfo2", {"tableID": 2})  # вытесняет чат
+    assert not outbox.put("chat", {"msg": "second"})
+    assert outbox.put("action", _action(1, 3), turn=0)
+    assert len(outbox) == 3
+    assert outbox.stats.dropped == 2
+
+
+def test_newer_action_for_a_table_replaces_the_queued_one():
+    outbox = Outbox()
+    outbox.put("action", _action(1, 3), turn=4)
+    outbox.put("action", _action(1, 5), turn=4)
+    outbox.put("action", _action(2, 7), turn=4)
+    messages = _drain(outbox)
+    assert [json.loads(message.partition(" ")[2])["target"] for message in messages] == [5, 7]
+
+
+def test_queued_actions_wait_for_resync_after_disconnect():
+    outbox = Outbox()
+    outbox.put("action", _action(1, 3), turn=4)
+    outbox.put("action", _action(2, 7), turn=9)
+    outbox.put("chat", {"msg": "hi"})
+    outbox.disconnected()
+    # После переподключения сразу уйти нечему: ходы ждут gameActionList своих столов
+    assert len(outbox) == 0
+
+    assert outbox.release_parked(1, 4)
+    assert not outbox.release_parked(2, 10)  # партия ушла вперёд - ход устарел
+    assert [json.loads(message.partition(" ")[2])["tableID"] for message in _drain(outbox)] == [1]
+    assert not outbox.release_parked(2, 9)
+
+
+def test_actions_decided_before_resync_are_parked():
+    outbox = Outbox()
+    outbox.disconnected()
+    outbox.put("action", _action(1, 3), turn=4)
+    outbox.put("getGameInfo1", {"tableID": 1})
+    assert [message.split(" ")[0] for message in _drain(outbox)] == ["getGameInfo1"]
+
+    assert outbox.release_parked(1, 4)
+    assert len(outbox) == 1
+    # Стол пересинхронизирован: следующие ходы уходят сразу
+    _drain(outbox)
+    outbox.put("action", _action(1, 5), turn=6)
+    assert len(outbox) == 1
+
+
+def test_unsent_action_in_flight_is_parked_with_its_turn():
+    outbox = Outbox()
+    outbox.put("action", _action(1, 3), turn=4)
+
+    async def take():
+        return await outbox.get()
+
+    item = asyncio.run(take())
+    outbox.disconnected()
+    outbox.requeue(item)
+    assert len(outbox) == 0
+    assert not outbox.release_parked(1, 5)
+    assert len(outbox) == 0
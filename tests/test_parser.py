@@ -0,0 +1,81 @@
+import asyncio
+
+from oraclehlb.core.event_bus import CommandReceived, EventBus, RawMessageReceived
+from oraclehlb.services import codec
+from oraclehlb.services.parser import ProtocolParser
+from oraclehlb.services.protocol import GameActionPayload, InitPayload
+
+
+def _feed(bus: EventBus, *messages: str):
+    async def scenario():
+        for message in messages:
+            await bus.publish(RawMessageReceived(message=message))
+
+    asyncio.run(scenario())
+
+
+def _counting_decoder(monkeypatch):
+    decoded = []
+    loads = codec.loads
+
+    def counting(data):
+        decoded.append(data)
+        return loads(data)
+
+    monkeypatch.setattr(codec, "loads", counting)
+    return decoded
+
+
+def test_payload_is_converted_to_the_schema_by_wire_names():
+    bus = EventBus()
+    parser = ProtocolParser(bus)
+    received = []
+
+    async def on_init(payload: InitPayload):
+        received.append(payload)
+
+    parser.register("init", on_init, schema=InitPayload)
+    _feed(bus, 'init {"tableID": 5, "playerNames": ["a", "b"], "ourPlayerIndex": 1, "extra": true}')
+    (payload,) = received
+    assert (payload.table_id, payload.player_names, payload.our_player_index) == (5, ["a", "b"], 1)
+
+
+def test_malformed_frames_do_not_reach_the_handler():
+    bus = EventBus()
+    parser = ProtocolParser(bus)
+    received = []
+
+    async def on_action(payload):
+        received.append(payload)
+
+    parser.register("gameAction", on_action, schema=GameActionPayload)
+    _feed(bus, "gameAction {not json", 'gameAction {"action": {}}', 'gameAction {"tableID": 1, "action": {"type": "turn"}}')
+    assert [payload.table_id for payload in received] == [1]
+
+
+def test_frames_without_handler_or_rejected_by_prefilter_are_not_decoded(monkeypatch):
+    decoded = _counting_decoder(monkeypatch)
+    bus = EventBus()
+    parser = ProtocolParser(bus)
+    received = []
+
+    async def on_chat(payload):
+        received.append(payload)
+
+    parser.register("chat", on_chat, prefilter=lambda raw: '"recipient"' in raw)
+    _feed(bus, 'tableList [{"id": 1}]', 'chat {"msg": "lobby"}', 'chat {"msg": "hi", "recipient": "bot"}')
+    assert received == [{"msg": "hi", "recipient": "bot"}]
+    assert decoded == ['{"msg": "hi", "recipient": "bot"}']
+
+
+def test_unrouted_commands_go_to_command_listeners():
+    bus = EventBus()
+    ProtocolParser(bus)
+    commands = []
+
+    async def on_command(event: CommandReceived):
+        commands.append((event.command, event.payload))
+
+    bus.subscribe(CommandReceived, on_command)
+    _feed(bus, 'tableList [{"id": 1}]')
+    assert commands == [("tableList", [{"id": 1}])]
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from oraclehlb.ai.base import BaseStrategy
+from oraclehlb.ai.determinize import unseen_pool
+from oraclehlb.ai.montecarlostrategy import MonteCarloStrategy
+from oraclehlb.bench.fake_server import FakeTable
+from oraclehlb.core.decision_pool import DecisionPool
+from oraclehlb.core.ponder import Ponderer, predict_states
+from oraclehlb.core.strategy_loader import strategy_registry
+from oraclehlb.game.clues import standard_table
+from oraclehlb.game.engine import GameEngine
+
+
+class OldestCardStrategy(BaseStrategy):
+    def __init__(self):
+        self.calls = 0
+
+    async def decide_action(self, state):
+        self.calls += 1
+        return {"type": 1, "target": state.hands[state.our_player_index][0].order}
+
+
+def _before_our_turn(num_players: int = 3, seed: int = 0) -> GameEngine:
+    """Первый ход партии глазами игрока 1: сейчас ходит игрок прямо перед ним."""
+    table = FakeTable(0, [f"p{i}" for i in range(num_players)], seed)
+    table.deal()
+    table.start()
+    engine = GameEngine(num_players=num_players, our_player_index=1, player_names=table.players)
+    engine.knowledge = standard_table(5).knowledge(num_players)
+    engine.apply_all([table.visible_to(1, action) for action in table.actions])
+    return engine
+
+
+def test_predicted_states_lead_to_our_turn():
+    engine = _before_our_turn()
+    states = predict_states(engine, limit=8)
+    assert len(states) == 8
+    weights = [weight for weight, _ in states]
+    assert weights == sorted(weights, reverse=True)
+    assert sum(weights) <= 1.0 + 1e-9
+    for _, state in states:
+        assert state.current_player == engine.our_player_index
+        assert state.turn == engine.turn + 1
+    assert engine.num_actions == _before_our_turn().num_actions  # исходный движок не тронут
+
+
+def test_drawn_cards_come_from_the_unseen_pool():
+    engine = _before_our_turn()
+    pool = unseen_pool(engine, engine.our_player_index)
+    for _, state in predict_states(engine, limit=50):
+        mover_hand = state.hand(0)
+        suit, rank = state.card_suit[mover_hand[-1]], state.card_rank[mover_hand[-1]]
+        if mover_hand != engine.hand(0) and suit >= 0:
+            assert pool[suit * 5 + rank - 1] > 0
+
+
+def test_no_prediction_when_someone_else_moves_before_us():
+    engine = _before_our_turn()
+    engine.our_player_index = 2
+    assert predict_states(engine, limit=8) == []
+
+
+def test_pondering_uses_its_own_strategy_instance():
+    strategy = strategy_registry.create("MonteCarloStrategy", {"max_determinizations": 4, "seed": 1})
+    ponderer = Ponderer(strategy, DecisionPool(), "bot")
+    assert ponderer._strategy is not strategy
+    assert type(ponderer._strategy) is MonteCarloStrategy
+    assert ponderer._strategy.strategy_params == strategy.strategy_params
+    assert ponderer._strategy._rng is not strategy._rng
+
+
+@pytest.mark.parametrize("params", [{}, {"time_budget": 0.5}])
+def test_unregistered_strategy_is_cloned_with_its_params(params):
+    strategy = MonteCarloStrategy(**params)
+    strategy.strategy_params = params
+    clone = Ponderer(strategy, DecisionPool(), "bot")._strategy
+    assert clone is not strategy and clone.time_budget == strategy.time_budget
+
+
+def test_pondered_decision_is_taken_only_for_the_predicted_state():
+    async def scenario():
+        strategy = OldestCardStrategy()
+        ponderer = Ponderer(strategy, DecisionPool(), "bot", max_states=4)
+        engine = _before_our_turn()
+        [(_, predicted), *_] = predict_states(engine, limit=4)
+
+        ponderer.start(engine)
+        await asyncio.sleep(0.05)
+        assert ponderer._strategy.calls == 4
+        action = await ponderer.take(predicted.to_model())
+        assert action == {"type": 1, "target": predicted.hand(1)[0]}
+
+        # Обдуманное сбрасывается после нашего хода; без обдумывания решения нет
+        ponderer.start(engine)
+        await asyncio.sleep(0.05)
+        assert await ponderer.take(engine.to_model()) is None
+        assert await ponderer.take(predicted.to_model()) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+import pickle
+import time
+
+from oraclehlb.ai.simplestrategy import SimpleStrategy
+from oraclehlb.core.profiler import (
+    DecisionProfile, DecisionProfiler, PSTATS_FILE, STACKS_FILE, load_capture, load_pstats,
+)
+
+from test_montecarlo import _first_turn
+
+
+def _busy(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _decide(profiler: DecisionProfiler, username: str, seconds: float):
+    pending = profiler.begin(_first_turn().to_model())
+    with pending.profile:
+        _busy(seconds)
+    profiler.finish(pending, SimpleStrategy(), username, {"type": 1, "target": 0})
+    return pending
+
+
+def test_slow_decisions_are_captured_with_state_and_stacks(tmp_path):
+    profiler = DecisionProfiler(tmp_path, threshold=0.05, interval=0.002)
+    _decide(profiler, "fast", 0.0)
+    assert list(tmp_path.iterdir()) == []
+
+    pending = _decide(profiler, "slow", 0.1)
+    [directory] = tmp_path.iterdir()
+    capture = load_capture(directory)
+    assert capture["meta"]["reason"] == "slow" and capture["meta"]["strategy"] == "SimpleStrategy"
+    assert capture["meta"]["samples"] > 0
+    assert capture["state"].model_dump() == pending.state.model_dump()
+    assert "_busy" in (directory / STACKS_FILE).read_text(encoding="utf-8")
+    assert not (directory / PSTATS_FILE).exists()
+
+
+def test_sampled_decisions_carry_cprofile_stats(tmp_path):
+    profiler = DecisionProfiler(tmp_path, threshold=0.0, sample_rate=1.0)
+    _decide(profiler, "sampled", 0.01)
+    [directory] = tmp_path.iterdir()
+    stats = load_pstats((directory / PSTATS_FILE).read_bytes())
+    assert any(name == "_busy" for _, _, name in stats.stats)
+
+
+def test_only_the_newest_captures_are_kept(tmp_path):
+    profiler = DecisionProfiler(tmp_path, threshold=0.0, sample_rate=1.0, keep=2)
+    for username in ("first", "second", "third"):
+        _decide(profiler, username, 0.0)
+        time.sleep(0.01)
+    assert sorted(entry.name.split("-")[2] for entry in tmp_path.iterdir()) == ["second", "third"]
+
+
+def test_worker_profile_arrives_after_the_timed_out_move(tmp_path):
+    async def scenario():
+        profiler = DecisionProfiler(tmp_path, threshold=0.01, late_timeout=5.0)
+        pending = profiler.begin(_first_turn().to_model())
+        pending.profile.completion = asyncio.get_running_loop().create_future()
+        await asyncio.sleep(0.02)
+        profiler.finish(pending, SimpleStrategy(), "late", {"type": 1, "target": 0})
+        await asyncio.sleep(0)
+        assert list(tmp_path.iterdir()) == []
+
+        # Профиль из воркера приходит сериализованным и сливается в ожидающий
+        remote = DecisionProfile()
+        remote.stacks["decide (worker.py:1)"] = 7
+        pending.profile.update(pickle.loads(pickle.dumps(remote)))
+        pending.profile.completion.set_result(None)
+        await asyncio.gather(*profiler._late)
+        [directory] = tmp_path.iterdir()
+        capture = load_capture(directory)
+        assert capture["meta"]["samples"] == 7 and "worker_elapsed" in capture["meta"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+from oraclehlb.game.engine import GameEngine
+from oraclehlb.game.records import ACTION, GAME, RecordStore, RecordWriter, decode_action, encode_action
+
+from test_engine import _engine, random_game
+
+
+def _seat_view(seed: int, seat: int, num_players: int = 3):
+    table = random_game(num_players=num_players, seed=seed)
+    actions = [table.visible_to(seat, action) for action in table.actions]
+    engine = _engine(table, seat)
+    engine.table_id = 100 + seed
+    engine.apply_all(actions)
+    return engine, actions
+
+
+def _slots(engine: GameEngine):
+    """Слоты состояния партии; вариант и размер колоды восстанавливаются из каталога."""
+    skipped = ("knowledge", "_undo", "variant", "deck_total")
+    return [getattr(engine, name) for name in GameEngine.__slots__ if name not in skipped]
+
+
+def test_actions_round_trip_through_fixed_width_records():
+    _, actions = _seat_view(seed=1, seat=0)
+    for action in actions:
+        decoded = decode_action(ACTION.unpack(encode_action(action)))
+        expected = {key: value for key, value in action.items() if key in decoded}
+        assert decoded == expected
+
+
+def test_recorded_games_are_found_and_replay_to_the_same_state(tmp_path):
+    writer = RecordWriter(tmp_path)
+    played = []
+    for seed, strategy in ((0, "A"), (1, "B"), (2, "A")):
+        engine, actions = _seat_view(seed, seat=seed % 3)
+        writer.append(engine, actions, strategy=strategy, seed=f"s{seed}")
+        played.append((engine, actions))
+
+    with RecordStore(tmp_path) as store:
+        assert len(store) == 3
+        assert [record.seed for record in store.find(strategy="A")] == ["s0", "s2"]
+        best = max(engine.score for engine, _ in played)
+        assert {record.score for record in store.find(min_score=best)} == {best}
+        for record, (engine, actions) in zip(store.games, played):
+            assert record.players == engine.player_names and record.our_player_index == engine.our_player_index
+            assert _slots(store.replay(record)) == _slots(engine)
+            replayed = store.replay(record, with_knowledge=True)
+            assert replayed.knowledge.__getstate__() == engine.knowledge.__getstate__()
+            assert store.find(table_id=engine.table_id) == [record]
+
+
+def test_torn_write_is_invisible_and_cut_off_by_the_next_writer(tmp_path):
+    engine, actions = _seat_view(seed=3, seat=1)
+    RecordWriter(tmp_path).append(engine, actions, strategy="A")
+    # Процесс упал посреди следующей записи: действия дописаны, заголовок - наполовину
+    with open(tmp_path / "actions.bin", "ab") as f:
+        f.write(b"\x00" * 100)
+    with open(tmp_path / "games.bin", "ab") as f:
+        f.write(b"\x01" * (GAME.size // 2))
+    with RecordStore(tmp_path) as store:
+        assert len(store) == 1
+
+    row = RecordWriter(tmp_path).append(engine, actions, strategy="B")
+    assert row == 1
+    with RecordStore(tmp_path) as store:
+        assert [record.strategy for record in store.games] == ["A", "B"]
+        assert _slots(store.replay(store.games[1])) == _slots(engine)
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from oraclehlb.ai.montecarlostrategy import MonteCarloStrategy
+from oraclehlb.bench.fake_server import FakeTable
+from oraclehlb.sim.runner import SIM_PARAMS, GameResult, effective_concurrency, play_game, shuffled_deck, summarize
+from oraclehlb.game.variants import get_variant
+
+
+def test_no_variant_deck_matches_the_fake_server_shuffle():
+    table = FakeTable(0, ["a", "b"], seed=11)
+    assert shuffled_deck(get_variant("No Variant"), 11) == table.deck
+
+
+def test_play_game_uses_the_variant():
+    strategies = [MonteCarloStrategy(max_determinizations=2, time_budget=30.0, seed=seat) for seat in range(2)]
+    result = asyncio.run(play_game(strategies, seed=3, variant="6 Suits"))
+    assert result.invalid_actions == 0
+    assert result.turns > 0
+    assert 0 <= result.score <= 30
+
+
+def test_variants_with_special_suits_are_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(play_game([MonteCarloStrategy(), MonteCarloStrategy()], seed=0, variant="Rainbow (5 Suits)"))
+
+
+def test_time_budgeted_strategies_play_one_game_at_a_time():
+    assert effective_concurrency(["MonteCarloStrategy"], None, 16) == 1
+    assert effective_concurrency(["MonteCarloStrategy"], SIM_PARAMS, 16) == 16
+    assert not MonteCarloStrategy(**SIM_PARAMS).time_bound
+
+
+def test_summary_counts_perfect_games_and_strikeouts():
+    results = [
+        GameResult(seed=0, num_players=2, score=25, strikes=0, turns=50, invalid_actions=0, decision_time=0.5),
+        GameResult(seed=1, num_players=2, score=0, strikes=3, turns=30, invalid_actions=1, decision_time=0.3),
+    ]
+    report = summarize([r.score for r in results], elapsed=2.0, results=results)
+    assert report["games"] == 2 and report["games_per_sec"] == 1.0
+    assert report["mean_score"] == 12.5 and report["perfect_rate"] == 0.5
+    assert report["distribution"] == {0: 1, 25: 1}
+    assert report["strikeout_rate"] == 0.5 and report["invalid_actions"] == 1
+    assert report["decision_ms"] == 10.0
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from oraclehlb.config import BotConfig, Settings
+from oraclehlb.core import shards
+from oraclehlb.core.shards import ShardManager, _configure_shard, _frame, _receive, _Shard, partition, shard_count
+
+
+@pytest.fixture
+def shard_settings(monkeypatch):
+    """Настройки без config.toml, подменённые в модуле шардов."""
+    settings = Settings.model_construct(
+        bots=[], cookie_cache_path="/tmp/cache/cookies.json", login_rate=0.6, login_burst=3,
+        decision_workers=5, metrics_port=9108, reconnect_delay_base=1.0, reconnect_delay_max=8.0,
+    )
+    monkeypatch.setattr(shards, "settings", settings)
+    return settings
+
+
+def test_bots_are_split_evenly_and_stably():
+    configs = [BotConfig(username=f"bot{i}", strategy="MonteCarloStrategy") for i in range(7)]
+    assert shard_count(0, 1) == 1
+    assert shard_count(4, 2) == 2
+    assert shard_count(3, 7) == 3
+    groups = partition(configs, 3)
+    assert [[config.username for config in group] for group in groups] == [
+        ["bot0", "bot3", "bot6"], ["bot1", "bot4"], ["bot2", "bot5"],
+    ]
+    assert partition(configs, 3) == groups
+
+
+def test_shared_host_limits_are_divided_between_shards(shard_settings):
+    _configure_shard(1, 2)
+    assert shard_settings.cookie_cache_path == "/tmp/cache/cookies.shard1.json"
+    assert shard_settings.login_rate == pytest.approx(0.3)
+    assert shard_settings.login_burst == 1
+    assert shard_settings.decision_workers == 3
+    assert shard_settings.metrics_port == 9108 + 2
+
+
+def test_frames_round_trip_through_a_stream():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(_frame(("health", 1, {"bots": {}})) + _frame(("stop",)))
+        reader.feed_eof()
+        assert await _receive(reader) == ("health", 1, {"bots": {}})
+        assert await _receive(reader) == ("stop",)
+        with pytest.raises(asyncio.IncompleteReadError):
+            await _receive(reader)
+
+    asyncio.run(scenario())
+
+
+class _Process:
+    def __init__(self, alive: bool):
+        self.pid, self.exitcode = 1234, None if alive else 1
+        self._alive = alive
+        self.killed = False
+
+    def is_alive(self) -> bool:
+        return self._alive
+
+    def kill(self):
+        self.killed = True
+
+
+def test_dead_shards_restart_with_backoff_and_hung_ones_are_killed(shard_settings):
+    async def scenario():
+        manager = ShardManager.__new__(ShardManager)
+        dead, hung = _Shard(0, []), _Shard(1, [])
+        manager._shards = [dead, hung]
+        dead.process, hung.process = _Process(alive=False), _Process(alive=True)
+        dead.started = hung.last_report = 100.0
+
+        await manager._check(dead, 101.0)
+        assert dead.restarts == 1 and 102.0 <= dead.restart_at <= 109.0
+        await manager._check(hung, 100.0 + shards.STALE_AFTER - 1)
+        assert not hung.process.killed
+        await manager._check(hung, 100.0 + shards.STALE_AFTER + 1)
+        assert hung.process.killed
+
+        health = manager.health()
+        assert health["shards"]["0"]["restarts"] == 1 and not health["shards"]["0"]["alive"]
+        assert health["shards"]["1"]["alive"]
+
+    asyncio.run(scenario())
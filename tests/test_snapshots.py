@@ -0,0 +1,64 @@
+from oraclehlb.game.snapshots import SnapshotCache
+
+from test_engine import _engine, _state, random_game
+
+
+def _seat_view(seed: int, seat: int = 0):
+    table = random_game(seed=seed)
+    return table, [table.visible_to(seat, action) for action in table.actions]
+
+
+def test_restore_resumes_from_the_newest_matching_snapshot():
+    table, actions = _seat_view(seed=5)
+    cache = SnapshotCache()
+    engine = _engine(table, seat=0)
+    for index, action in enumerate(actions[:30]):
+        engine.apply(action)
+        if index % 10 == 9:
+            cache.store(engine, action)
+
+    restored = cache.restore(engine.table_id, 0, actions)
+    assert restored.num_actions == 30
+    restored.apply_all(actions[30:])
+    full = _engine(table, seat=0)
+    full.apply_all(actions)
+    assert _state(restored) == _state(full)
+
+    # Копия не делится состоянием со снимком в кеше
+    assert cache.restore(engine.table_id, 0, actions).num_actions == 30
+
+
+def test_diverged_history_falls_back_to_an_older_snapshot():
+    table, actions = _seat_view(seed=6)
+    cache = SnapshotCache()
+    engine = _engine(table, seat=0)
+    for index, action in enumerate(actions[:20]):
+        engine.apply(action)
+        if index in (9, 19):
+            cache.store(engine, action)
+
+    diverged = actions[:19] + [{"type": "turn", "num": -1, "currentPlayerIndex": 0}]
+    assert cache.restore(engine.table_id, 0, diverged).num_actions == 10
+    assert cache.restore(engine.table_id, 0, actions[:5]) is None
+    assert cache.restore(engine.table_id, 1, actions) is None
+
+
+def test_cache_is_bounded_per_table_and_across_tables():
+    table, actions = _seat_view(seed=7)
+    cache = SnapshotCache(max_tables=2, per_table=2)
+    engine = _engine(table, seat=0)
+    for action in actions[:3]:
+        engine.apply(action)
+        cache.store(engine, action)
+    # Остались два последних снимка: первый уже не подходит ни под какой префикс
+    assert cache.restore(0, 0, actions[:1]) is None
+    assert cache.restore(0, 0, actions[:2]).num_actions == 2
+
+    for table_id in (1, 2):
+        engine.table_id = table_id
+        cache.store(engine, actions[2])
+    assert cache.restore(0, 0, actions) is None
+    assert cache.restore(2, 0, actions).num_actions == 3
+
+    cache.drop(2, 0)
+    assert cache.restore(2, 0, actions) is None
@@ -0,0 +1,192 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from oraclehlb.bench.fake_server import FakeHanabLive, FakeClient, FakeTable, MAX_CLUE_TOKENS
+from oraclehlb.core.event_bus import EventBus, OurTurn, RawMessageReceived
+from oraclehlb.game.clues import clue_table
+from oraclehlb.game.engine import GameEngine
+from oraclehlb.game.snapshots import SnapshotCache
+from oraclehlb.game.variants import get_variant
+from oraclehlb.services import state as state_module
+from oraclehlb.services.outbox import Outbox
+from oraclehlb.services.parser import ProtocolParser
+from oraclehlb.services.state import GameStateManager
+
+
+class LoopbackSocket:
+    """Websocket фейкового сервера: кадры копятся, пока тест не передаст их боту."""
+
+    def __init__(self):
+        self.frames: deque = deque()
+        self.closed = False
+
+    async def send_str(self, message: str):
+        self.frames.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+class LoopbackNetwork:
+    """Вместо `NetworkService`: команды бота сразу обрабатывает фейковый сервер."""
+
+    def __init__(self, server: FakeHanabLive):
+        self.server = server
+        self.client: Optional[FakeClient] = None
+        self.outbox = Outbox()
+        self.sent: List[str] = []
+
+    async def send_command(self, command: str, payload: Dict[str, Any], turn=None):
+        self.sent.append(command)
+        await self.server._handle_client_message(self.client, f"{command} {json.dumps(payload)}")
+
+
+class LoopbackBot:
+    """`GameStateManager` одного бота, подключённый к `FakeHanabLive` без сети."""
+
+    def __init__(self, server: FakeHanabLive, username: str):
+        self.server = server
+        self.username = username
+        self.bus = EventBus()
+        self.parser = ProtocolParser(self.bus)
+        self.turns = []
+        self.bus.subscribe(OurTurn, self._on_turn)
+        self.network = LoopbackNetwork(server)
+        self.state = GameStateManager(username, self.bus, self.network, self.parser)
+        self.connect()
+
+    def connect(self):
+        """Новое подключение того же бота: сервис сети и состояние партий остаются прежними."""
+        self.socket = LoopbackSocket()
+        self.client = FakeClient(username=self.username, ws=self.socket)
+        self.network.client = self.client
+        self.network.sent.clear()
+        self.server._clients[self.username] = self.client
+
+    def disconnect(self):
+        del self.server._clients[self.username]
+
+    async def _on_turn(self, event: OurTurn):
+        self.turns.append(event.state)
+
+    async def pump(self):
+        while self.socket.frames:
+            await self.parser.handle_raw_message(RawMessageReceived(message=self.socket.frames.popleft()))
+
+
+async def pump(bots: List[LoopbackBot]):
+    while any(bot.socket.frames for bot in bots):
+        for bot in bots:
+            await bot.pump()
+
+
+def legal_action(table: FakeTable) -> Dict[str, Any]:
+    seat = table.current_player
+    if table.clue_tokens < MAX_CLUE_TOKENS:
+        return {"type": 1, "target": table.hands[seat][0]}
+    target = (seat + 1) % len(table.players)
+    return {"type": 3, "target": target, "value": table.cards[table.hands[target][0]][1]}
+
+
+async def start_game(server: FakeHanabLive, bots: List[LoopbackBot]) -> FakeTable:
+    await server._open_table([bot.username for bot in bots])
+    await pump(bots)
+    return next(iter(server._tables.values()))
+
+
+async def play_turn(table: FakeTable, bot: LoopbackBot, bots: List[LoopbackBot]):
+    await bot.network.send_command("action", {"tableID": table.table_id, **legal_action(table)})
+    await pump(bots)
+
+
+@pytest.fixture(autouse=True)
+def fresh_snapshots(monkeypatch):
+    cache = SnapshotCache()
+    monkeypatch.setattr(state_module, "snapshot_cache", cache)
+    return cache
+
+
+def test_table_start_requests_game_info_and_starts_the_game():
+    async def scenario():
+        server = FakeHanabLive()
+        bots = [LoopbackBot(server, "alice"), LoopbackBot(server, "bob")]
+        table = await start_game(server, bots)
+
+        for seat, bot in enumerate(bots):
+            assert bot.network.sent == ["getGameInfo1", "getGameInfo2"]
+            engine = bot.state.games[table.table_id]
+            assert engine.our_player_index == seat
+            assert engine.hand(1 - seat) == table.hands[1 - seat]
+        assert table.started
+        assert [len(bot.turns) for bot in bots] == [1, 0]
+
+        await play_turn(table, bots[0], bots)
+        assert [len(bot.turns) for bot in bots] == [1, 1]
+        assert server.invalid_actions == 0
+
+    asyncio.run(scenario())
+
+
+def _full_replay(bot: LoopbackBot, table: FakeTable) -> GameEngine:
+    seat = table.players.index(bot.username)
+    variant = get_variant("No Variant")
+    engine = GameEngine(
+        num_players=len(table.players), num_suits=variant.num_suits, our_player_index=seat,
+        table_id=table.table_id, player_names=table.players, deck_total=variant.deck_size, variant=variant.name,
+    )
+    engine.knowledge = clue_table(variant).knowledge(engine.num_players)
+    engine.apply_all([table.visible_to(seat, action) for action in table.actions])
+    return engine
+
+
+def _engine_state(engine: GameEngine):
+    state = dict(zip(GameEngine.__slots__, engine.__getstate__()))
+    knowledge = state.pop("knowledge")
+    return state, knowledge.__getstate__()
+
+
+def test_reconnect_mid_game_resumes_from_snapshot(fresh_snapshots, monkeypatch):
+    restored = []
+    restore = fresh_snapshots.restore
+
+    def spy(table_id, perspective, actions):
+        engine = restore(table_id, perspective, actions)
+        restored.append(engine.num_actions if engine is not None else None)
+        return engine
+
+    monkeypatch.setattr(fresh_snapshots, "restore", spy)
+
+    async def scenario():
+        server = FakeHanabLive(seed=5)
+        alice, bob = bots = [LoopbackBot(server, "alice"), LoopbackBot(server, "bob")]
+        table = await start_game(server, bots)
+        for _ in range(12):
+            await play_turn(table, bots[table.current_player], bots)
+        assert table.current_player == 0 and not table.finished
+
+        # Алиса ходит и теряет соединение, пока ходит боб: его ход она пропускает
+        await play_turn(table, alice, bots)
+        alice.disconnect()
+        await play_turn(table, bob, bots)
+        missed = len(table.actions) - alice.state.games[table.table_id].num_actions
+        assert missed > 0
+        turns_before = len(alice.turns)
+
+        alice.connect()
+        await server._resume_tables(alice.client)
+        await pump(bots)
+
+        assert alice.network.sent == ["getGameInfo1", "getGameInfo2"]
+        assert restored and restored[-1] is not None and 0 < restored[-1] < len(table.actions)
+        resumed = alice.state.games[table.table_id]
+        assert _engine_state(resumed) == _engine_state(_full_replay(alice, table))
+        assert resumed.hand(1) == table.hands[1]
+        # Снова наш ход: решение запрашивается один раз, после пересинхронизации
+        assert len(alice.turns) == turns_before + 1
+        assert alice.turns[-1].turn == table.turn
+
+    asyncio.run(scenario())
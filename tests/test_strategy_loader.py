@@ -0,0 +1,83 @@
+import sys
+import textwrap
+
+import pytest
+
+from oraclehlb.config import BotConfig
+from oraclehlb.core.strategy_loader import StrategyRegistry, strategy_registry
+
+
+@pytest.fixture
+def plugin_path(tmp_path, monkeypatch):
+    """Пакет стратегий со сломанным модулем и установленный дистрибутив с entry points."""
+    package = tmp_path / "plugin_strategies"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "counting.py").write_text(textwrap.dedent("""
+        from oraclehlb.ai.base import BaseStrategy
+
+        class CountingStrategy(BaseStrategy):
+            warm_ups = 0
+
+            def __init__(self, depth: int = 1):
+                super().__init__()
+                self.depth = depth
+
+            @classmethod
+            def warm_up(cls):
+                cls.warm_ups += 1
+
+            async def decide_action(self, state):
+                return self.fallback_action(state)
+
+        NotAStrategy = dict
+    """))
+    (package / "broken.py").write_text("raise ImportError('no such dependency')\n")
+    dist_info = tmp_path / "plugin_strategies-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: plugin-strategies\nVersion: 1.0\n")
+    (dist_info / "entry_points.txt").write_text(textwrap.dedent("""
+        [test.oraclehlb.strategies]
+        Deep = plugin_strategies.counting:CountingStrategy
+        Bad = plugin_strategies.counting:NotAStrategy
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in [name for name in sys.modules if name.startswith("plugin_strategies")]:
+        del sys.modules[name]
+
+
+def test_bundled_strategies_are_discovered():
+    assert {"SimpleStrategy", "MonteCarloStrategy"} <= set(strategy_registry.classes)
+    assert "BaseStrategy" not in strategy_registry.classes
+
+
+def test_modules_and_entry_points_are_discovered_once_and_broken_ones_reported(plugin_path):
+    registry = StrategyRegistry(package="plugin_strategies", group="test.oraclehlb.strategies")
+    assert set(registry.classes) == {"CountingStrategy", "Deep"}
+    assert registry.classes["Deep"] is registry.classes["CountingStrategy"]
+    assert set(registry.errors) == {"plugin_strategies.broken", "Bad"}
+    with pytest.raises(ValueError, match="Failed to load: Bad, plugin_strategies.broken"):
+        registry.get("Missing")
+
+    first = registry.create("Deep", {"depth": 3})
+    second = registry.create("CountingStrategy")
+    assert (first.depth, second.depth) == (3, 1)
+    assert (first.strategy_name, first.strategy_params) == ("Deep", {"depth": 3})
+    assert registry.classes["Deep"].warm_ups == 1  # таблицы класса строятся один раз на процесс
+
+
+def test_validation_reports_every_misconfigured_bot(plugin_path):
+    registry = StrategyRegistry(package="plugin_strategies", group="test.oraclehlb.strategies")
+    configs = [
+        BotConfig(username="ok", strategy="Deep", strategy_params={"depth": 2}),
+        BotConfig(username="typo", strategy="Deeep"),
+        BotConfig(username="params", strategy="Deep", strategy_params={"width": 2}),
+    ]
+    with pytest.raises(ValueError) as error:
+        registry.validate(configs)
+    message = str(error.value)
+    assert "bot 'typo': Unknown strategy 'Deeep'" in message
+    assert "bot 'params': Invalid parameters for strategy 'Deep'" in message
+    assert "bot 'ok'" not in message
+    registry.validate(configs[:1])
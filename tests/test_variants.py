@@ -0,0 +1,85 @@
+import asyncio
+import os
+import pickle
+
+import pytest
+
+from oraclehlb.core.event_bus import EventBus
+from oraclehlb.game.variants import DATA_PATH, get_variant, load_catalog, standard_variant
+from oraclehlb.services.parser import ProtocolParser
+from oraclehlb.services.protocol import InitPayload
+from oraclehlb.services.state import GameStateManager
+
+
+def test_catalog_parses_special_suits_and_decks():
+    plain = get_variant("No Variant")
+    assert plain.plain and plain.num_suits == 5 and plain.deck_size == 50
+    assert plain.clue_colors == ("Red", "Yellow", "Green", "Blue", "Purple")
+    assert standard_variant(5) is plain and standard_variant(3).num_suits == 3
+
+    black = get_variant("Black (6 Suits)")
+    assert black.deck_size == 50 + 5 and black.suits[-1].dark
+    assert "Black" in black.clue_colors
+    rainbow = get_variant("Rainbow (5 Suits)")
+    assert rainbow.suits[-1].all_colors and "Rainbow" not in rainbow.clue_colors and not rainbow.plain
+    assert get_variant("White (5 Suits)").suits[-1].colors == ()
+    assert get_variant("Brown (5 Suits)").suits[-1].no_ranks
+    with pytest.raises(KeyError):
+        get_variant("Up or Down (5 Suits)")
+
+
+def test_catalog_is_cached_and_rebuilt_when_the_data_changes(tmp_path):
+    data_path = tmp_path / "variants.json"
+    data_path.write_bytes(DATA_PATH.read_bytes())
+    cache_dir = tmp_path / "cache"
+
+    built = load_catalog(data_path, cache_dir)
+    [cache_path] = cache_dir.glob("variants-*.pickle")
+    cached = load_catalog(data_path, cache_dir)
+    assert cached.variants == built.variants
+    # Одинаковые масти - один объект и после загрузки из кэша
+    assert cached["Rainbow (5 Suits)"].suits[0] is cached["No Variant"].suits[0]
+
+    # Файл данных изменился: старый кэш не читается и удаляется
+    stat = data_path.stat()
+    os.utime(data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    load_catalog(data_path, cache_dir)
+    assert [path.name for path in cache_dir.glob("variants-*.pickle")] != [cache_path.name]
+    assert len(list(cache_dir.glob("variants-*.pickle"))) == 1
+
+
+def test_broken_cache_is_ignored(tmp_path):
+    data_path = tmp_path / "variants.json"
+    data_path.write_bytes(DATA_PATH.read_bytes())
+    cache_dir = tmp_path / "cache"
+    load_catalog(data_path, cache_dir)
+    [cache_path] = cache_dir.glob("variants-*.pickle")
+    cache_path.write_bytes(b"not a pickle")
+
+    catalog = load_catalog(data_path, cache_dir)
+    assert catalog["No Variant"].deck_size == 50
+    assert pickle.loads(cache_path.read_bytes()).variants == catalog.variants  # кэш перезаписан
+
+
+class RecordingNetwork:
+    def __init__(self):
+        self.sent = []
+
+    async def send_command(self, command, payload, turn=None):
+        self.sent.append((command, payload))
+
+
+def test_table_with_an_unsupported_variant_is_left():
+    async def scenario():
+        network = RecordingNetwork()
+        bus = EventBus()
+        manager = GameStateManager("bot", bus, network, ProtocolParser(bus))
+        await manager._handle_init(InitPayload(
+            table_id=5, player_names=["bot", "other"], our_player_index=0,
+            options={"variantName": "Up or Down (5 Suits)"},
+        ))
+        assert 5 not in manager.games
+        assert [command for command, _ in network.sent] == ["chat", "tableUnattend"]
+        assert network.sent[1][1] == {"tableID": 5}
+
+    asyncio.run(scenario())